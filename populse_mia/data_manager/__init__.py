@@ -48,6 +48,7 @@ __all__ = [
     "TAG_FILENAME",
     "TAG_BRICKS",
     "TAG_HISTORY",
+    "TAG_ASSOCIATED_FILE",
     "CLINICAL_TAGS",
     "BRICK_ID",
     "BRICK_NAME",
@@ -277,6 +278,9 @@ TAG_BRICKS = "History"
 #: document.
 TAG_HISTORY = "Full history"
 
+#: Tag name for the NIfTI scan a bvec/bval file is associated with.
+TAG_ASSOCIATED_FILE = "AssociatedNIfTIFile"
+
 #: Dictionary of clinical tag names and their descriptions.
 #: These tags store patient and acquisition metadata.
 CLINICAL_TAGS = {
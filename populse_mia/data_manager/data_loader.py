@@ -21,17 +21,23 @@ This module provides functionality to:
 
 import glob
 import hashlib  # To generate the md5 of each path
+import io
 import json
 import logging
 import os.path
+import pickle
+import tempfile
 import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from time import sleep
 from time import time as time_time
 
+import numpy as np
+
 # PyQt5 import
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from PyQt5.QtWidgets import QProgressDialog
+from PyQt5.QtWidgets import QMessageBox, QProgressDialog
 
 # populse_mia import
 from populse_mia.data_manager import (
@@ -52,6 +58,7 @@ from populse_mia.data_manager import (
     FIELD_TYPE_MAPPING,
     FIELD_TYPE_STRING,
     FIELD_TYPE_TIME,
+    TAG_ASSOCIATED_FILE,
     TAG_CHECKSUM,
     TAG_FILENAME,
     TAG_ORIGIN_BUILTIN,
@@ -62,10 +69,12 @@ from populse_mia.data_manager import (
     TYPE_BVEC_BVAL,
     TYPE_NII,
 )
+from populse_mia.utils.file_copy import _md5_of_file
 
 __all__ = [
     "ImportProgress",
     "ImportWorker",
+    "SpilledValues",
     "read_log",
     "tags_from_file",
     "verify_scans",
@@ -73,6 +82,12 @@ __all__ = [
 
 logger = logging.getLogger(__name__)
 
+#: Number of files hashed concurrently during an import.
+CHECKSUM_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+
+#: Number of scans processed and written to the database at a time.
+IMPORT_CHUNK_SIZE = 1000
+
 
 class ImportProgress(QProgressDialog):
     """
@@ -80,6 +95,7 @@ class ImportProgress(QProgressDialog):
 
     Contains:
         Methods:
+            - onFailure: Records the failure of the import.
             - onProgress: Updates the progress bar value.
     """
 
@@ -92,12 +108,12 @@ class ImportProgress(QProgressDialog):
         :type project: Project
 
         Sets up a modal progress dialog with a window title, custom flags, and
-        macOS compatibility. Progress bar range is fixed at 0 to 3 (as per
-        parent class initialization). Dialog is non-cancelable (no cancel
-        button) and appears immediately (minimum duration = 0).
+        macOS compatibility. Progress bar range is fixed at 0 to 100 (as
+        per parent class initialization). Dialog is non-cancelable (no
+        cancel button) and appears immediately (minimum duration = 0).
         """
         super().__init__(
-            "Please wait while the paths are being imported...", None, 0, 3
+            "Please wait while the paths are being imported...", None, 0, 100
         )
         self.setWindowTitle("Importing the paths")
         self.setWindowFlags(
@@ -108,11 +124,26 @@ class ImportProgress(QProgressDialog):
         self.setValue(0)
         # Required for macOS compatibility:
         self.setMinimumWidth(350)
+        # Number of scans imported and error, if the import failed
+        self.failure = None
         self.worker = ImportWorker(project, self)
         self.worker.finished.connect(self.close)
         self.worker.notifyProgress.connect(self.onProgress)
+        self.worker.notifyFailure.connect(self.onFailure)
         self.worker.start()
 
+    def onFailure(self, scans_imported, error):
+        """
+        Records the failure of the import, reported by read_log.
+
+        :param scans_imported: The number of scans imported before the
+         failure.
+        :type scans_imported: int
+        :param error: The error message.
+        :type error: str
+        """
+        self.failure = (scans_imported, error)
+
     def onProgress(self, value):
         """
         Updates the progress bar value.
@@ -130,6 +161,12 @@ class ImportWorker(QThread):
     This class manages the import process, reading from export logs,
     processing scan files, and updating the database accordingly.
 
+    Scans are imported by chunks of `chunk_size` log entries: each chunk is
+    processed and written to the database before the next one is read, so
+    that the memory used by an import doesn't depend on the number of
+    scans. When there are several chunks, the values kept for the history
+    (needed to redo the import) are spilled to a temporary file.
+
     Contains:
         Methods:
             - run : override the QThread run method.
@@ -138,11 +175,16 @@ class ImportWorker(QThread):
             - _add_tag_to_database: add a new tag to the database.
             - _apply_default_values: apply default values for user-defined
               tags.
+            - _associated_file_paths: give the paths of the gradient files
+              that may accompany a scan.
+            - _compute_checksums: hash all the files of an import in a
+              single thread pool.
             - _convert_datetime_values: convert string values to datetime
               objects.
             - _ensure_associated_file_tag_exists: ensure the associated file
               tag exists in the database.
             - _extract_tag_info: extract tag information from properties.
+            - _file_checksum: give the MD5 checksum of a file of the import.
             - _get_export_logs: get the export logs from the raw data folder.
             - _process_associated_file: process an associated file.
             - _process_associated_files: process associated bvec/bval files.
@@ -155,18 +197,28 @@ class ImportWorker(QThread):
               file.
             - _process_scan_file: process a single scan file and its
               associated files.
-            - _update_database: update the database with the processed
-              documents.
+            - _read_existing_data: read the existing documents, tags and
+              default values once per import.
+            - _read_import_file: hash a file of the import and, for a
+              gradient file, parse it.
+            - _record_history: record the import in the project history.
+            - _update_database: write a chunk of processed documents to
+              the database.
 
     Signals:
+        - notifyFailure: Signal emitted if the import fails. Emits the
+          number of scans imported before the failure and the error
+          message.
         - notifyProgress: Signal to update the progress bar. Emits an integer
           representing the progress percentage.
     """
 
+    # Signal to report a failed import
+    notifyFailure = pyqtSignal(int, str)
     # Signal to update the progress bar
     notifyProgress = pyqtSignal(int)
 
-    def __init__(self, project, progress):
+    def __init__(self, project, progress, chunk_size=IMPORT_CHUNK_SIZE):
         """
         Initialize the ImportWorker thread for importing scans into the
         project database.
@@ -177,56 +229,118 @@ class ImportWorker(QThread):
         :param progress: The progress dialog instance to update the import
          progress via the `notifyProgress` signal.
         :type progress: ImportProgress
+        :param chunk_size: Number of log entries processed and written to
+         the database at a time. None imports all the scans in one chunk.
+        :type chunk_size: int | None
         """
         super().__init__()
         self.project = project
         self.progress = progress
+        self.chunk_size = chunk_size
         self.lock = threading.RLock()
         # Track scans added during the import process. scans_added should
         # always be accessed through the lock, and copied before releasing
         # the lock, because its value will change inside the thread.
         self._scans_added = []
+        # Per-import lookups, filled once by _process_log_entries
+        self._checksums = {}
+        self._gradient_tables = {}
+        self._existing_documents = set()
+        self._existing_tags = set()
+        self._default_values = {}
 
     def run(self):
         """
         Execute the import process.
 
         This method overrides the QThread run method and is executed when
-        the worker is started. It processes the export logs, imports scans,
-        and updates the database.
+        the worker is started. It processes the export logs, imports scans
+        chunk by chunk, and updates the database after each chunk.
+
+        If a chunk fails, the import stops: the scans of the previous
+        chunks stay in the database, and are the scans added, recorded in
+        the history so that they can be undone. The failure is logged and
+        reported with the notifyFailure signal, and the progress doesn't
+        reach 100.
         """
         begin = time_time()
         raw_data_folder = os.path.relpath(
             os.path.join(self.project.folder, "data", "raw_data")
         )
         # Process export logs from MRIManager
-        list_dict_log = self._get_export_logs(raw_data_folder)
-        # For history tracking
-        historyMaker = ["add_scans"]
+        list_dict_log = [
+            dict_log
+            for dict_log in self._get_export_logs(raw_data_folder)
+            if dict_log["StatusExport"] == "Export ok"
+        ]
 
         # Reset scans_added at the start of a new import
         with self.lock:
             self._scans_added = []
 
-        documents = {}
-        values_added = []
-        tags_added = []
-        tags_names_added = []
-        # Process each log entry
-        self._process_log_entries(
-            list_dict_log,
-            raw_data_folder,
-            documents,
-            values_added,
-            tags_added,
-            tags_names_added,
-        )
-        # Apply default values for user-defined tags
-        self._apply_default_values(documents, values_added)
-        # Update the database
-        self._update_database(
-            documents, tags_added, values_added, historyMaker
+        self._read_existing_data()
+        chunk_size = self.chunk_size or max(len(list_dict_log), 1)
+        # Values needed to redo the import, kept on disk for large imports
+        history_values = (
+            SpilledValues() if len(list_dict_log) > chunk_size else []
         )
+
+        # Number of scans written to the database by the previous chunks
+        scans_written = 0
+
+        # The chunks are written in their own transactions: if one fails,
+        # the scans of the previous chunks stay, and are recorded for undo
+        # like a complete import
+        try:
+
+            for start in range(0, len(list_dict_log), chunk_size):
+                end = min(start + chunk_size, len(list_dict_log))
+                documents = {}
+                values_added = []
+                tags_added = []
+                tags_names_added = []
+                # Process the log entries of the chunk
+                self._process_log_entries(
+                    list_dict_log[start:end],
+                    raw_data_folder,
+                    documents,
+                    values_added,
+                    tags_added,
+                    tags_names_added,
+                )
+                # Apply default values for user-defined tags
+                self._apply_default_values(documents, values_added)
+                # Write the chunk to the database
+                self._update_database(documents, tags_added)
+                history_values.extend(values_added)
+
+                with self.lock:
+                    scans_written = len(self._scans_added)
+
+                self.notifyProgress.emit(100 * end // len(list_dict_log))
+
+        except Exception as error:
+            logger.exception(
+                "Import interrupted, %d scan(s) imported", scans_written
+            )
+
+            # The scans of the failed chunk aren't in the database
+            with self.lock:
+                del self._scans_added[scans_written:]
+
+            failure = str(error)
+
+        else:
+            failure = None
+
+        self._record_history(history_values)
+
+        if failure is None:
+            self.notifyProgress.emit(100)
+
+        else:
+            self.notifyFailure.emit(scans_written, failure)
+
         logger.info(
             "Data export duration in the database: %.2f s",
             time_time() - begin,
@@ -270,45 +384,96 @@ class ImportWorker(QThread):
         """
         Apply default values for user-defined tags.
 
+        Only the new documents of the chunk are concerned, and as they are
+        not in the database yet, no database query is needed.
+
         :param documents: Dictionary containing document information.
         :type documents: dict
         :param values_added: List to track added values.
         :type values_added: list
         """
-        with self.project.database.data() as database_data:
 
-            for tag in database_data.get_field_attributes(COLLECTION_CURRENT):
+        if not self._default_values:
+            return
+
+        for scan, document in documents.items():
 
-                if tag["origin"] != TAG_ORIGIN_USER:
+            if scan in self._existing_documents:
+                continue
+
+            for tag_name, default_value in self._default_values.items():
+
+                # Skip if document already has a value
+                if document.get(tag_name) is not None:
                     continue
 
-                for scan in self.scans_added:
+                # Add default value to document and history
+                values_added.append(
+                    [scan, tag_name, default_value, default_value]
+                )
+                document[tag_name] = default_value
 
-                    # Skip if tag has no default value
-                    # or document already has a value
-                    if (
-                        tag["default_value"] is None
-                        or database_data.get_value(
-                            collection_name=COLLECTION_CURRENT,
-                            primary_key=scan,
-                            field=tag["index"].split("|")[-1],
-                        )
-                        is not None
-                    ):
-                        continue
-
-                    # Add default value to document and history
-                    values_added.append(
-                        [
-                            scan,
-                            tag["index"].split("|")[-1],
-                            tag["default_value"],
-                            tag["default_value"],
-                        ]
+    def _associated_file_paths(self, file_name, raw_data_folder):
+        """
+        Give the paths of the gradient files that may accompany a scan.
+
+        :param file_name: Base name of the scan file.
+        :type file_name: str
+        :param raw_data_folder: Path to the raw data folder.
+        :type raw_data_folder: str
+
+        :returns: The paths of the FSL bvec file, of the FSL bval file and of
+         the MRtrix bvecs-bvals file.
+        :rtype: tuple[str, str, str]
+        """
+        return (
+            os.path.join(raw_data_folder, f"{file_name}.bvec"),
+            os.path.join(raw_data_folder, f"{file_name}.bval"),
+            os.path.join(
+                raw_data_folder, f"{file_name}-bvecs-bvals-MRtrix.txt"
+            ),
+        )
+
+    def _compute_checksums(self, list_dict_log, raw_data_folder):
+        """
+        Hash all the files of an import in a single thread pool.
+
+        The NIfTI scans and their existing gradient files are hashed
+        concurrently. Gradient files, which are small, are read once to be
+        both hashed and parsed with NumPy. Results are stored in
+        `_checksums` and `_gradient_tables`.
+
+        :param list_dict_log: Log entries of the exported scans.
+        :type list_dict_log: list
+        :param raw_data_folder: Path to the raw data folder.
+        :type raw_data_folder: str
+        """
+        paths = []
+
+        for dict_log in list_dict_log:
+            file_name = dict_log["NameFile"]
+            paths.append(os.path.join(raw_data_folder, f"{file_name}.nii"))
+
+            if dict_log.get("Bvec_bval") == "yes":
+                paths.extend(
+                    path
+                    for path in self._associated_file_paths(
+                        file_name, raw_data_folder
                     )
-                    documents[scan][tag["index"].split("|")[-1]] = tag[
-                        "default_value"
-                    ]
+                    if os.path.exists(path)
+                )
+
+        with ThreadPoolExecutor(max_workers=CHECKSUM_WORKERS) as executor:
+            results = list(executor.map(self._read_import_file, paths))
+
+        self._checksums = {}
+        self._gradient_tables = {}
+
+        for path, (checksum, table) in zip(paths, results):
+            self._checksums[path] = checksum
+
+            if table is not None:
+                self._gradient_tables[path] = table
 
     def _convert_datetime_values(self, tag_info):
         """
@@ -344,13 +509,11 @@ class ImportWorker(QThread):
         return tag_info
 
     def _ensure_associated_file_tag_exists(
-        self, database_data, tag_name, tags_added, tags_names_added
+        self, tag_name, tags_added, tags_names_added
     ):
         """
         Ensure the associated file tag exists in the database.
 
-        :param database_data: Context-Managed database.
-        :type database_data: DatabaseMiaData
         :param tag_name: Name of the tag.
         :type tag_name: str
         :param tags_added: List to track added tags.
@@ -360,8 +523,7 @@ class ImportWorker(QThread):
         """
 
         if (
-            database_data.get_field_attributes(COLLECTION_CURRENT, tag_name)
-            is None
+            tag_name not in self._existing_tags
             and tag_name not in tags_names_added
         ):
             tag_info = {
@@ -436,6 +598,20 @@ class ImportWorker(QThread):
 
         return tag_info
 
+    def _file_checksum(self, path):
+        """
+        Give the MD5 checksum of a file of the import.
+
+        :param path: Path of the file.
+        :type path: str
+
+        :returns: The checksum computed by `_compute_checksums`, or computed
+         now if the file was not part of it.
+        :rtype: str
+        """
+        checksum = self._checksums.get(path)
+        return checksum if checksum is not None else _md5_of_file(path)
+
     def _get_export_logs(self, raw_data_folder):
         """Get the export logs from the raw data folder.
 
@@ -459,7 +635,6 @@ class ImportWorker(QThread):
 
     def _process_associated_file(
         self,
-        database_data,
         file_database_path,
         checksum,
         file_type,
@@ -471,8 +646,6 @@ class ImportWorker(QThread):
         """
         Process an associated file.
 
-        :param database_data: Context-Managed database.
-        :type database_data: DatabaseMiaData
         :param file_database_path: Relative path of the file.
         :type file_database_path: str
         :param checksum: MD5 checksum of the file.
@@ -488,9 +661,8 @@ class ImportWorker(QThread):
         :param values_added: List to track added values.
         :type values_added: list
         """
-        document_not_existing = not database_data.has_document(
-            collection_name=COLLECTION_CURRENT,
-            primary_key=file_database_path,
+        document_not_existing = (
+            file_database_path not in self._existing_documents
         )
 
         if document_not_existing:
@@ -525,7 +697,6 @@ class ImportWorker(QThread):
 
     def _process_associated_files(
         self,
-        database_data,
         file_name,
         raw_data_folder,
         file_database_path,
@@ -537,8 +708,6 @@ class ImportWorker(QThread):
         """
         Process associated bvec/bval files.
 
-        :param database_data: Context-Managed database.
-        :type database_data: DatabaseMiaData
         :param file_name: Base name of the file.
         :type file_name: str
         :param raw_data_folder: Path to the raw data folder.
@@ -554,26 +723,22 @@ class ImportWorker(QThread):
         :param tags_names_added: List to track added tag names.
         :type tags_names_added: list
         """
-        # Define paths for FSL and MRtrix format files
-        bvec_path = os.path.join(raw_data_folder, f"{file_name}.bvec")
-        bval_path = os.path.join(raw_data_folder, f"{file_name}.bval")
-        bvec_bval_mrtrix_path = os.path.join(
-            raw_data_folder, f"{file_name}-bvecs-bvals-MRtrix.txt"
+        # Paths of the FSL and MRtrix format files
+        bvec_path, bval_path, bvec_bval_mrtrix_path = (
+            self._associated_file_paths(file_name, raw_data_folder)
         )
         # Ensure associated file tag exists
-        tag_name = "AssociatedNIfTIFile"
         self._ensure_associated_file_tag_exists(
-            database_data, tag_name, tags_added, tags_names_added
+            TAG_ASSOCIATED_FILE, tags_added, tags_names_added
         )
 
         # Process FSL format files
         if os.path.exists(bvec_path) and os.path.exists(bval_path):
             self._process_fsl_format_files(
-                database_data,
                 bvec_path,
                 bval_path,
                 file_database_path,
-                tag_name,
+                TAG_ASSOCIATED_FILE,
                 documents,
                 values_added,
             )
@@ -581,10 +746,9 @@ class ImportWorker(QThread):
         # Process MRtrix format file
         if os.path.exists(bvec_bval_mrtrix_path):
             self._process_mrtrix_format_file(
-                database_data,
                 bvec_bval_mrtrix_path,
                 file_database_path,
-                tag_name,
+                TAG_ASSOCIATED_FILE,
                 documents,
                 values_added,
             )
@@ -630,7 +794,6 @@ class ImportWorker(QThread):
 
     def _process_file_tags(
         self,
-        database_data,
         file_name,
         path_name,
         file_database_path,
@@ -644,8 +807,6 @@ class ImportWorker(QThread):
         """
         Process tags from a file.
 
-        :param database_data: Context-Managed database.
-        :type database_data: DatabaseMiaData
         :param file_name: Base name of the file.
         :type file_name: str
         :param path_name: Path to the file directory.
@@ -681,10 +842,7 @@ class ImportWorker(QThread):
 
             # Add tag to database if it doesn't exist
             if (
-                database_data.get_field_attributes(
-                    COLLECTION_CURRENT, tag_name
-                )
-                is None
+                tag_name not in self._existing_tags
                 and tag_name not in tags_names_added
             ):
                 self._add_tag_to_database(
@@ -706,7 +864,6 @@ class ImportWorker(QThread):
 
     def _process_fsl_format_files(
         self,
-        database_data,
         bvec_path,
         bval_path,
         file_database_path,
@@ -717,8 +874,6 @@ class ImportWorker(QThread):
         """
         Process FSL format bvec/bval files.
 
-        :param database_data: Context-Managed database.
-        :type database_data: DatabaseMiaData
         :param bvec_path: Path to the bvec file.
         :type bvec_path: str
         :param bval_path: Path to the bval file.
@@ -732,37 +887,42 @@ class ImportWorker(QThread):
         :param values_added: List to track added values.
         :type values_added: list
         """
-        # Process bvec file
-        with open(bvec_path, "rb") as bvec_file:
-            original_md5_bvec = hashlib.md5(bvec_file.read()).hexdigest()
+        bvec = self._gradient_tables.get(bvec_path)
+        bval = self._gradient_tables.get(bval_path)
 
-        bvec_database_path = os.path.relpath(bvec_path, self.project.folder)
-        self._process_associated_file(
-            database_data,
-            bvec_database_path,
-            original_md5_bvec,
-            TYPE_BVEC,
-            file_database_path,
-            tag_name,
-            documents,
-            values_added,
-        )
+        # bvec: 3 x N (or N x 3), bval: 1 x N (or N x 1)
+        if bvec is None or 3 not in bvec.shape:
+            nb_directions = None
 
-        # Process bval file
-        with open(bval_path, "rb") as bval_file:
-            original_md5_bval = hashlib.md5(bval_file.read()).hexdigest()
+        else:
+            nb_directions = bvec.shape[1 if bvec.shape[0] == 3 else 0]
 
-        bval_database_path = os.path.relpath(bval_path, self.project.folder)
-        self._process_associated_file(
-            database_data,
-            bval_database_path,
-            original_md5_bval,
-            TYPE_BVAL,
-            file_database_path,
-            tag_name,
-            documents,
-            values_added,
-        )
+        if (
+            nb_directions is None
+            or bval is None
+            or 1 not in bval.shape
+            or nb_directions != bval.size
+        ):
+            logger.warning(
+                "Inconsistent FSL gradient files for '%s': bvec %s, bval %s",
+                file_database_path,
+                None if bvec is None else bvec.shape,
+                None if bval is None else bval.shape,
+            )
+
+        for path, file_type in (
+            (bvec_path, TYPE_BVEC),
+            (bval_path, TYPE_BVAL),
+        ):
+            self._process_associated_file(
+                os.path.relpath(path, self.project.folder),
+                self._file_checksum(path),
+                file_type,
+                file_database_path,
+                tag_name,
+                documents,
+                values_added,
+            )
 
     def _process_list_values(self, tag_info):
         """
@@ -821,7 +981,12 @@ class ImportWorker(QThread):
         """
         Process each log entry to import scans.
 
-        :param list_dict_log: Log entries.
+        All the files of the entries are hashed beforehand in a thread pool
+        so that, with the existing documents and tags read once by
+        `_read_existing_data`, the scans can then be processed without any
+        database query or further file read (except for the JSON sidecars).
+
+        :param list_dict_log: Log entries of the exported scans.
         :type list_dict_log: list
         :param raw_data_folder: Path to the raw data folder.
         :type raw_data_folder: str
@@ -836,31 +1001,24 @@ class ImportWorker(QThread):
         """
         # List of tags to exclude
         tags_to_exclude = ["Dataset data file", "Dataset header file"]
+        self._compute_checksums(list_dict_log, raw_data_folder)
 
-        with self.project.database.data() as database_data:
-
-            for dict_log in list_dict_log:
-
-                if dict_log["StatusExport"] != "Export ok":
-                    continue
-
-                # Process the main scan file
-                file_name = dict_log["NameFile"]
-                self._process_scan_file(
-                    database_data,
-                    file_name,
-                    raw_data_folder,
-                    dict_log,
-                    documents,
-                    values_added,
-                    tags_added,
-                    tags_names_added,
-                    tags_to_exclude,
-                )
+        for dict_log in list_dict_log:
+            # Process the main scan file
+            file_name = dict_log["NameFile"]
+            self._process_scan_file(
+                file_name,
+                raw_data_folder,
+                dict_log,
+                documents,
+                values_added,
+                tags_added,
+                tags_names_added,
+                tags_to_exclude,
+            )
 
     def _process_mrtrix_format_file(
         self,
-        database_data,
         bvec_bval_path,
         file_database_path,
         tag_name,
@@ -870,8 +1028,6 @@ class ImportWorker(QThread):
         """
         Process MRtrix format bvec/bval file.
 
-        :param database_data: Context-Managed database.
-        :type database_data: DatabaseMiaData
         :param bvec_bval_path: Path to the MRtrix format file.
         :type bvec_bval_path: str
         :param file_database_path: Relative path of the main file.
@@ -883,18 +1039,19 @@ class ImportWorker(QThread):
         :param values_added: List to track added values.
         :type values_added: list
         """
-        with open(bvec_bval_path, "rb") as bval_bvec_file:
-            original_md5_bvec_bval = hashlib.md5(
-                bval_bvec_file.read()
-            ).hexdigest()
+        table = self._gradient_tables.get(bvec_bval_path)
+
+        # MRtrix gradient table: one [x, y, z, b] row per volume
+        if table is None or table.shape[1] != 4:
+            logger.warning(
+                "Invalid MRtrix gradient file for '%s': %s",
+                file_database_path,
+                None if table is None else table.shape,
+            )
 
-        bvec_bval_database_path = os.path.relpath(
-            bvec_bval_path, self.project.folder
-        )
         self._process_associated_file(
-            database_data,
-            bvec_bval_database_path,
-            original_md5_bvec_bval,
+            os.path.relpath(bvec_bval_path, self.project.folder),
+            self._file_checksum(bvec_bval_path),
             TYPE_BVEC_BVAL,
             file_database_path,
             tag_name,
@@ -904,7 +1061,6 @@ class ImportWorker(QThread):
 
     def _process_scan_file(
         self,
-        database_data,
         file_name,
         raw_data_folder,
         dict_log,
@@ -917,8 +1073,6 @@ class ImportWorker(QThread):
         """
         Process a single scan file and its associated files.
 
-        :param database_data: Context-Managed database.
-        :type database_data: DatabaseMiaData
         :param file_name: Base name of the scan file.
         :type file_name: str
         :param raw_data_folder: Path to the raw data folder.
@@ -940,14 +1094,11 @@ class ImportWorker(QThread):
         file_path = os.path.join(raw_data_folder, f"{file_name}.nii")
         file_database_path = os.path.relpath(file_path, self.project.folder)
 
-        # Calculate checksum
-        with open(file_path, "rb") as scan_file:
-            original_md5 = hashlib.md5(scan_file.read()).hexdigest()
-
+        # Checksum computed by _compute_checksums
+        original_md5 = self._file_checksum(file_path)
         # Check if document already exists
-        document_not_existing = not database_data.has_document(
-            collection_name=COLLECTION_CURRENT,
-            primary_key=file_database_path,
+        document_not_existing = (
+            file_database_path not in self._existing_documents
         )
 
         if document_not_existing:
@@ -962,7 +1113,6 @@ class ImportWorker(QThread):
         }
         # Process tags from file
         self._process_file_tags(
-            database_data,
             file_name,
             raw_data_folder,
             file_database_path,
@@ -986,7 +1136,6 @@ class ImportWorker(QThread):
         # Process associated bvec/bval files if they exist
         if dict_log.get("Bvec_bval") == "yes":
             self._process_associated_files(
-                database_data,
                 file_name,
                 raw_data_folder,
                 file_database_path,
@@ -996,66 +1145,187 @@ class ImportWorker(QThread):
                 tags_names_added,
             )
 
-    def _update_database(
-        self, documents, tags_added, values_added, historyMaker
-    ):
+    def _read_existing_data(self):
+        """
+        Read the existing documents, tags and default values once per import.
+
+        The names of the existing documents and tags are stored in
+        `_existing_documents` and `_existing_tags`, and the default values of
+        the user-defined tags in `_default_values`.
         """
-        Update the database with the processed documents.
+
+        with self.project.database.data() as database_data:
+            self._existing_documents = set(
+                database_data.get_document_names(COLLECTION_CURRENT)
+            )
+            self._existing_tags = set(
+                database_data.get_field_names(COLLECTION_CURRENT) or ()
+            )
+            self._default_values = {
+                tag["index"].split("|")[-1]: tag["default_value"]
+                for tag in database_data.get_field_attributes(
+                    COLLECTION_CURRENT
+                )
+                if tag["origin"] == TAG_ORIGIN_USER
+                and tag["default_value"] is not None
+            }
+
+    @staticmethod
+    def _read_import_file(path):
+        """
+        Hash a file of the import and, for a gradient file, parse it.
+
+        :param path: Path of the file.
+        :type path: str
+
+        :returns: The MD5 checksum of the file and, for a bvec/bval file, its
+         content as a 2D array (None otherwise, or if it can't be parsed).
+        :rtype: tuple[str, numpy.ndarray | None]
+        """
+
+        if path.endswith(".nii"):
+            return _md5_of_file(path), None
+
+        with open(path, "rb") as gradient_file:
+            data = gradient_file.read()
+
+        try:
+            table = np.loadtxt(io.BytesIO(data), ndmin=2)
+
+        except ValueError:
+            logger.warning("Unable to parse the gradient file '%s'", path)
+            table = None
+
+        return hashlib.md5(data).hexdigest(), table
+
+    def _record_history(self, values_added):
+        """
+        Record the import in the project history.
+
+        :param values_added: Values of the added scans, needed to redo the
+         import.
+        :type values_added: list | SpilledValues
+        """
+
+        with self.lock:
+            historyMaker = ["add_scans", self._scans_added, values_added]
+
+        self.project.undos.append(historyMaker)
+        self.project.redos.clear()
+
+    def _update_database(self, documents, tags_added):
+        """
+        Write a chunk of processed documents to the database.
+
+        The documents that already exist are replaced, and the new documents
+        and tags are then known as existing for the following chunks.
 
         :param documents: Dictionary containing document information.
         :type documents: dict
         :param tags_added: List of tags to add.
         :type tags_added: list
-        :param values_added: List of values to add.
-        :type values_added: list
-        :param historyMaker: List for history tracking.
-        :type historyMaker: list
         """
-        # Emit progress updates
-        self.notifyProgress.emit(1)
-        sleep(0.1)
 
         with self.project.database.schema() as database_schema:
+            # Add fields
+            database_schema.add_field(tags_added)
 
             with database_schema.data() as database_data:
 
-                # Add fields
-                database_schema.add_field(tags_added)
-                self.notifyProgress.emit(2)
-                sleep(0.1)
-                # Remove existing documents to avoid conflicts
-                current_paths = database_data.get_document_names(
-                    COLLECTION_CURRENT
-                )
+                for document, values in documents.items():
 
-            for document in documents:
+                    # Remove existing documents to avoid conflicts
+                    if document in self._existing_documents:
+                        database_data.remove_document(
+                            COLLECTION_CURRENT, document
+                        )
+                        database_data.remove_document(
+                            COLLECTION_INITIAL, document
+                        )
 
-                if document in current_paths:
-                    database_data.remove_document(COLLECTION_CURRENT, document)
-                    database_data.remove_document(COLLECTION_INITIAL, document)
+                    # Add document to current and initial collections
+                    database_data.set_value(
+                        collection_name=COLLECTION_CURRENT,
+                        primary_key=document,
+                        values_dict=values,
+                    )
+                    database_data.set_value(
+                        collection_name=COLLECTION_INITIAL,
+                        primary_key=document,
+                        values_dict=values,
+                    )
 
-                # Add document to current and initial collections
-                database_data.set_value(
-                    collection_name=COLLECTION_CURRENT,
-                    primary_key=document,
-                    values_dict=documents[document],
-                )
-                database_data.set_value(
-                    collection_name=COLLECTION_INITIAL,
-                    primary_key=document,
-                    values_dict=documents[document],
-                )
+        self._existing_documents.update(documents)
+        self._existing_tags.update(tag["field_name"] for tag in tags_added)
 
-        self.notifyProgress.emit(3)
-        sleep(0.1)
 
-        # Update history
-        with self.lock:
-            historyMaker.append(self._scans_added)
+class SpilledValues:
+    """
+    Append-only list of values stored in a temporary file.
 
-        historyMaker.append(values_added)
-        self.project.undos.append(historyMaker)
-        self.project.redos.clear()
+    It holds the values of the history of a large import, which are only
+    needed to redo the import, so that they don't stay in memory. Values
+    are pickled by batches and read back lazily when iterated. The file is
+    removed when the object is garbage collected.
+
+    Contains:
+        Methods:
+            - __iter__: iterate over the stored values.
+            - __len__: give the number of stored values.
+            - extend: append values to the file.
+    """
+
+    def __init__(self):
+        """Create the temporary file holding the values."""
+        fd, self.path = tempfile.mkstemp(prefix="mia_import_", suffix=".pkl")
+        os.close(fd)
+        self._length = 0
+        self._finalizer = weakref.finalize(self, os.remove, self.path)
+
+    def __iter__(self):
+        """
+        Iterate over the stored values.
+
+        :returns: An iterator on the values, in the order they were added.
+        :rtype: Iterator
+        """
+
+        with open(self.path, "rb") as spill_file:
+
+            while True:
+
+                try:
+                    batch = pickle.load(spill_file)
+
+                except EOFError:
+                    return
+
+                yield from batch
+
+    def __len__(self):
+        """
+        Give the number of stored values.
+
+        :returns: The number of values.
+        :rtype: int
+        """
+        return self._length
+
+    def extend(self, values):
+        """
+        Append values to the file.
+
+        :param values: Values to append.
+        :type values: list
+        """
+
+        if not values:
+            return
+
+        with open(self.path, "ab") as spill_file:
+            pickle.dump(values, spill_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._length += len(values)
 
 
 def read_log(project, main_window):
@@ -1064,7 +1334,8 @@ def read_log(project, main_window):
 
     This function shows the evolution of the progress bar while loading data
     files and returns a list of paths to each data file that was successfully
-    loaded.
+    loaded. If the import failed, a warning tells how many scans were
+    imported before the failure.
 
     :param project: The current project instance in the software.
     :type project: Project
@@ -1084,6 +1355,21 @@ def read_log(project, main_window):
     with main_window.progress.worker.lock:
         scans_added = list(main_window.progress.worker.scans_added)
 
+    if main_window.progress.failure is not None:
+        scans_imported, error = main_window.progress.failure
+        main_window.msg = QMessageBox()
+        main_window.msg.setIcon(QMessageBox.Warning)
+        main_window.msg.setText("- Import failed! -")
+        main_window.msg.setInformativeText(
+            f"The import failed after {scans_imported} scan(s) were "
+            f"imported:\n{error}\nThe imported scans are kept, and can be "
+            f"removed with Undo."
+        )
+        main_window.msg.setWindowTitle("Warning: import failed!")
+        main_window.msg.setStandardButtons(QMessageBox.Ok)
+        main_window.msg.buttonClicked.connect(main_window.msg.close)
+        main_window.msg.show()
+
     return scans_added
 
 
@@ -24,6 +24,8 @@ The module is designed to:
 # for details.
 ##########################################################################
 
+import threading
+from collections import OrderedDict
 from contextlib import contextmanager
 
 # populse_db import
@@ -37,13 +39,43 @@ from populse_mia.data_manager import (
     FIELD_TYPE_BOOLEAN,
     FIELD_TYPE_STRING,
 )
+from populse_mia.data_manager.query import In, Predicate
+from populse_mia.data_manager.scan_set import ScanSet
 
 __all__ = [
+    "ChangeSet",
+    "QueryCache",
     "DatabaseMIA",
     "DatabaseMiaSchema",
     "DatabaseMiaData",
 ]
 
+#: Maximum number of primary keys in a single IN query.
+MAX_KEYS_PER_QUERY = 500
+
+#: Number of query results kept by the query cache of a database.
+QUERY_CACHE_SIZE = 32
+
+#: Kinds of change of a document or a field recorded by a ChangeSet.
+CHANGE_ADDED = "added"
+CHANGE_MODIFIED = "modified"
+CHANGE_REMOVED = "removed"
+
+#: Change recorded for an item already changed since the recording started,
+#: by (previous change, new change). None drops the item (added, then
+#: removed).
+MERGED_CHANGES = {
+    (CHANGE_ADDED, CHANGE_ADDED): CHANGE_ADDED,
+    (CHANGE_ADDED, CHANGE_MODIFIED): CHANGE_ADDED,
+    (CHANGE_ADDED, CHANGE_REMOVED): None,
+    (CHANGE_MODIFIED, CHANGE_ADDED): CHANGE_MODIFIED,
+    (CHANGE_MODIFIED, CHANGE_MODIFIED): CHANGE_MODIFIED,
+    (CHANGE_MODIFIED, CHANGE_REMOVED): CHANGE_REMOVED,
+    (CHANGE_REMOVED, CHANGE_ADDED): CHANGE_MODIFIED,
+    (CHANGE_REMOVED, CHANGE_MODIFIED): CHANGE_MODIFIED,
+    (CHANGE_REMOVED, CHANGE_REMOVED): CHANGE_REMOVED,
+}
+
 
 # Shema (not in use currently)
 # schemas = [
@@ -127,17 +159,329 @@ __all__ = [
 # ]
 
 
+class ChangeSet:
+    """
+    Record of the documents and fields added, modified and removed in a
+    database.
+
+    A change set registered with DatabaseMIA.add_change_set records the
+    changes made through the data and schema interfaces, from any thread,
+    so that a view of the database can apply them as deltas instead of
+    reading everything again. Successive changes of the same item are
+    merged (see MERGED_CHANGES): a document added then modified is added,
+    a document added then removed is forgotten.
+
+    Contains:
+        Methods:
+            - __bool__: Returns True if changes were recorded.
+            - _record: Records changes of items.
+            - clear: Forgets the recorded changes.
+            - documents: Returns the documents changed in a given way.
+            - fields: Returns the fields changed in a given way.
+            - record_documents: Records changes of documents.
+            - record_fields: Records changes of fields.
+            - take: Returns the recorded changes and forgets them.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty ChangeSet.
+        """
+        self._lock = threading.Lock()
+        # Change of each document and each field, by collection name
+        self._documents = {}
+        self._fields = {}
+
+    def __bool__(self):
+        """
+        Returns True if changes were recorded.
+
+        :returns: False if no document nor field changed.
+        :rtype: bool
+        """
+
+        with self._lock:
+            return any(self._documents.values()) or any(self._fields.values())
+
+    def _record(self, changes, collection_name, items, change):
+        """
+        Records changes of items, merged with their previous changes.
+
+        :param changes: The changes of the items, by collection name.
+        :type changes: dict[str, dict[str, str]]
+        :param collection_name: The collection of the items.
+        :type collection_name: str
+        :param items: The primary keys or field names of the items.
+        :type items: Iterable[str]
+        :param change: CHANGE_ADDED, CHANGE_MODIFIED or CHANGE_REMOVED.
+        :type change: str
+        """
+
+        with self._lock:
+            collection_changes = changes.setdefault(collection_name, {})
+
+            for item in items:
+                previous = collection_changes.get(item)
+
+                if previous is None:
+                    collection_changes[item] = change
+
+                elif (merged := MERGED_CHANGES[previous, change]) is None:
+                    del collection_changes[item]
+
+                else:
+                    collection_changes[item] = merged
+
+    def clear(self):
+        """
+        Forgets the recorded changes.
+        """
+
+        with self._lock:
+            self._documents = {}
+            self._fields = {}
+
+    def documents(self, collection_name, change):
+        """
+        Returns the documents of a collection changed in a given way.
+
+        :param collection_name: The collection of the documents.
+        :type collection_name: str
+        :param change: CHANGE_ADDED, CHANGE_MODIFIED or CHANGE_REMOVED.
+        :type change: str
+
+        :returns: The primary keys of the documents.
+        :rtype: set[str]
+        """
+
+        with self._lock:
+            return {
+                primary_key
+                for primary_key, document_change in self._documents.get(
+                    collection_name, {}
+                ).items()
+                if document_change == change
+            }
+
+    def fields(self, collection_name, change):
+        """
+        Returns the fields of a collection changed in a given way.
+
+        :param collection_name: The collection of the fields.
+        :type collection_name: str
+        :param change: CHANGE_ADDED, CHANGE_MODIFIED or CHANGE_REMOVED.
+        :type change: str
+
+        :returns: The names of the fields.
+        :rtype: set[str]
+        """
+
+        with self._lock:
+            return {
+                field_name
+                for field_name, field_change in self._fields.get(
+                    collection_name, {}
+                ).items()
+                if field_change == change
+            }
+
+    def record_documents(self, collection_name, primary_keys, change):
+        """
+        Records changes of documents.
+
+        :param collection_name: The collection of the documents.
+        :type collection_name: str
+        :param primary_keys: The primary keys of the documents.
+        :type primary_keys: Iterable[str]
+        :param change: CHANGE_ADDED, CHANGE_MODIFIED or CHANGE_REMOVED.
+        :type change: str
+        """
+        self._record(self._documents, collection_name, primary_keys, change)
+
+    def record_fields(self, collection_name, field_names, change):
+        """
+        Records changes of fields.
+
+        :param collection_name: The collection of the fields.
+        :type collection_name: str
+        :param field_names: The names of the fields.
+        :type field_names: Iterable[str]
+        :param change: CHANGE_ADDED or CHANGE_REMOVED.
+        :type change: str
+        """
+        self._record(self._fields, collection_name, field_names, change)
+
+    def take(self):
+        """
+        Returns the recorded changes and forgets them, atomically.
+
+        :returns: A new change set holding the recorded changes.
+        :rtype: ChangeSet
+        """
+        taken = ChangeSet()
+
+        with self._lock:
+            taken._documents, self._documents = self._documents, {}
+            taken._fields, self._fields = self._fields, {}
+
+        return taken
+
+
+class QueryCache:
+    """
+    Least recently used cache of query results, for the last revision of a
+    database.
+
+    The results are stored with the revision of the database they were
+    computed for. A result of an older revision is never returned nor
+    stored, and the cache is emptied when a newer revision is seen, so a
+    change of the database invalidates all the results. The cache can be
+    used from several threads.
+
+    Contains:
+        Methods:
+            - __init__: Initializes an empty cache.
+            - __len__: Returns the number of cached results.
+            - _update_revision: Empties the cache for a newer revision.
+            - clear: Removes all the cached results.
+            - get: Returns the cached result of a query.
+            - put: Caches the result of a query.
+    """
+
+    def __init__(self, max_size=QUERY_CACHE_SIZE):
+        """
+        Initializes an empty cache.
+
+        :param max_size: The maximum number of results kept, the least
+         recently used results being dropped first.
+        :type max_size: int
+        """
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._revision = None
+        self._results = OrderedDict()
+
+    def __len__(self):
+        """
+        Returns the number of cached results.
+
+        :returns: The number of results.
+        :rtype: int
+        """
+        return len(self._results)
+
+    def _update_revision(self, revision):
+        """
+        Empties the cache if a revision is newer than the cached results.
+
+        Must be called with the lock held.
+
+        :param revision: The revision of the database.
+        :type revision: int
+
+        :returns: False if the revision is older than the cached results.
+        :rtype: bool
+        """
+
+        if self._revision is None or revision > self._revision:
+            self._results.clear()
+            self._revision = revision
+
+        return revision == self._revision
+
+    def clear(self):
+        """
+        Removes all the cached results.
+        """
+
+        with self._lock:
+            self._results.clear()
+
+    def get(self, key, revision):
+        """
+        Returns the cached result of a query.
+
+        :param key: The key of the query, hashable.
+        :type key: Hashable
+        :param revision: The current revision of the database.
+        :type revision: int
+
+        :returns: The result, or None if it isn't cached for the revision.
+        :rtype: Any
+        """
+
+        with self._lock:
+
+            if not self._update_revision(revision):
+                return None
+
+            result = self._results.get(key)
+
+            if result is not None:
+                self._results.move_to_end(key)
+
+            return result
+
+    def put(self, key, revision, result):
+        """
+        Caches the result of a query.
+
+        :param key: The key of the query, hashable.
+        :type key: Hashable
+        :param revision: The revision of the database the result was
+         computed for, read before running the query.
+        :type revision: int
+        :param result: The result, not None.
+        :type result: Any
+        """
+
+        with self._lock:
+
+            if not self._update_revision(revision):
+                return
+
+            self._results[key] = result
+            self._results.move_to_end(key)
+
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+
+
 class DatabaseMIA:
     """
     Class providing tools for interacting with a database, under the
     supervision of populse_db.
 
+    The documents written through the data and schema interfaces are
+    reported to the change listeners (see add_change_listener) and recorded
+    in the registered change sets (see add_change_set), so that the
+    in-memory structures built over the database can be updated
+    incrementally. Each change also increments the revision of the
+    database, which identifies its content for the caches of query results
+    (see query_cache).
+
+    The database can be used from several threads (e.g. the workers of the
+    data browser): each thread opens its sessions on its own storage, see
+    _thread_storage.
+
     Contains:
         Methods:
             - __enter__: Make a database connection and return it.
             - __exit__: Make sure the database connection gets closed.
+            - _next_revision: Increments the revision of the database.
+            - _thread_storage: Returns the storage of the current thread.
+            - add_change_listener: Registers a callable notified of the
+              changed documents.
+            - add_change_set: Registers a change set recording the changes.
             - close: Releases database resources.
             - data: Context manager for accessing the database data
+            - documents_changed: Notifies the change listeners of changed
+              documents.
+            - fields_changed: Notifies the change listeners of added or
+              removed fields.
+            - remove_change_listener: Unregisters a change listener.
+            - remove_change_set: Unregisters a change set.
+            - revision: The revision of the database content.
             - schema: Context manager for accessing the database schema.
     """
 
@@ -155,6 +499,17 @@ class DatabaseMIA:
         """
         # Initialize the storage with the provided database engine
         self.storage = Storage(database_engine)
+        # Storage of each thread, see _thread_storage
+        self._database_engine = database_engine
+        self._thread_local = threading.local()
+        self._thread_local.storage = self.storage
+        self._change_listeners = []
+        self._change_sets = []
+        # Incremented on every change, see revision
+        self._revision = 0
+        self._revision_lock = threading.Lock()
+        # Results of the filters, see DatabaseMiaData.filter_document_names
+        self.query_cache = QueryCache()
 
         # with self.storage.schema() as schema:
         #     schema.add_schema(schema_name)
@@ -195,6 +550,68 @@ class DatabaseMIA:
         """
         self.close()
 
+    def _next_revision(self):
+        """
+        Increments the revision of the database.
+        """
+
+        with self._revision_lock:
+            self._revision += 1
+
+    def _thread_storage(self):
+        """
+        Returns the storage of the current thread.
+
+        A populse_db storage shares its open data session with all the
+        sessions opened meanwhile, whatever their thread: the sessions of
+        two threads would collide (a write session can't be opened during
+        a read session, and a session can be closed while the other thread
+        uses it). The thread that created the database uses storage, and
+        each other thread gets its own storage on the same database, so
+        its sessions have their own connection; SQLite then makes a write
+        wait for the reads in progress, and conversely.
+
+        :returns: The storage, or None once the database is closed.
+        :rtype: populse_db.storage.Storage | None
+        """
+
+        if self.storage is None:
+            return None
+
+        storage = getattr(self._thread_local, "storage", None)
+
+        if storage is None:
+            storage = Storage(self._database_engine)
+            self._thread_local.storage = storage
+
+        return storage
+
+    def add_change_listener(self, listener):
+        """
+        Registers a callable notified of the documents changed in the
+        database.
+
+        The listener is called with the collection name and the primary keys
+        of the documents added, modified or removed, or with None as primary
+        keys when all the documents of the collection may have changed (a
+        field was added or removed). It can be called from any thread that
+        writes to the database, and must therefore be cheap and thread-safe.
+
+        :param listener: The callable, as listener(collection_name,
+         primary_keys).
+        :type listener: Callable[[str, list[str] | None], None]
+        """
+        self._change_listeners.append(listener)
+
+    def add_change_set(self, change_set):
+        """
+        Registers a change set recording the changes of the database.
+
+        :param change_set: The change set.
+        :type change_set: ChangeSet
+        """
+        self._change_sets.append(change_set)
+
     def close(self):
         """
         Closes any open resources or connections held by the instance.
@@ -220,9 +637,104 @@ class DatabaseMIA:
         :yields: The data interface for the database.
         :rtype: DatabaseMiaData
         """
+        revision = self._revision
+
+        try:
+
+            with self._thread_storage().data(
+                write=write, create=create
+            ) as data:
+                yield DatabaseMiaData(data, self)
+
+        finally:
+
+            # Results cached by another thread during the session may
+            # predate its changes, which are only visible once committed
+            if self._revision != revision:
+                self._next_revision()
+
+    def documents_changed(
+        self, collection_name, primary_keys=None, change=CHANGE_MODIFIED
+    ):
+        """
+        Notifies the change listeners of changed documents, and records the
+        change in the change sets.
+
+        :param collection_name: The collection of the documents.
+        :type collection_name: str
+        :param primary_keys: The primary keys of the documents, or None if
+         all the documents of the collection may have changed.
+        :type primary_keys: list[str] | None
+        :param change: How the documents changed: CHANGE_ADDED,
+         CHANGE_MODIFIED or CHANGE_REMOVED.
+        :type change: str
+        """
+        self._next_revision()
+
+        if primary_keys is not None:
+
+            for change_set in list(self._change_sets):
+                change_set.record_documents(
+                    collection_name, primary_keys, change
+                )
+
+        for listener in list(self._change_listeners):
+            listener(collection_name, primary_keys)
+
+    def fields_changed(self, collection_name, field_names, change):
+        """
+        Notifies the change listeners of added or removed fields (all the
+        documents of the collection may have changed), and records the
+        change in the change sets.
+
+        :param collection_name: The collection of the fields.
+        :type collection_name: str
+        :param field_names: The names of the fields.
+        :type field_names: list[str]
+        :param change: CHANGE_ADDED or CHANGE_REMOVED.
+        :type change: str
+        """
+
+        for change_set in list(self._change_sets):
+            change_set.record_fields(collection_name, field_names, change)
+
+        self.documents_changed(collection_name)
+
+    def remove_change_listener(self, listener):
+        """
+        Unregisters a change listener.
+
+        :param listener: The callable given to add_change_listener.
+        :type listener: Callable[[str, list[str] | None], None]
+        """
+
+        if listener in self._change_listeners:
+            self._change_listeners.remove(listener)
+
+    def remove_change_set(self, change_set):
+        """
+        Unregisters a change set.
+
+        :param change_set: The change set given to add_change_set.
+        :type change_set: ChangeSet
+        """
+
+        if change_set in self._change_sets:
+            self._change_sets.remove(change_set)
+
+    @property
+    def revision(self):
+        """
+        The revision of the database content.
+
+        The revision changes whenever documents or fields are added,
+        modified or removed through this instance, so query results can be
+        cached for a revision.
 
-        with self.storage.data(write=write, create=create) as data:
-            yield DatabaseMiaData(data)
+        :returns: The revision.
+        :rtype: int
+        """
+        return self._revision
 
     @contextmanager
     def schema(self):
@@ -236,8 +748,17 @@ class DatabaseMIA:
         :rtype: DatabaseMiaSchema
         """
 
-        with self.storage.schema() as schema:
-            yield DatabaseMiaSchema(schema)
+        revision = self._revision
+
+        try:
+
+            with self._thread_storage().schema() as schema:
+                yield DatabaseMiaSchema(schema, self)
+
+        finally:
+
+            if self._revision != revision:
+                self._next_revision()
 
 
 class DatabaseMiaSchema:
@@ -263,14 +784,17 @@ class DatabaseMiaSchema:
               the database.
     """
 
-    def __init__(self, storage_schema):
+    def __init__(self, storage_schema, database=None):
         """
         Initializes the DatabaseMiaSchema instance.
 
         :param storage_schema: The schema storage interface for the database.
         :type storage_schema: populse_db.storage.Storage
+        :param database: The database notified of the changed documents.
+        :type database: DatabaseMIA | None
         """
         self.storage_schema = storage_schema
+        self.database = database
 
     def add_collection(
         self,
@@ -355,6 +879,13 @@ class DatabaseMiaSchema:
                 field_type=field["field_type"],
             )
 
+            if self.database is not None:
+                self.database.fields_changed(
+                    field["collection_name"],
+                    [field["field_name"]],
+                    CHANGE_ADDED,
+                )
+
             self.update_field_attributes(
                 collection_name=field["collection_name"],
                 field_name=field["field_name"],
@@ -444,7 +975,7 @@ class DatabaseMiaSchema:
         """
 
         with self.storage_schema.data() as storage_data:
-            yield DatabaseMiaData(storage_data)
+            yield DatabaseMiaData(storage_data, self.database)
 
     def remove_field(self, collection_name, field_name):
         """
@@ -472,6 +1003,11 @@ class DatabaseMiaSchema:
                 f"collection '{collection_name}': {e}"
             )
 
+        if self.database is not None:
+            self.database.fields_changed(
+                collection_name, [field_name], CHANGE_REMOVED
+            )
+
         self.remove_field_attributes(collection_name, field_name)
 
     def remove_field_attributes(self, collection_name, field_name):
@@ -569,7 +1105,13 @@ class DatabaseMiaData:
 
     Contains:
         Methods:
+            - _document_changed: Notifies the database of a changed
+              document.
+            - _primary_key_filters: Returns the filters selecting documents
+              by primary keys.
             - add_document: Adds a document to a collection.
+            - filter_document_names: Retrieves the names of the documents
+              matching a filter, cached for the revision of the database.
             - filter_documents: Retrieves documents from a specified collection
               that match a given filter.
             - get_collection_names: Retrieves a list of all collection names in
@@ -585,24 +1127,80 @@ class DatabaseMiaData:
             - get_primary_key_name: Retrieves the primary key of the specified
               collection.
             - get_shown_tags: Returns the list of visible tags.
+            - get_sorted_document_names: Retrieves the document names sorted
+              by the values of one or more fields.
             - get_value: Retrieves the current value of a specific field.
+            - get_values: Retrieves the values of fields for several
+              documents.
             - has_collection: Checks if a collection exists in the database.
             - has_document: checks if a document exists in a collection.
             - remove_document: Removes a document from a specified collection.
+            - remove_documents: Removes several documents from a collection.
             - remove_value: Removes the value for a field.
             - set_shown_tags: Sets the list of visible tags.
             - set_value: Stores or updates a record in the specified
               collection.
+            - set_values: Stores or updates the values of several records
+              of a collection.
     """
 
-    def __init__(self, storage_data):
+    def __init__(self, storage_data, database=None):
         """
         Initializes a new instance of the DatabaseMiaData class.
 
         :param storage_data: The data storage interface for the database.
         :type storage_data: populse_db.storage.Storage
+        :param database: The database notified of the changed documents.
+        :type database: DatabaseMIA | None
         """
         self.storage_data = storage_data
+        self.database = database
+
+    def _document_changed(
+        self, collection_name, primary_key, change=CHANGE_MODIFIED
+    ):
+        """
+        Notifies the database of a changed document, if any.
+
+        :param collection_name: The collection of the document.
+        :type collection_name: str
+        :param primary_key: The primary key of the document.
+        :type primary_key: str
+        :param change: How the document changed: CHANGE_ADDED,
+         CHANGE_MODIFIED or CHANGE_REMOVED.
+        :type change: str
+        """
+
+        if self.database is not None:
+            self.database.documents_changed(
+                collection_name, [primary_key], change
+            )
+
+    def _primary_key_filters(self, collection_name, primary_keys):
+        """
+        Returns the filters selecting documents by their primary keys.
+
+        The keys are split into IN queries of at most MAX_KEYS_PER_QUERY
+        keys.
+
+        :param collection_name: The name of the collection of the documents.
+        :type collection_name: str
+        :param primary_keys: The primary keys of the documents.
+        :type primary_keys: list[str]
+
+        :returns: The filter queries.
+        :rtype: list[str]
+        """
+        primary_key_field = self.get_primary_key_name(collection_name)
+        queries = []
+
+        for start in range(0, len(primary_keys), MAX_KEYS_PER_QUERY):
+            end = start + MAX_KEYS_PER_QUERY
+            queries.append(
+                In(primary_key_field, primary_keys[start:end]).compile()
+            )
+
+        return queries
 
     def add_document(self, collection_name, document):
         """
@@ -625,8 +1223,72 @@ class DatabaseMiaData:
             self.storage_data[collection_name][document] = {
                 primary_key: document
             }
+            self._document_changed(collection_name, document, CHANGE_ADDED)
+
+    def filter_document_names(
+        self, collection_name, filter_query, primary_keys=None
+    ):
+        """
+        Retrieves the names of the documents matching a filter.
+
+        The names matching the filter are read once for a revision of the
+        database and kept in its query cache, by collection and filter.
+        The restrictions to given documents are computed from them, and also
+        cached, so applying an unchanged filter again doesn't query the
+        database.
+
+        :param collection_name: The name of the collection to filter (must
+         exist).
+        :type collection_name: str
+        :param filter_query: The filter query to apply (see
+         filter_documents).
+        :type filter_query: str | Predicate
+        :param primary_keys: The documents the result is restricted to, or
+         None for all the documents.
+        :type primary_keys: Iterable[str] | None
+
+        :returns: The names of the matching documents, in the order of the
+         database.
+        :rtype: ScanSet
+        """
+
+        if isinstance(filter_query, Predicate):
+            filter_query = filter_query.compile()
 
-    def filter_documents(self, collection_name, filter_query):
+        if primary_keys is not None:
+            primary_keys = ScanSet.of(primary_keys)
+
+        cache = None if self.database is None else self.database.query_cache
+        # Read first: a change during the query must not be cached as its
+        # result
+        revision = None if cache is None else self.database.revision
+        key = (collection_name, filter_query, primary_keys)
+        names = None if cache is None else cache.get(key, revision)
+
+        if names is not None:
+            return names
+
+        if primary_keys is None:
+            primary_key = self.get_primary_key_name(collection_name)
+            names = ScanSet(
+                document[primary_key]
+                for document in self.filter_documents(
+                    collection_name, filter_query, fields=[primary_key]
+                )
+            )
+
+        else:
+            names = (
+                self.filter_document_names(collection_name, filter_query)
+                & primary_keys
+            )
+
+        if cache is not None:
+            cache.put(key, revision, names)
+
+        return names
+
+    def filter_documents(self, collection_name, filter_query, fields=None):
         """
         Retrieve documents from a specified collection that match a given
         filter.
@@ -636,7 +1298,7 @@ class DatabaseMiaData:
         from the collection table.
 
         The `filter_query` can either be:
-            - The result of `self.filter_query()`.
+            - A predicate (see `populse_mia.data_manager.query`).
             - A string defining a filter.
 
         **Filter Query Format:**
@@ -660,7 +1322,10 @@ class DatabaseMiaData:
          exist).
         :type collection_name: str
         :param filter_query: The filter query to apply.
-        :type filter_query: str
+        :type filter_query: str | Predicate
+        :param fields: The fields to read from the matching documents, or
+         None for all the fields.
+        :type fields: list[str] | None
 
         :returns: A list of rows matching the filter criteria.
         :rtype: list
@@ -680,7 +1345,12 @@ class DatabaseMiaData:
         #       we are not exploring the use of yield. However, it will
         #       likely need to be implemented later for memory
         #       management reasons.
-        return self.storage_data[collection_name].search(filter_query)
+        if isinstance(filter_query, Predicate):
+            filter_query = filter_query.compile()
+
+        return self.storage_data[collection_name].search(
+            filter_query, fields=fields
+        )
 
     def get_collection_names(self):
         """
@@ -701,6 +1371,11 @@ class DatabaseMiaData:
         primary keys and selecting specific fields. If the collection does not
         exist, an empty list is returned.
 
+        The documents of the given primary keys are fetched with IN queries
+        of at most MAX_KEYS_PER_QUERY keys, and only the selected fields are
+        read from the database (the fields missing from a document are
+        None).
+
         :param collection_name: Name of the document collection. The collection
          must already exist in the database.
         :type collection_name: str
@@ -719,29 +1394,33 @@ class DatabaseMiaData:
         if not self.has_collection(collection_name):
             return []
 
-        documents = self.storage_data[collection_name].get()
+        collection = self.storage_data[collection_name]
+
+        # Select specific fields if provided
+        if fields:
+            fields = list(
+                dict.fromkeys(fields if isinstance(fields, list) else [fields])
+            )
+
+        else:
+            fields = None
 
         # Filter by primary keys if provided
-        if primary_keys:
-            primary_key_field = self.get_primary_key_name(collection_name)
-            primary_keys = (
-                set(primary_keys)
+        if not primary_keys:
+            return collection.get(fields=fields)
+
+        primary_keys = list(
+            dict.fromkeys(
+                primary_keys
                 if isinstance(primary_keys, list)
-                else {primary_keys}
+                else [primary_keys]
             )
-            documents = [
-                doc
-                for doc in documents
-                if doc.get(primary_key_field) in primary_keys
-            ]
+        )
 
-        # Select specific fields if provided
-        if fields:
-            fields = set(fields) if isinstance(fields, list) else {fields}
-            documents = [
-                {field: doc.get(field) for field in fields}
-                for doc in documents
-            ]
+        documents = []
+
+        for query in self._primary_key_filters(collection_name, primary_keys):
+            documents.extend(collection.search(query, fields=fields))
 
         return documents
 
@@ -876,6 +1555,67 @@ class DatabaseMiaData:
 
         return visible_names
 
+    def get_sorted_document_names(
+        self, collection_name, fields, descending=False, primary_keys=None
+    ):
+        """
+        Retrieve the document names sorted by the values of one or more
+        fields.
+
+        Only the primary key and the sorted fields are read, with a single
+        query. The values are compared with their database types (numbers
+        numerically, dates chronologically, lists element by element); the
+        values of a field that can't be compared together (mixed types) are
+        compared as strings. The documents without value for a field come
+        last for this field, whatever the direction. The sort is stable.
+
+        :param collection_name: The name of the collection.
+        :type collection_name: str
+        :param fields: The field, or the list of fields (primary first), to
+         sort by.
+        :type fields: str | list[str]
+        :param descending: True to sort in descending order.
+        :type descending: bool
+        :param primary_keys: The documents to sort (all the documents of the
+         collection if None).
+        :type primary_keys: list[str] | None
+
+        :returns: The sorted document names (the primary keys without
+         document are left out).
+        :rtype: list[str]
+        """
+
+        if not self.has_collection(collection_name) or primary_keys == []:
+            return []
+
+        fields = fields if isinstance(fields, list) else [fields]
+        primary_key = self.get_primary_key_name(collection_name)
+        documents = self.get_document(
+            collection_name, primary_keys, fields=[primary_key, *fields]
+        )
+        names = [document[primary_key] for document in documents]
+
+        # Sort by the least significant field first, the sorts are stable
+        for field in reversed(fields):
+            values = {
+                document[primary_key]: document.get(field)
+                for document in documents
+            }
+            defined = [name for name in names if values[name] is not None]
+            undefined = [name for name in names if values[name] is None]
+
+            try:
+                defined.sort(key=values.get, reverse=descending)
+
+            except TypeError:
+                defined.sort(
+                    key=lambda name: str(values[name]), reverse=descending
+                )
+
+            names = defined + undefined
+
+        return names
+
     def get_value(self, collection_name, primary_key, field):
         """
         Retrieves the current value of a specific field in a document from
@@ -899,6 +1639,49 @@ class DatabaseMiaData:
         """
         return self.storage_data[collection_name][primary_key][field].get()
 
+    def get_values(self, collection_name, primary_keys, fields):
+        """
+        Retrieves the values of fields for several documents.
+
+        This is the bulk version of get_value: the documents are read with
+        get_document, in IN queries of at most MAX_KEYS_PER_QUERY keys, and
+        only the given fields are read.
+
+        :param collection_name: The name of the collection containing the
+         documents.
+        :type collection_name: str
+        :param primary_keys: The primary keys of the documents (possibly
+         repeated).
+        :type primary_keys: list[str]
+        :param fields: The names of the fields to retrieve.
+        :type fields: list[str]
+
+        :returns: For each primary key, the values of the fields, in order
+         (None for a missing document or value).
+        :rtype: list[list]
+        """
+
+        if not primary_keys:
+            return []
+
+        primary_key_field = self.get_primary_key_name(collection_name)
+        documents = {
+            document[primary_key_field]: document
+            for document in self.get_document(
+                collection_name,
+                list(primary_keys),
+                fields=[primary_key_field, *fields],
+            )
+        }
+        missing = {}
+        return [
+            [
+                documents.get(primary_key, missing).get(field)
+                for field in fields
+            ]
+            for primary_key in primary_keys
+        ]
+
     def has_collection(self, collection_name):
         """
         Checks if a collection with the specified name exists in the database.
@@ -946,6 +1729,9 @@ class DatabaseMiaData:
 
         try:
             del self.storage_data[collection_name][primary_key]
+            self._document_changed(
+                collection_name, primary_key, CHANGE_REMOVED
+            )
 
         except Exception as e:
             raise KeyError(
@@ -954,6 +1740,37 @@ class DatabaseMiaData:
                 f"collection '{collection_name}': {e}"
             )
 
+    def remove_documents(self, collection_name, primary_keys):
+        """
+        Remove several documents from a specified collection.
+
+        This is the bulk version of remove_document: the documents are
+        deleted with IN queries of at most MAX_KEYS_PER_QUERY keys, in the
+        current transaction, and the change listeners are notified once.
+        The keys of missing documents are ignored.
+
+        :param collection_name: The name of the collection containing the
+         documents.
+        :type collection_name: str
+        :param primary_keys: The unique identifiers of the documents to be
+         removed.
+        :type primary_keys: list[str]
+        """
+        primary_keys = list(dict.fromkeys(primary_keys))
+
+        if not primary_keys or not self.has_collection(collection_name):
+            return
+
+        collection = self.storage_data[collection_name]
+
+        for query in self._primary_key_filters(collection_name, primary_keys):
+            collection.search_and_delete(query)
+
+        if self.database is not None:
+            self.database.documents_changed(
+                collection_name, primary_keys, CHANGE_REMOVED
+            )
+
     def remove_value(self, collection_name, primary_key, field):
         """
         Removes the specified field from a document in the given collection,
@@ -974,6 +1791,7 @@ class DatabaseMiaData:
         try:
 
             del self.storage_data[collection_name][primary_key][field]
+            self._document_changed(collection_name, primary_key)
 
         except Exception as e:
             raise KeyError(
@@ -1018,9 +1836,9 @@ class DatabaseMiaData:
          corresponding data.
         :type values_dict: dict
         """
-        existing_record = (
-            self.storage_data[collection_name][primary_key].get() or {}
-        )
+        existing_record = self.storage_data[collection_name][primary_key].get()
+        change = CHANGE_ADDED if existing_record is None else CHANGE_MODIFIED
+        existing_record = existing_record or {}
         # Preserve non-null values from the existing record and update with
         # new values
         filtered_record = {
@@ -1028,3 +1846,54 @@ class DatabaseMiaData:
         }
         updated_record = {**filtered_record, **values_dict}
         self.storage_data[collection_name][primary_key] = updated_record
+        self._document_changed(collection_name, primary_key, change)
+
+    def set_values(self, collection_name, values):
+        """
+        Store or update the values of several records of a collection.
+
+        This is the bulk version of set_value, for multi-cell edits: the
+        existing records are found with a single query and only the given
+        fields are updated (no read-modify-write of each record), and the
+        change listeners are notified once per kind of change.
+
+        :param collection_name: The name of the collection where the records
+         will be stored or updated.
+        :type collection_name: str
+        :param values: The values to store, as a dictionary of dictionaries
+         of values by field name, by primary key.
+        :type values: dict[str, dict]
+        """
+
+        if not values:
+            return
+
+        primary_key_field = self.get_primary_key_name(collection_name)
+        existing = {
+            document[primary_key_field]
+            for document in self.get_document(
+                collection_name, list(values), fields=[primary_key_field]
+            )
+        }
+        collection = self.storage_data[collection_name]
+
+        for primary_key, values_dict in values.items():
+
+            if primary_key in existing:
+                collection[primary_key].update(values_dict)
+
+            else:
+                collection[primary_key] = dict(values_dict)
+
+        if self.database is None:
+            return
+
+        for change, primary_keys in (
+            (CHANGE_MODIFIED, [key for key in values if key in existing]),
+            (CHANGE_ADDED, [key for key in values if key not in existing]),
+        ):
+
+            if primary_keys:
+                self.database.documents_changed(
+                    collection_name, primary_keys, change
+                )
@@ -26,7 +26,8 @@ The `Filter` class supports:
 ##########################################################################
 
 # populse_mia import
-from populse_mia.data_manager import COLLECTION_CURRENT, TAG_FILENAME
+from populse_mia.data_manager import COLLECTION_CURRENT
+from populse_mia.data_manager.query import And
 from populse_mia.user_interface import data_browser
 
 __all__ = [
@@ -43,6 +44,7 @@ class Filter:
         Methods:
             - generate_filter: apply the filter to the given list of scans
             - json_format: returns the filter as a dictionary
+            - prepare_query: returns the query of the filter
 
     The advanced search creates a complex query to the database and is a
     combination of several "query lines" which are linked with AND or OR
@@ -88,6 +90,13 @@ class Filter:
         """
         Apply the filter to the given list of scans.
 
+        The rapid and advanced searches are combined into one query (see
+        prepare_query), which is run once. The scans restriction is applied
+        to the matching filenames rather than inlined in the query. The
+        results are kept in the query cache of the database for its revision
+        (see DatabaseMiaData.filter_document_names), so applying an
+        unchanged filter again doesn't query the database.
+
         :param current_project: Current project.
         :type current_project: populse_mia.data_manager.project.Project
         :param scans: List of scans to apply the filter into.
@@ -98,33 +107,12 @@ class Filter:
         :returns: The list of scans matching the filter.
         :rtype: list
         """
-
-        rapid_filter = data_browser.rapid_search.RapidSearch.prepare_filter(
-            self.search_bar, tags, scans
-        )
-
         with current_project.database.data() as database_data:
-            rapid_result = database_data.filter_documents(
-                COLLECTION_CURRENT, rapid_filter
+            names = database_data.filter_document_names(
+                COLLECTION_CURRENT, self.prepare_query(tags), scans
             )
-            rapid_list = [scan[TAG_FILENAME] for scan in rapid_result]
-            advanced_filter = (
-                data_browser.advanced_search.AdvancedSearch.prepare_filters(
-                    self.links,
-                    self.fields,
-                    self.conditions,
-                    self.values,
-                    self.nots,
-                    rapid_list,
-                )
-            )
-            advanced_result = database_data.filter_documents(
-                COLLECTION_CURRENT, advanced_filter
-            )
-
-        final_result = [scan[TAG_FILENAME] for scan in advanced_result]
 
-        return final_result
+        return list(names)
 
     def json_format(self):
         """
@@ -144,3 +132,27 @@ class Filter:
             "nots": self.nots,
         }
         return data
+
+    def prepare_query(self, tags):
+        """
+        Return the query of the filter, unrestricted to any scans.
+
+        :param tags: List of tags the rapid search looks in.
+        :type tags: list
+
+        :returns: The rapid search and advanced search predicates, combined
+         with AND.
+        :rtype: populse_mia.data_manager.query.Predicate
+        """
+        return And(
+            data_browser.rapid_search.RapidSearch.prepare_predicate(
+                self.search_bar, tags
+            ),
+            data_browser.advanced_search.AdvancedSearch.prepare_predicate(
+                self.links,
+                self.fields,
+                self.conditions,
+                self.values,
+                self.nots,
+            ),
+        )
@@ -1742,7 +1742,10 @@ class Project:
                     # We remove each scan added
                     database_data.add_document(COLLECTION_CURRENT, scan)
                     database_data.add_document(COLLECTION_INITIAL, scan)
-                    table.scans_to_visualize.append(scan)
+
+                table.scans_to_visualize = (
+                    table.scans_to_visualize | scans_added
+                )
 
                 # We add all the values.
                 # The third element is a list of the values to add
@@ -1803,6 +1806,8 @@ class Project:
                             values_dict={tag: new_value},
                         )
 
+                        table.update_cached_value(scan, tag, new_value)
+
                         if new_value is None:
                             font = item.font()
                             font.setItalic(True)
@@ -1821,7 +1826,7 @@ class Project:
                                 )["field_type"],
                             )
 
-                table.update_colors()
+                table.update_colors([scan for scan, *_ in modified_values])
 
             finally:
                 # Ensure signal is reconnected even if an error occurs
@@ -2075,14 +2080,13 @@ class Project:
             scans_added = to_undo[1]
 
             with self.database.data(write=True) as database_data:
+                # We remove the scans added
+                database_data.remove_documents(COLLECTION_CURRENT, scans_added)
+                database_data.remove_documents(COLLECTION_INITIAL, scans_added)
 
-                for scan in scans_added:
-                    # We remove each scan added
-                    database_data.remove_document(COLLECTION_CURRENT, scan)
-                    database_data.remove_document(COLLECTION_INITIAL, scan)
-                    table.removeRow(table.get_scan_row(scan))
-                    table.scans_to_visualize.remove(scan)
-
+            # Their rows, in one pass (removed from the visualized and
+            # searched scans too)
+            table._remove_rows(scans_added)
             safe_disconnect(table.itemChanged, table.on_cell_changed)
 
             try:
@@ -2118,6 +2122,8 @@ class Project:
                             database_data.remove_value(
                                 COLLECTION_INITIAL, scan, tag
                             )
+                            # The initial document changed too
+                            table.invalidate_scans([scan])
                             set_item_data(
                                 item, NOT_DEFINED_VALUE, FIELD_TYPE_STRING
                             )
@@ -2134,6 +2140,7 @@ class Project:
                                 primary_key=scan,
                                 values_dict={tag: old_value},
                             )
+                            table.update_cached_value(scan, tag, old_value)
                             set_item_data(
                                 item,
                                 old_value,
@@ -2150,7 +2157,7 @@ class Project:
                                 font.setBold(False)
                                 item.setFont(font)
 
-                table.update_colors()
+                table.update_colors([scan for scan, *_ in modified_values])
 
             finally:
                 # Ensure signal is reconnected even if an error occurs
@@ -0,0 +1,523 @@
+"""
+Typed predicates for querying the Mia database.
+
+This module provides small immutable predicate classes (`And`, `Or`, `Not`,
+`Compare`, `In`, `Between`, `Contains`, `IsNull`) from which the searches of
+Mia build their queries, instead of concatenating filter strings. A
+predicate compiles to a populse_db filter string in which every field name
+and literal is quoted and escaped, and the compiled string is kept by the
+predicate. Predicates are hashable and compare by value, so they can be used
+as cache keys, and `filter_documents` accepts them as queries.
+"""
+
+##########################################################################
+# Populse_mia - Copyright (C) IRMaGe/CEA, 2018
+# Distributed under the terms of the CeCILL license, as published by
+# the CEA-CNRS-INRIA. Refer to the LICENSE file or to
+# http://www.cecill.info/licences/Licence_CeCILL_V2.1-en.html
+# for details.
+##########################################################################
+
+from datetime import date, datetime, time
+
+__all__ = [
+    "Predicate",
+    "And",
+    "Or",
+    "Not",
+    "Compare",
+    "In",
+    "Between",
+    "Contains",
+    "IsNull",
+    "literal",
+]
+
+#: Comparison operators of the populse_db filters.
+COMPARE_OPERATORS = ("==", "!=", "<", ">", "<=", ">=", "LIKE", "ILIKE")
+
+
+def literal(value):
+    """
+    Return the populse_db filter literal of a value.
+
+    Strings are quoted and escaped, dates and times are given as quoted ISO
+    strings (as stored by the database) and lists are given item by item.
+    populse_db copies the string literals into its SQL queries between
+    single quotes, without escaping them: the single quotes are doubled
+    here.
+
+    :param value: The value.
+    :type value: str | int | float | bool | date | datetime | time | list |
+     tuple | None
+
+    :returns: The literal.
+    :rtype: str
+
+    :raises TypeError: If the value has no literal form.
+    """
+
+    if value is None:
+        return "null"
+
+    if isinstance(value, bool):
+        return "true" if value else "false"
+
+    if isinstance(value, (int, float)):
+        return repr(value)
+
+    if isinstance(value, (datetime, date, time)):
+        value = value.isoformat()
+
+    if isinstance(value, str):
+        escaped = (
+            value.replace("\\", "\\\\").replace('"', '\\"').replace("'", "''")
+        )
+        return f'"{escaped}"'
+
+    if isinstance(value, (list, tuple)):
+        return f"[{', '.join(literal(item) for item in value)}]"
+
+    raise TypeError(f"No filter literal for {type(value).__name__} values")
+
+
+def _field(name):
+    """
+    Return the populse_db filter reference to a field.
+
+    :param name: The field name.
+    :type name: str
+
+    :returns: The quoted field name.
+    :rtype: str
+
+    :raises ValueError: If the name can't be quoted.
+    """
+
+    if "}" in name:
+        raise ValueError(f"Field name {name!r} can't be used in a filter")
+
+    return f"{{{name}}}"
+
+
+def _freeze(value):
+    """
+    Return a hashable form of a literal value.
+
+    :param value: The value.
+    :type value: Any
+
+    :returns: The value, with the lists turned into tuples.
+    :rtype: Any
+    """
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+
+    return value
+
+
+class Predicate:
+    """
+    Base class of the predicates on the documents of a collection.
+
+    Subclasses give their operands to the base class initializer, and
+    implement _compile. The & and | operators and ~ build the And, Or and
+    Not predicates.
+
+    Contains:
+        Methods:
+            - __and__: Return the conjunction with another predicate.
+            - __eq__: Compare two predicates by value.
+            - __hash__: Hash the predicate by value.
+            - __init__: Store the operands of the predicate.
+            - __invert__: Return the negation of the predicate.
+            - __or__: Return the disjunction with another predicate.
+            - __repr__: Return the representation of the predicate.
+            - __str__: Return the compiled predicate.
+            - _compile: Build the populse_db filter of the predicate.
+            - compile: Return the populse_db filter of the predicate.
+    """
+
+    def __init__(self, *operands):
+        """
+        Store the operands of the predicate.
+
+        :param operands: The operands, hashable.
+        :type operands: Any
+        """
+        self._operands = operands
+        self._query = None
+
+    def __and__(self, other):
+        """
+        Return the conjunction with another predicate.
+
+        :param other: The other predicate.
+        :type other: Predicate
+
+        :returns: The conjunction.
+        :rtype: And
+        """
+        return And(self, other)
+
+    def __eq__(self, other):
+        """
+        Compare two predicates by value.
+
+        :param other: The other object.
+        :type other: Any
+
+        :returns: True if both are the same kind of predicate, with equal
+         operands.
+        :rtype: bool
+        """
+        return type(self) is type(other) and self._operands == other._operands
+
+    def __hash__(self):
+        """
+        Hash the predicate by value.
+
+        :returns: The hash.
+        :rtype: int
+        """
+        return hash((type(self), self._operands))
+
+    def __invert__(self):
+        """
+        Return the negation of the predicate.
+
+        :returns: The negation.
+        :rtype: Not
+        """
+        return Not(self)
+
+    def __or__(self, other):
+        """
+        Return the disjunction with another predicate.
+
+        :param other: The other predicate.
+        :type other: Predicate
+
+        :returns: The disjunction.
+        :rtype: Or
+        """
+        return Or(self, other)
+
+    def __repr__(self):
+        """
+        Return the representation of the predicate.
+
+        :returns: The class name and the operands.
+        :rtype: str
+        """
+        operands = ", ".join(repr(operand) for operand in self._operands)
+        return f"{type(self).__name__}({operands})"
+
+    def __str__(self):
+        """
+        Return the compiled predicate.
+
+        :returns: The populse_db filter.
+        :rtype: str
+        """
+        return self.compile()
+
+    def _compile(self):
+        """
+        Build the populse_db filter of the predicate.
+
+        :returns: The filter.
+        :rtype: str
+        """
+        raise NotImplementedError
+
+    def compile(self):
+        """
+        Return the populse_db filter of the predicate.
+
+        The filter is built on the first call and kept, the predicate being
+        immutable.
+
+        :returns: The filter.
+        :rtype: str
+        """
+
+        if self._query is None:
+            self._query = self._compile()
+
+        return self._query
+
+
+class And(Predicate):
+    """
+    Predicate true when all the given predicates are true (always true
+    without predicates).
+
+    Contains:
+        Methods:
+            - __init__: Initialize the conjunction.
+            - _compile: Build the populse_db filter of the conjunction.
+    """
+
+    def __init__(self, *predicates):
+        """
+        Initialize the conjunction.
+
+        :param predicates: The predicates.
+        :type predicates: Predicate
+        """
+        super().__init__(*predicates)
+
+    def _compile(self):
+        """
+        Build the populse_db filter of the conjunction.
+
+        :returns: The filter.
+        :rtype: str
+        """
+
+        if not self._operands:
+            return "ALL"
+
+        return " AND ".join(
+            f"({predicate.compile()})" for predicate in self._operands
+        )
+
+
+class Or(Predicate):
+    """
+    Predicate true when one of the given predicates is true (always false
+    without predicates).
+
+    Contains:
+        Methods:
+            - __init__: Initialize the disjunction.
+            - _compile: Build the populse_db filter of the disjunction.
+    """
+
+    def __init__(self, *predicates):
+        """
+        Initialize the disjunction.
+
+        :param predicates: The predicates.
+        :type predicates: Predicate
+        """
+        super().__init__(*predicates)
+
+    def _compile(self):
+        """
+        Build the populse_db filter of the disjunction.
+
+        :returns: The filter.
+        :rtype: str
+        """
+
+        if not self._operands:
+            return "NOT ALL"
+
+        return " OR ".join(
+            f"({predicate.compile()})" for predicate in self._operands
+        )
+
+
+class Not(Predicate):
+    """
+    Predicate true when the given predicate is false.
+
+    Contains:
+        Methods:
+            - __init__: Initialize the negation.
+            - _compile: Build the populse_db filter of the negation.
+    """
+
+    def __init__(self, predicate):
+        """
+        Initialize the negation.
+
+        :param predicate: The negated predicate.
+        :type predicate: Predicate
+        """
+        super().__init__(predicate)
+
+    def _compile(self):
+        """
+        Build the populse_db filter of the negation.
+
+        :returns: The filter.
+        :rtype: str
+        """
+        return f"NOT ({self._operands[0].compile()})"
+
+
+class Compare(Predicate):
+    """
+    Predicate comparing the value of a field with a value.
+
+    Contains:
+        Methods:
+            - __init__: Initialize the comparison.
+            - _compile: Build the populse_db filter of the comparison.
+    """
+
+    def __init__(self, field, operator, value):
+        """
+        Initialize the comparison.
+
+        :param field: The field name.
+        :type field: str
+        :param operator: The operator, one of COMPARE_OPERATORS.
+        :type operator: str
+        :param value: The value compared with.
+        :type value: Any
+
+        :raises ValueError: If the operator is unknown.
+        """
+
+        if operator.upper() not in COMPARE_OPERATORS:
+            raise ValueError(f"Unknown comparison operator: {operator}")
+
+        super().__init__(field, operator.upper(), _freeze(value))
+
+    def _compile(self):
+        """
+        Build the populse_db filter of the comparison.
+
+        :returns: The filter.
+        :rtype: str
+        """
+        field, operator, value = self._operands
+        return f"{_field(field)} {operator} {literal(value)}"
+
+
+class In(Predicate):
+    """
+    Predicate true when the value of a field is one of the given values.
+
+    Contains:
+        Methods:
+            - __init__: Initialize the membership test.
+            - _compile: Build the populse_db filter of the membership test.
+    """
+
+    def __init__(self, field, values):
+        """
+        Initialize the membership test.
+
+        :param field: The field name.
+        :type field: str
+        :param values: The values.
+        :type values: Iterable
+        """
+        super().__init__(field, _freeze(list(values)))
+
+    def _compile(self):
+        """
+        Build the populse_db filter of the membership test.
+
+        :returns: The filter.
+        :rtype: str
+        """
+        field, values = self._operands
+        return f"{_field(field)} IN {literal(values)}"
+
+
+class Between(Predicate):
+    """
+    Predicate true when the value of a field is within bounds (included).
+
+    Contains:
+        Methods:
+            - __init__: Initialize the range test.
+            - _compile: Build the populse_db filter of the range test.
+    """
+
+    def __init__(self, field, low, high):
+        """
+        Initialize the range test.
+
+        :param field: The field name.
+        :type field: str
+        :param low: The lower bound.
+        :type low: Any
+        :param high: The upper bound.
+        :type high: Any
+        """
+        super().__init__(field, _freeze(low), _freeze(high))
+
+    def _compile(self):
+        """
+        Build the populse_db filter of the range test.
+
+        :returns: The filter.
+        :rtype: str
+        """
+        field, low, high = self._operands
+        return And(
+            Compare(field, ">=", low), Compare(field, "<=", high)
+        ).compile()
+
+
+class Contains(Predicate):
+    """
+    Predicate true when the value of a field contains a pattern.
+
+    The pattern is a LIKE pattern, case-sensitive, where "%" stands for any
+    string and "_" for any character.
+
+    Contains:
+        Methods:
+            - __init__: Initialize the pattern test.
+            - _compile: Build the populse_db filter of the pattern test.
+    """
+
+    def __init__(self, field, pattern):
+        """
+        Initialize the pattern test.
+
+        :param field: The field name.
+        :type field: str
+        :param pattern: The pattern.
+        :type pattern: str
+        """
+        super().__init__(field, str(pattern))
+
+    def _compile(self):
+        """
+        Build the populse_db filter of the pattern test.
+
+        :returns: The filter.
+        :rtype: str
+        """
+        field, pattern = self._operands
+        return Compare(field, "LIKE", f"%{pattern}%").compile()
+
+
+class IsNull(Predicate):
+    """
+    Predicate true when a field has no value.
+
+    Contains:
+        Methods:
+            - __init__: Initialize the missing value test.
+            - _compile: Build the populse_db filter of the missing value
+              test.
+    """
+
+    def __init__(self, field):
+        """
+        Initialize the missing value test.
+
+        :param field: The field name.
+        :type field: str
+        """
+        super().__init__(field)
+
+    def _compile(self):
+        """
+        Build the populse_db filter of the missing value test.
+
+        :returns: The filter.
+        :rtype: str
+        """
+        return f"{_field(self._operands[0])} == null"
@@ -0,0 +1,335 @@
+"""
+Immutable ordered sets of scans.
+
+This module provides the `ScanSet` class, the scan selection shared by the
+data browser, the plug filters and the iteration table. A scan set keeps the
+order of its scans like a list, tests membership and finds positions in
+constant time like a dict, and gives the set algebra (intersection, union,
+difference) in linear time, keeping the order of its left operand. As it is
+immutable, it can be shared between the widgets without copies, and the
+query selecting its scans is built once.
+"""
+
+##########################################################################
+# Populse_mia - Copyright (C) IRMaGe/CEA, 2018
+# Distributed under the terms of the CeCILL license, as published by
+# the CEA-CNRS-INRIA. Refer to the LICENSE file or to
+# http://www.cecill.info/licences/Licence_CeCILL_V2.1-en.html
+# for details.
+##########################################################################
+
+from collections.abc import Sequence
+
+# populse_mia import
+from populse_mia.data_manager import TAG_FILENAME
+from populse_mia.data_manager.query import In
+
+__all__ = ["ScanSet"]
+
+
+class ScanSet(Sequence):
+    """
+    Immutable sequence of distinct scans, with constant time membership.
+
+    A ScanSet is built from any iterable of scans, the duplicates being
+    dropped (the first occurrence is kept). It compares equal to the lists
+    and tuples holding the same scans in the same order, so it can replace
+    the scan lists of the widgets.
+
+    Contains:
+        Methods:
+            - __and__: Return the intersection with other scans.
+            - __contains__: Test whether a scan is in the set.
+            - __eq__: Compare with another sequence of scans.
+            - __getitem__: Return a scan, or a scan set for a slice.
+            - __hash__: Hash the scan set.
+            - __init__: Initialize the scan set.
+            - __iter__: Iterate over the scans, in order.
+            - __len__: Return the number of scans.
+            - __or__: Return the union with other scans.
+            - __repr__: Return the representation of the scan set.
+            - __sub__: Return the difference with other scans.
+            - count: Return the number of occurrences of a scan.
+            - difference: Return the scans not in other scans.
+            - index: Return the position of a scan.
+            - intersection: Return the scans also in other scans.
+            - of: Return the given scans as a scan set.
+            - predicate: Return the predicate selecting the scans.
+            - union: Return the scans and the other scans.
+    """
+
+    __slots__ = ("_members", "_scans", "_hash", "_positions", "_predicate")
+
+    def __init__(self, scans=()):
+        """
+        Initialize the scan set.
+
+        :param scans: The scans, duplicates being dropped.
+        :type scans: Iterable[str]
+        """
+        self._members = dict.fromkeys(scans)
+        self._scans = tuple(self._members)
+        # Built on demand
+        self._hash = None
+        self._positions = None
+        self._predicate = None
+
+    def __and__(self, other):
+        """
+        Return the intersection with other scans.
+
+        :param other: The other scans.
+        :type other: Iterable[str]
+
+        :returns: The scans also in other, in the order of this set.
+        :rtype: ScanSet
+        """
+        return self.intersection(other)
+
+    def __contains__(self, scan):
+        """
+        Test whether a scan is in the set.
+
+        :param scan: The scan.
+        :type scan: str
+
+        :returns: True if the scan is in the set.
+        :rtype: bool
+        """
+
+        try:
+            return scan in self._members
+
+        except TypeError:
+            # Unhashable, can't be a scan
+            return False
+
+    def __eq__(self, other):
+        """
+        Compare with another sequence of scans.
+
+        :param other: The other object.
+        :type other: Any
+
+        :returns: True if other is a scan set, list or tuple holding the same
+         scans in the same order.
+        :rtype: bool
+        """
+
+        if isinstance(other, ScanSet):
+            return self._scans == other._scans
+
+        if isinstance(other, (list, tuple)):
+            return self._scans == tuple(other)
+
+        return NotImplemented
+
+    def __getitem__(self, index):
+        """
+        Return a scan, or a scan set for a slice.
+
+        :param index: The position or slice.
+        :type index: int | slice
+
+        :returns: The scan at the position, or the scans of the slice.
+        :rtype: str | ScanSet
+        """
+
+        if isinstance(index, slice):
+            return ScanSet(self._scans[index])
+
+        return self._scans[index]
+
+    def __hash__(self):
+        """
+        Hash the scan set.
+
+        The hash is computed on the first call, scan sets being used as
+        keys of the query cache.
+
+        :returns: The hash of the scans, in order.
+        :rtype: int
+        """
+
+        if self._hash is None:
+            self._hash = hash(self._scans)
+
+        return self._hash
+
+    def __iter__(self):
+        """
+        Iterate over the scans, in order.
+
+        :returns: The iterator.
+        :rtype: Iterator[str]
+        """
+        return iter(self._scans)
+
+    def __len__(self):
+        """
+        Return the number of scans.
+
+        :returns: The number of scans.
+        :rtype: int
+        """
+        return len(self._scans)
+
+    def __or__(self, other):
+        """
+        Return the union with other scans.
+
+        :param other: The other scans.
+        :type other: Iterable[str]
+
+        :returns: The scans of this set, then the other scans not in it.
+        :rtype: ScanSet
+        """
+        return self.union(other)
+
+    def __repr__(self):
+        """
+        Return the representation of the scan set.
+
+        :returns: The class name and the scans.
+        :rtype: str
+        """
+        return f"ScanSet({list(self._scans)!r})"
+
+    def __sub__(self, other):
+        """
+        Return the difference with other scans.
+
+        :param other: The other scans.
+        :type other: Iterable[str]
+
+        :returns: The scans not in other, in the order of this set.
+        :rtype: ScanSet
+        """
+        return self.difference(other)
+
+    def count(self, scan):
+        """
+        Return the number of occurrences of a scan.
+
+        :param scan: The scan.
+        :type scan: str
+
+        :returns: 1 if the scan is in the set, else 0.
+        :rtype: int
+        """
+        return int(scan in self)
+
+    def difference(self, other):
+        """
+        Return the scans not in other scans.
+
+        :param other: The other scans.
+        :type other: Iterable[str]
+
+        :returns: The scans not in other, in the order of this set.
+        :rtype: ScanSet
+        """
+        other = ScanSet.of(other)
+
+        if not other:
+            return self
+
+        return ScanSet(scan for scan in self._scans if scan not in other)
+
+    def index(self, scan, start=0, stop=None):
+        """
+        Return the position of a scan.
+
+        The positions are indexed on the first call.
+
+        :param scan: The scan.
+        :type scan: str
+        :param start: The first position searched.
+        :type start: int
+        :param stop: The position after the last one searched.
+        :type stop: int | None
+
+        :returns: The position of the scan.
+        :rtype: int
+
+        :raises ValueError: If the scan isn't in the set (between start and
+         stop).
+        """
+
+        if self._positions is None:
+            self._positions = {
+                scan: position for position, scan in enumerate(self._scans)
+            }
+
+        position = self._positions.get(scan) if scan in self else None
+        start, stop, _ = slice(start, stop).indices(len(self._scans))
+
+        if position is None or not start <= position < stop:
+            raise ValueError(f"{scan!r} is not in the scan set")
+
+        return position
+
+    def intersection(self, other):
+        """
+        Return the scans also in other scans.
+
+        :param other: The other scans.
+        :type other: Iterable[str]
+
+        :returns: The scans also in other, in the order of this set.
+        :rtype: ScanSet
+        """
+        other = ScanSet.of(other)
+        return ScanSet(scan for scan in self._scans if scan in other)
+
+    @classmethod
+    def of(cls, scans):
+        """
+        Return the given scans as a scan set.
+
+        :param scans: The scans, or None for no scan.
+        :type scans: Iterable[str] | None
+
+        :returns: scans if it is already a scan set, else a new scan set.
+        :rtype: ScanSet
+        """
+
+        if isinstance(scans, ScanSet):
+            return scans
+
+        return cls(() if scans is None else scans)
+
+    def predicate(self):
+        """
+        Return the predicate selecting the scans of the set.
+
+        :returns: The predicate on the FileName tag, built on the first
+         call.
+        :rtype: In
+        """
+
+        if self._predicate is None:
+            self._predicate = In(TAG_FILENAME, self._scans)
+
+        return self._predicate
+
+    def union(self, *others):
+        """
+        Return the scans and the other scans.
+
+        :param others: The other scans.
+        :type others: Iterable[str]
+
+        :returns: The scans of this set, then the other scans not in it, in
+         their order.
+        :rtype: ScanSet
+        """
+        members = dict(self._members)
+
+        for other in others:
+            members.update(dict.fromkeys(other))
+
+        if len(members) == len(self._members):
+            return self
+
+        return ScanSet(members)
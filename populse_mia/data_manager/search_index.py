@@ -0,0 +1,355 @@
+"""
+In-memory index for the rapid search of the data browser.
+
+This module provides the `SearchIndex` class, a trigram index over the string
+forms of the values of the current documents. It answers the rapid search
+(a `LIKE "%text%"` over the shown tags) without querying the database, and
+is updated incrementally from the changes reported by the database.
+"""
+
+##########################################################################
+# Populse_mia - Copyright (C) IRMaGe/CEA, 2018
+# Distributed under the terms of the CeCILL license, as published by
+# the CEA-CNRS-INRIA. Refer to the LICENSE file or to
+# http://www.cecill.info/licences/Licence_CeCILL_V2.1-en.html
+# for details.
+##########################################################################
+
+import re
+import threading
+from datetime import date, datetime, time
+
+# populse_db import
+from populse_db.database import json_dumps, json_encode
+
+# populse_mia import
+from populse_mia.data_manager import (
+    COLLECTION_CURRENT,
+    TAG_BRICKS,
+    TAG_FILENAME,
+)
+
+__all__ = ["SearchIndex"]
+
+#: Maximum number of documents indexed, above which the rapid search
+#: queries the database.
+SEARCH_INDEX_MAX_DOCUMENTS = 50000
+
+#: Separator of the values of a document in its indexed text.
+VALUE_SEPARATOR = "\x00"
+
+
+class SearchIndex:
+    """
+    Trigram index of the values of the current documents, for rapid search.
+
+    The values of the indexed tags of each document are turned into the
+    strings the database compares with LIKE, and joined into one text per
+    document. Each trigram of the texts maps to the documents holding it, so
+    a search only checks the documents holding every trigram of the literal
+    parts of the pattern.
+
+    The index is built on the first search, and when the indexed tags
+    change. Afterwards only the documents reported as changed by the
+    database are read again, before the next search. The index isn't used
+    when the project has more than max_documents documents (search returns
+    None).
+
+    Contains:
+        Methods:
+            - _documents_changed: Record documents changed in the database.
+            - _index_document: Add the text of a document to the index.
+            - _refresh: Bring the index up to date.
+            - _search: Return the scans matching a pattern, locked.
+            - _unindex_document: Remove the text of a document from the
+              index.
+            - close: Stop following the changes of the database.
+            - search: Return the scans matching a rapid search pattern.
+            - search_string: Return the string form of a value.
+    """
+
+    def __init__(self, database, max_documents=SEARCH_INDEX_MAX_DOCUMENTS):
+        """
+        Initialize the SearchIndex.
+
+        :param database: The database of the indexed documents.
+        :type database: DatabaseMIA
+        :param max_documents: The maximum number of documents indexed.
+        :type max_documents: int
+        """
+        self.database = database
+        self.max_documents = max_documents
+        # Indexed tags, text of each scan and scans of each trigram
+        self._tags = None
+        self._texts = {}
+        self._grams = {}
+        # Changes reported by the database, possibly from another thread
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._all_dirty = True
+        # Held by the searches, which update the index
+        self._search_lock = threading.Lock()
+        database.add_change_listener(self._documents_changed)
+
+    def _documents_changed(self, collection_name, primary_keys):
+        """
+        Record documents changed in the database.
+
+        :param collection_name: The collection of the documents.
+        :type collection_name: str
+        :param primary_keys: The primary keys of the documents, or None if
+         all the documents may have changed.
+        :type primary_keys: list[str] | None
+        """
+
+        if collection_name != COLLECTION_CURRENT:
+            return
+
+        with self._lock:
+
+            if primary_keys is None:
+                self._all_dirty = True
+
+            else:
+                self._dirty.update(primary_keys)
+
+    def _index_document(self, scan, document):
+        """
+        Add the text of a document to the index.
+
+        :param scan: The scan of the document.
+        :type scan: str
+        :param document: The document, with the values of the indexed tags.
+        :type document: dict
+        """
+        strings = [
+            string
+            for tag in self._tags
+            if (string := self.search_string(document.get(tag))) is not None
+        ]
+
+        # A document without value matches no pattern
+        if not strings:
+            return
+
+        text = VALUE_SEPARATOR.join(strings)
+        self._texts[scan] = text
+
+        for start in range(len(text) - 2):
+            end = start + 3
+            self._grams.setdefault(text[start:end], set()).add(scan)
+
+    def _refresh(self, tags):
+        """
+        Bring the index up to date with the database.
+
+        :param tags: The tags to index.
+        :type tags: tuple[str]
+
+        :returns: False if there are too many documents to index.
+        :rtype: bool
+        """
+
+        with self._lock:
+            rebuild = self._all_dirty or tags != self._tags
+            dirty = self._dirty
+            self._dirty = set()
+            self._all_dirty = False
+
+        if rebuild:
+            self._tags = tags
+            self._texts = {}
+            self._grams = {}
+
+            with self.database.data() as database_data:
+                names = database_data.get_document(
+                    COLLECTION_CURRENT, fields=[TAG_FILENAME]
+                )
+
+                if len(names) > self.max_documents:
+
+                    # Try again next time, the documents may be removed
+                    with self._lock:
+                        self._all_dirty = True
+
+                    return False
+
+                documents = database_data.get_document(
+                    COLLECTION_CURRENT, fields=[TAG_FILENAME, *tags]
+                )
+
+            for document in documents:
+                self._index_document(document[TAG_FILENAME], document)
+
+        elif dirty:
+
+            with self.database.data() as database_data:
+                documents = {
+                    document[TAG_FILENAME]: document
+                    for document in database_data.get_document(
+                        COLLECTION_CURRENT,
+                        list(dirty),
+                        fields=[TAG_FILENAME, *tags],
+                    )
+                }
+
+            for scan in dirty:
+                self._unindex_document(scan)
+
+                if scan in documents:
+                    self._index_document(scan, documents[scan])
+
+        return True
+
+    def _search(self, pattern, tags, scans):
+        """
+        Return the scans with a value matching a rapid search pattern (see
+        search), the search lock being held.
+
+        :param pattern: The searched pattern.
+        :type pattern: str
+        :param tags: The tags searched.
+        :type tags: list[str]
+        :param scans: The scans the search is restricted to.
+        :type scans: list[str]
+
+        :returns: The matching scans, in the order of scans, or None if the
+         index can't be used.
+        :rtype: list[str] | None
+        """
+
+        if not self._refresh(tuple(tag for tag in tags if tag != TAG_BRICKS)):
+            return None
+
+        # Documents holding every trigram of the literal parts
+        candidates = None
+
+        for literal in re.split("[%_]", pattern):
+
+            for start in range(len(literal) - 2):
+                end = start + 3
+                scans_gram = self._grams.get(literal[start:end])
+
+                if not scans_gram:
+                    return []
+
+                candidates = (
+                    set(scans_gram)
+                    if candidates is None
+                    else candidates.intersection(scans_gram)
+                )
+
+        # A value can't match across the separator of the values
+        regex = re.compile(
+            "".join(
+                (
+                    f"[^{VALUE_SEPARATOR}]*"
+                    if char == "%"
+                    else (
+                        f"[^{VALUE_SEPARATOR}]"
+                        if char == "_"
+                        else re.escape(char)
+                    )
+                )
+                for char in pattern
+            )
+        )
+        return [
+            scan
+            for scan in scans
+            if (candidates is None or scan in candidates)
+            and (text := self._texts.get(scan)) is not None
+            and regex.search(text)
+        ]
+
+    def _unindex_document(self, scan):
+        """
+        Remove the text of a document from the index.
+
+        :param scan: The scan of the document.
+        :type scan: str
+        """
+        text = self._texts.pop(scan, None)
+
+        if text is None:
+            return
+
+        for gram in {text[i:j] for i, j in enumerate(range(3, len(text) + 1))}:
+            scans = self._grams.get(gram)
+
+            if scans is not None:
+                scans.discard(scan)
+
+                if not scans:
+                    del self._grams[gram]
+
+    def close(self):
+        """
+        Stop following the changes of the database.
+        """
+        self.database.remove_change_listener(self._documents_changed)
+
+    def search(self, pattern, tags, scans, cancelled=None):
+        """
+        Return the scans with a value matching a rapid search pattern.
+
+        The result is the one of the filter built by
+        RapidSearch.prepare_filter: the scans having a value of one of the
+        tags (except the bricks) matching the LIKE pattern "%pattern%",
+        case-sensitively, where "%" stands for any string and "_" for any
+        character.
+
+        Searches can be run from several threads, one at a time, each
+        reading the database with the connection of its thread. A search
+        cancelled while waiting for the previous one doesn't read the
+        database.
+
+        :param pattern: The searched pattern.
+        :type pattern: str
+        :param tags: The tags searched.
+        :type tags: list[str]
+        :param scans: The scans the search is restricted to.
+        :type scans: list[str]
+        :param cancelled: Returns True once the search is cancelled, or
+         None.
+        :type cancelled: Callable[[], bool] | None
+
+        :returns: The matching scans, in the order of scans, or None if the
+         index can't be used (too many documents) or the search is
+         cancelled.
+        :rtype: list[str] | None
+        """
+
+        with self._search_lock:
+
+            if cancelled is not None and cancelled():
+                return None
+
+            return self._search(pattern, tags, scans)
+
+    @staticmethod
+    def search_string(value):
+        """
+        Return the string form of a value, as compared by the database.
+
+        :param value: The value.
+        :type value: Any
+
+        :returns: The string the LIKE operator of the database sees, or None
+         for a missing value.
+        :rtype: str | None
+        """
+
+        if value is None:
+            return None
+
+        if isinstance(value, bool):
+            return "1" if value else "0"
+
+        if isinstance(value, (datetime, date, time)):
+            return value.isoformat()
+
+        if isinstance(value, (list, dict)):
+            return json_dumps(json_encode(value))
+
+        return str(value)
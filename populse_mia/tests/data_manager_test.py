@@ -0,0 +1,586 @@
+"""
+Unit tests of the data manager that don't need the GUI.
+
+They cover the database layer (DatabaseMIA sessions, query cache, query
+predicates, scan sets, search index), and are run with the other tests of
+Mia, or on their own with::
+
+    python -m pytest populse_mia/tests/data_manager_test.py
+"""
+
+##########################################################################
+# Populse_mia - Copyright (C) IRMaGe/CEA, 2018
+# Distributed under the terms of the CeCILL license, as published by
+# the CEA-CNRS-INRIA. Refer to the LICENSE file or to
+# http://www.cecill.info/licences/Licence_CeCILL_V2.1-en.html
+# for details.
+##########################################################################
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+# populse_mia import
+from populse_mia.data_manager import (
+    COLLECTION_CURRENT,
+    FIELD_TYPE_STRING,
+    TAG_FILENAME,
+    TAG_ORIGIN_BUILTIN,
+)
+from populse_mia.data_manager.database_mia import (
+    DatabaseMIA,
+    DatabaseMiaData,
+    QueryCache,
+)
+from populse_mia.data_manager.query import (
+    And,
+    Between,
+    Compare,
+    Contains,
+    In,
+    IsNull,
+    Not,
+    Or,
+    literal,
+)
+from populse_mia.data_manager.scan_set import ScanSet
+from populse_mia.data_manager.search_index import SearchIndex
+
+
+class TestDatabaseMIA(unittest.TestCase):
+    """
+    Tests of DatabaseMIA.
+
+    Contains:
+        Methods:
+            - run_thread: Run a function on a thread and keep its result.
+            - setUp: Create a database with one document.
+            - tearDown: Remove the database.
+            - test_query_cache: Drop the cached filter results when the
+              database changes.
+            - test_quoted_values: Query and remove documents with single
+              quotes in their keys and values.
+            - test_read_while_writing: Read on a thread during a write
+              session of the main thread.
+            - test_search_cancelled: Don't read the database for a cancelled
+              search.
+            - test_search_while_writing: Search on a thread during a write
+              session of the main thread.
+            - test_write_while_reading: Write during a read session of
+              another thread.
+    """
+
+    def run_thread(self, function):
+        """
+        Run a function on a new thread and keep its result.
+
+        :param function: The function, called without argument.
+        :type function: Callable[[], Any]
+
+        :returns: The thread, started, and the list receiving the result or
+         the exception raised.
+        :rtype: tuple[threading.Thread, list]
+        """
+        result = []
+
+        def target():
+            """Call the function and keep its result."""
+
+            try:
+                result.append(function())
+
+            except Exception as error:
+                result.append(error)
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        return thread, result
+
+    def setUp(self):
+        """
+        Create a database with a "Tag" field and one document.
+        """
+        self.folder = tempfile.mkdtemp(prefix="mia_database_test_")
+        file_path = os.path.join(self.folder, "mia.db")
+
+        with open(file_path, "a"):
+            pass
+
+        self.database = DatabaseMIA(f"sqlite://{file_path}")
+
+        with self.database.schema() as database_schema:
+            database_schema.add_field_attributes_collection()
+            database_schema.add_collection(
+                COLLECTION_CURRENT,
+                TAG_FILENAME,
+                True,
+                TAG_ORIGIN_BUILTIN,
+                None,
+                None,
+            )
+            database_schema.add_field(
+                {
+                    "collection_name": COLLECTION_CURRENT,
+                    "field_name": "Tag",
+                    "field_type": FIELD_TYPE_STRING,
+                    "description": "",
+                    "visibility": True,
+                    "origin": TAG_ORIGIN_BUILTIN,
+                    "unit": None,
+                    "default_value": None,
+                }
+            )
+
+        with self.database.data(write=True) as database_data:
+            database_data.add_document(COLLECTION_CURRENT, "scan.nii")
+
+    def tearDown(self):
+        """
+        Remove the database.
+        """
+        self.database.close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_query_cache(self):
+        """
+        A cached filter result is dropped after set_value, after
+        remove_documents and after a rolled back write session.
+        """
+        tagged = Compare("Tag", "==", "x")
+
+        def tagged_names():
+            """Return the names of the tagged documents, twice."""
+
+            with self.database.data() as database_data:
+                names = database_data.filter_document_names(
+                    COLLECTION_CURRENT, tagged
+                )
+                # The second query is answered by the cache
+                self.assertIs(
+                    database_data.filter_document_names(
+                        COLLECTION_CURRENT, tagged
+                    ),
+                    names,
+                )
+                return names
+
+        self.assertEqual(tagged_names(), [])
+
+        with self.database.data(write=True) as database_data:
+            database_data.set_value(
+                COLLECTION_CURRENT, "scan.nii", {"Tag": "x"}
+            )
+
+        self.assertEqual(tagged_names(), ["scan.nii"])
+
+        with self.database.data(write=True) as database_data:
+            database_data.remove_documents(COLLECTION_CURRENT, ["scan.nii"])
+
+        self.assertEqual(tagged_names(), [])
+
+        with self.assertRaises(RuntimeError):
+
+            with self.database.data(write=True) as database_data:
+                database_data.add_document(COLLECTION_CURRENT, "scan.nii")
+                database_data.set_value(
+                    COLLECTION_CURRENT, "scan.nii", {"Tag": "x"}
+                )
+                # Cached for the uncommitted value
+                self.assertEqual(
+                    database_data.filter_document_names(
+                        COLLECTION_CURRENT, tagged
+                    ),
+                    ["scan.nii"],
+                )
+                raise RuntimeError("rollback")
+
+        self.assertEqual(tagged_names(), [])
+
+    def test_quoted_values(self):
+        """
+        The filters of values holding single quotes are run, and the
+        documents with such keys are read and removed with the bulk queries.
+        """
+
+        with self.database.data(write=True) as database_data:
+            database_data.add_document(COLLECTION_CURRENT, "b'q.nii")
+            database_data.set_value(
+                COLLECTION_CURRENT, "b'q.nii", {"Tag": "x'y"}
+            )
+
+        with self.database.data() as database_data:
+            self.assertEqual(
+                database_data.filter_document_names(
+                    COLLECTION_CURRENT, Compare("Tag", "==", "x'y")
+                ),
+                ["b'q.nii"],
+            )
+            self.assertEqual(
+                database_data.filter_document_names(
+                    COLLECTION_CURRENT,
+                    In(TAG_FILENAME, ["b'q.nii", "scan.nii"]),
+                ),
+                ["b'q.nii", "scan.nii"],
+            )
+            documents = database_data.get_document(
+                COLLECTION_CURRENT, ["b'q.nii"]
+            )
+            self.assertEqual(
+                [doc[TAG_FILENAME] for doc in documents], ["b'q.nii"]
+            )
+
+        with self.database.data(write=True) as database_data:
+            database_data.remove_documents(COLLECTION_CURRENT, ["b'q.nii"])
+
+        with self.database.data() as database_data:
+            self.assertEqual(
+                database_data.get_document_names(COLLECTION_CURRENT),
+                ["scan.nii"],
+            )
+
+    def test_read_while_writing(self):
+        """
+        A session opened by another thread during a write session of the
+        main thread has its own connection: it sees the value once it is
+        committed, and isn't closed with the write session.
+        """
+
+        def read():
+            """Read the value, in a session outliving the write session."""
+
+            with self.database.data() as database_data:
+                time.sleep(0.2)
+                return database_data.get_value(
+                    COLLECTION_CURRENT, "scan.nii", "Tag"
+                )
+
+        with self.database.data(write=True) as database_data:
+            database_data.set_value(
+                COLLECTION_CURRENT, "scan.nii", {"Tag": "written"}
+            )
+            thread, result = self.run_thread(read)
+            time.sleep(0.1)
+
+        thread.join()
+        self.assertEqual(result, ["written"])
+
+    def test_search_cancelled(self):
+        """
+        A search cancelled while waiting for another one returns None,
+        without reading the database.
+        """
+        search_index = SearchIndex(self.database)
+        sessions = []
+        data = self.database.data
+
+        def counted_data(*args, **kwargs):
+            """Count the sessions opened."""
+            sessions.append(args)
+            return data(*args, **kwargs)
+
+        with patch.object(self.database, "data", new=counted_data):
+            self.assertIsNone(
+                search_index.search(
+                    "scan", [TAG_FILENAME], ["scan.nii"], lambda: True
+                )
+            )
+            self.assertEqual(sessions, [])
+            self.assertEqual(
+                search_index.search(
+                    "scan", [TAG_FILENAME], ["scan.nii"], lambda: False
+                ),
+                ["scan.nii"],
+            )
+            self.assertNotEqual(sessions, [])
+
+        search_index.close()
+
+    def test_search_while_writing(self):
+        """
+        The main thread can write while the search index is brought up to
+        date on another thread, and the next search sees the change.
+        """
+        search_index = SearchIndex(self.database)
+        reading = threading.Event()
+        get_document = DatabaseMiaData.get_document
+
+        def slow_get_document(database_data, *args, **kwargs):
+            """Read the documents, keeping the session open for a while."""
+            documents = get_document(database_data, *args, **kwargs)
+
+            if threading.current_thread() is not threading.main_thread():
+                reading.set()
+                time.sleep(0.2)
+
+            return documents
+
+        def search():
+            """Search the written value."""
+            return search_index.search(
+                "writ", ["Tag"], ["scan.nii"], lambda: False
+            )
+
+        with patch.object(DatabaseMiaData, "get_document", slow_get_document):
+            thread, result = self.run_thread(search)
+            self.assertTrue(reading.wait(5))
+
+            with self.database.data(write=True) as database_data:
+                database_data.set_value(
+                    COLLECTION_CURRENT, "scan.nii", {"Tag": "written"}
+                )
+
+            thread.join()
+
+        # Indexed before the write
+        self.assertEqual(result, [[]])
+        self.assertEqual(search(), ["scan.nii"])
+        search_index.close()
+
+    def test_write_while_reading(self):
+        """
+        A write session of the main thread can be opened while another
+        thread is in a read session: it waits for the read to end.
+        """
+        reading = threading.Event()
+
+        def read():
+            """Read the document, in a session held for a while."""
+
+            with self.database.data() as database_data:
+                documents = database_data.get_document(COLLECTION_CURRENT)
+                reading.set()
+                time.sleep(0.2)
+                return [document[TAG_FILENAME] for document in documents]
+
+        thread, result = self.run_thread(read)
+        reading.wait(5)
+
+        with self.database.data(write=True) as database_data:
+            database_data.set_value(
+                COLLECTION_CURRENT, "scan.nii", {"Tag": "written"}
+            )
+
+        thread.join()
+        self.assertEqual(result, [["scan.nii"]])
+
+        with self.database.data() as database_data:
+            self.assertEqual(
+                database_data.get_value(COLLECTION_CURRENT, "scan.nii", "Tag"),
+                "written",
+            )
+
+
+class TestQuery(unittest.TestCase):
+    """
+    Tests of the query predicates.
+
+    Contains:
+        Methods:
+            - test_compile: Compile the predicates to populse_db filters.
+            - test_equality: Compare and hash the predicates by value.
+            - test_literal: Build the literals of the values.
+    """
+
+    def test_compile(self):
+        """
+        The predicates compile to populse_db filters, with the operands
+        of And and Or between parentheses.
+        """
+        self.assertEqual(
+            In("Tag", ["a", "b'c"]).compile(), '{Tag} IN ["a", "b\'\'c"]'
+        )
+        self.assertEqual(
+            Between("Tag", 1, 2).compile(), "({Tag} >= 1) AND ({Tag} <= 2)"
+        )
+        self.assertEqual(Contains("Tag", "a").compile(), '{Tag} LIKE "%a%"')
+        self.assertEqual(IsNull("Tag").compile(), "{Tag} == null")
+        self.assertEqual(Not(IsNull("Tag")).compile(), "NOT ({Tag} == null)")
+        self.assertEqual(
+            Or(IsNull("A"), And(IsNull("B"), IsNull("C"))).compile(),
+            "({A} == null) OR (({B} == null) AND ({C} == null))",
+        )
+        self.assertEqual(And().compile(), "ALL")
+        self.assertEqual(Or().compile(), "NOT ALL")
+
+        with self.assertRaises(ValueError):
+            Compare("Tag", "=~", "a")
+
+        with self.assertRaises(ValueError):
+            IsNull("a}b").compile()
+
+    def test_equality(self):
+        """
+        The predicates are equal, with the same hash, when they are of the
+        same kind with equal operands, lists and tuples being equal.
+        """
+        self.assertEqual(In("Tag", ["a", "b"]), In("Tag", ("a", "b")))
+        self.assertEqual(
+            hash(In("Tag", ["a", "b"])), hash(In("Tag", ("a", "b")))
+        )
+        self.assertEqual(
+            Compare("Tag", "like", "a"), Compare("Tag", "LIKE", "a")
+        )
+        self.assertEqual(
+            IsNull("A") & IsNull("B"), And(IsNull("A"), IsNull("B"))
+        )
+        self.assertEqual(
+            IsNull("A") | IsNull("B"), Or(IsNull("A"), IsNull("B"))
+        )
+        self.assertEqual(~IsNull("A"), Not(IsNull("A")))
+        self.assertNotEqual(And(IsNull("A")), Or(IsNull("A")))
+        self.assertNotEqual(In("Tag", ["a", "b"]), In("Tag", ["b", "a"]))
+        self.assertEqual(
+            len({Between("Tag", 1, 2), Between("Tag", 1, 2), IsNull("Tag")}),
+            2,
+        )
+
+    def test_literal(self):
+        """
+        The strings are quoted, with their backslashes, double quotes and
+        single quotes escaped.
+        """
+        self.assertEqual(literal("a"), '"a"')
+        self.assertEqual(literal('a"b'), '"a\\"b"')
+        self.assertEqual(literal("a\\b"), '"a\\\\b"')
+        self.assertEqual(literal("a'b"), "\"a''b\"")
+        self.assertEqual(literal(["a'b", 1]), "[\"a''b\", 1]")
+        self.assertEqual(literal(None), "null")
+        self.assertEqual(literal(True), "true")
+        self.assertEqual(literal(date(2024, 1, 2)), '"2024-01-02"')
+
+        with self.assertRaises(TypeError):
+            literal({})
+
+
+class TestScanSet(unittest.TestCase):
+    """
+    Tests of ScanSet.
+
+    Contains:
+        Methods:
+            - test_contains: Test the membership of the scans.
+            - test_equality: Compare the scan sets with the sequences.
+            - test_index: Find the positions of the scans.
+            - test_set_operations: Keep the order in the set algebra.
+    """
+
+    def test_contains(self):
+        """
+        The scans are found, and the unhashable objects are not members.
+        """
+        scans = ScanSet(["a.nii", "b.nii"])
+        self.assertIn("a.nii", scans)
+        self.assertNotIn("c.nii", scans)
+        self.assertNotIn(["a.nii"], scans)
+        self.assertNotIn({}, scans)
+        self.assertEqual(scans.count("a.nii"), 1)
+        self.assertEqual(scans.count(["a.nii"]), 0)
+
+    def test_equality(self):
+        """
+        A scan set equals the scan sets, lists and tuples holding the same
+        scans in the same order, the duplicates being dropped.
+        """
+        scans = ScanSet(["a.nii", "b.nii", "a.nii"])
+        self.assertEqual(scans, ["a.nii", "b.nii"])
+        self.assertEqual(scans, ("a.nii", "b.nii"))
+        self.assertEqual(["a.nii", "b.nii"], scans)
+        self.assertEqual(scans, ScanSet(("a.nii", "b.nii")))
+        self.assertEqual(hash(scans), hash(ScanSet(("a.nii", "b.nii"))))
+        self.assertNotEqual(scans, ["b.nii", "a.nii"])
+        self.assertNotEqual(scans, {"a.nii", "b.nii"})
+        self.assertNotEqual(scans, "a.nii")
+        self.assertEqual(scans[1:], ScanSet(["b.nii"]))
+        self.assertIsInstance(scans[1:], ScanSet)
+        self.assertIs(ScanSet.of(scans), scans)
+        self.assertEqual(ScanSet.of(None), [])
+
+    def test_index(self):
+        """
+        The positions are found between start and stop, as for the lists.
+        """
+        scans = ScanSet(["a.nii", "b.nii", "c.nii"])
+        self.assertEqual(scans.index("b.nii"), 1)
+        self.assertEqual(scans.index("b.nii", 1), 1)
+        self.assertEqual(scans.index("c.nii", -1), 2)
+        self.assertEqual(scans.index("b.nii", 0, 2), 1)
+
+        for args in (("d.nii",), ("a.nii", 1), ("c.nii", 0, 2), ([],)):
+
+            with self.assertRaises(ValueError):
+                scans.index(*args)
+
+    def test_set_operations(self):
+        """
+        The intersection and difference keep the order of the left
+        operand, the union adds the other scans in their order.
+        """
+        scans = ScanSet(["a.nii", "b.nii", "c.nii"])
+        self.assertEqual(
+            scans & ["c.nii", "a.nii", "d.nii"], ["a.nii", "c.nii"]
+        )
+        self.assertEqual(scans - ["c.nii", "a.nii"], ["b.nii"])
+        self.assertIs(scans - [], scans)
+        self.assertEqual(
+            scans | ["e.nii", "b.nii", "d.nii"],
+            ["a.nii", "b.nii", "c.nii", "e.nii", "d.nii"],
+        )
+        self.assertEqual(
+            scans.union(["e.nii"], ["d.nii", "e.nii"]),
+            ["a.nii", "b.nii", "c.nii", "e.nii", "d.nii"],
+        )
+        self.assertIs(scans | ["b.nii"], scans)
+        self.assertEqual(
+            scans.predicate(), In(TAG_FILENAME, ["a.nii", "b.nii", "c.nii"])
+        )
+
+
+class TestQueryCache(unittest.TestCase):
+    """
+    Tests of QueryCache.
+
+    Contains:
+        Methods:
+            - test_eviction: Drop the least recently used results.
+            - test_revisions: Keep the results of the last revision only.
+    """
+
+    def test_eviction(self):
+        """
+        At max_size, the least recently used result is dropped.
+        """
+        cache = QueryCache(2)
+        cache.put("a", 1, "result a")
+        cache.put("b", 1, "result b")
+        # Use a: b is now the least recently used
+        self.assertEqual(cache.get("a", 1), "result a")
+        cache.put("c", 1, "result c")
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b", 1))
+        self.assertEqual(cache.get("a", 1), "result a")
+        self.assertEqual(cache.get("c", 1), "result c")
+        cache.put("c", 1, "result c")
+        self.assertEqual(len(cache), 2)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_revisions(self):
+        """
+        A newer revision empties the cache, and the results of an older
+        revision are neither returned nor stored.
+        """
+        cache = QueryCache()
+        cache.put("a", 1, "result a")
+        self.assertIsNone(cache.get("a", 0))
+        cache.put("b", 0, "result b")
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get("a", 1), "result a")
+        self.assertIsNone(cache.get("a", 2))
+        self.assertEqual(len(cache), 0)
+        cache.put("a", 1, "result a")
+        self.assertIsNone(cache.get("a", 2))
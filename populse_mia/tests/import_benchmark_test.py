@@ -0,0 +1,567 @@
+"""
+Reproducible benchmark of the import of MRIFileManager exports.
+
+This module generates a synthetic ``data/raw_data`` export (NIfTI files of a
+given size, JSON sidecars with a given number of tags, the export log and,
+optionally, bvec/bval files), imports it headlessly with
+:class:`~populse_mia.data_manager.data_loader.ImportWorker` in a temporary
+project, and reports:
+
+    - the wall time of the import,
+    - the number of database writes, by kind,
+    - the peak resident set size of the process,
+    - the time spent in each stage of the import.
+
+The number of database writes and of documents imported don't depend on
+the machine: ``TestImportBenchmark`` imports a tiny export, in several
+chunks, and checks them against ``import_benchmark_baseline.json`` (next to
+this file). Update the baseline when an import change is meant to change
+the writes.
+
+Timings depend on the machine, so comparing them is left to the command
+line, for example::
+
+    python populse_mia/tests/import_benchmark_test.py --scans 500 \\
+        --size 2 --tags 80 --bvec-bval --save-baseline before.json
+    # ... change the import ...
+    python populse_mia/tests/import_benchmark_test.py --scans 500 \\
+        --size 2 --tags 80 --bvec-bval --baseline before.json
+
+With ``--save-baseline`` the report is stored in the given file; with
+``--baseline`` it is compared to the given report, made with the same
+parameters on the same machine, and the script exits with a non-zero status
+if the number of database writes increased or if a timing got worse than
+the allowed tolerance.
+"""
+
+##########################################################################
+# Populse_mia - Copyright (C) IRMaGe/CEA, 2018
+# Distributed under the terms of the CeCILL license, as published by
+# the CEA-CNRS-INRIA. Refer to the LICENSE file or to
+# http://www.cecill.info/licences/Licence_CeCILL_V2.1-en.html
+# for details.
+##########################################################################
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import unittest
+from contextlib import ExitStack, contextmanager
+from time import perf_counter
+from unittest.mock import patch
+
+import nibabel as nib
+import numpy as np
+
+try:
+    import resource
+
+except ImportError:  # Windows
+    resource = None
+
+# populse_mia import
+from populse_mia.data_manager import COLLECTION_CURRENT
+from populse_mia.data_manager.data_loader import (
+    IMPORT_CHUNK_SIZE,
+    ImportWorker,
+)
+from populse_mia.data_manager.database_mia import (
+    DatabaseMiaData,
+    DatabaseMiaSchema,
+)
+from populse_mia.data_manager.project import Project
+from populse_mia.software_properties import Config
+
+#: Location of the baseline of the deterministic metrics.
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "import_benchmark_baseline.json",
+)
+
+#: Database methods counted as writes.
+DB_WRITE_METHODS = (
+    (DatabaseMiaData, "add_document"),
+    (DatabaseMiaData, "remove_document"),
+    (DatabaseMiaData, "remove_value"),
+    (DatabaseMiaData, "set_value"),
+    (DatabaseMiaSchema, "add_field"),
+)
+
+#: ImportWorker methods timed as import stages.
+IMPORT_STAGES = (
+    "_get_export_logs",
+    "_compute_checksums",
+    "_process_log_entries",
+    "_apply_default_values",
+    "_update_database",
+)
+
+
+def generate_export(
+    raw_data_folder, nb_scans, scan_size_mb=1.0, nb_tags=50, bvec_bval=False
+):
+    """
+    Generate a synthetic MRIFileManager export in a raw data folder.
+
+    Each scan is a valid NIfTI file of about `scan_size_mb` MB, with a JSON
+    sidecar holding `nb_tags` tags of various types (string, integer, float,
+    float list, date and time), in the format written by MRIFileManager.
+    The content is generated from a fixed seed, so two exports with the same
+    parameters are identical.
+
+    :param raw_data_folder: Folder where the export is written (created if
+     needed).
+    :type raw_data_folder: str
+    :param nb_scans: Number of scans.
+    :type nb_scans: int
+    :param scan_size_mb: Approximate size of each NIfTI file, in MB.
+    :type scan_size_mb: float
+    :param nb_tags: Number of tags in each JSON sidecar.
+    :type nb_tags: int
+    :param bvec_bval: If True, write FSL bvec/bval files for every other
+     scan.
+    :type bvec_bval: bool
+
+    :returns: The export log entries.
+    :rtype: list[dict]
+    """
+    os.makedirs(raw_data_folder, exist_ok=True)
+    rng = np.random.default_rng(0)
+    # 64 x 64 slices of uint8 voxels
+    nb_slices = max(1, int(scan_size_mb * 1024 * 1024) // (64 * 64))
+    tag_kinds = (
+        ("string", lambda i, k: [f"value_{i % 7}_{k}"], None),
+        ("int", lambda i, k: [[int(i % 11 + k)]], None),
+        ("float", lambda i, k: [[float(i % 13) / 3 + k]], None),
+        ("float", lambda i, k: [[0.5 * k, 1.5 * k, float(i % 5)]], None),
+        ("date", lambda i, k: [f"2024-01-{i % 28 + 1:02d}"], "yyyy-MM-dd"),
+        ("time", lambda i, k: [f"10:{i % 60:02d}:00.000"], "HH:mm:ss.SSS"),
+    )
+    log = []
+
+    for i in range(nb_scans):
+        file_name = f"benchmark-subject{i // 4:04d}-scan{i:05d}"
+        data = rng.integers(0, 255, (64, 64, nb_slices), dtype=np.uint8)
+        nib.Nifti1Image(data, np.eye(4)).to_filename(
+            os.path.join(raw_data_folder, f"{file_name}.nii")
+        )
+        tags = {"PatientName": {"value": [f"Subject {i // 4:04d}"]}}
+
+        for k in range(nb_tags):
+            tag_type, value, tag_format = tag_kinds[k % len(tag_kinds)]
+            tags[f"BenchmarkTag{k:03d}"] = {
+                "format": tag_format,
+                "description": f"Synthetic {tag_type} tag",
+                "units": None,
+                "type": tag_type,
+                "value": value(i, k),
+            }
+
+        with open(
+            os.path.join(raw_data_folder, f"{file_name}.json"),
+            "w",
+            encoding="utf-8",
+        ) as json_file:
+            json.dump(tags, json_file)
+
+        has_gradients = bvec_bval and i % 2 == 0
+
+        if has_gradients:
+            directions = rng.normal(size=(3, 30))
+            directions /= np.linalg.norm(directions, axis=0)
+            np.savetxt(
+                os.path.join(raw_data_folder, f"{file_name}.bvec"),
+                directions,
+                fmt="%.6f",
+            )
+            np.savetxt(
+                os.path.join(raw_data_folder, f"{file_name}.bval"),
+                np.full((1, 30), 1000.0),
+                fmt="%g",
+            )
+
+        log.append(
+            {
+                "StatusExport": "Export ok",
+                "NameFile": file_name,
+                "Bvec_bval": "yes" if has_gradients else "no",
+            }
+        )
+
+    with open(
+        os.path.join(raw_data_folder, "logExportBenchmark.json"),
+        "w",
+        encoding="utf-8",
+    ) as log_file:
+        json.dump(log, log_file)
+
+    return log
+
+
+def peak_rss_mb():
+    """
+    Give the peak resident set size of the current process.
+
+    :returns: The peak RSS in MB, or None if it is not available on this
+     platform.
+    :rtype: float | None
+    """
+
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+@contextmanager
+def _instrumented_import(db_writes, stages):
+    """
+    Count the database writes and time the stages of an import.
+
+    Within the context, the calls to the methods of DB_WRITE_METHODS are
+    counted in `db_writes` (fields added with `add_field` count one each),
+    the cumulated time spent in the ImportWorker methods of IMPORT_STAGES
+    is stored in `stages` (stages are timed inclusively: the checksums are
+    computed within the processing of the log entries).
+
+    :param db_writes: Dictionary filled with the number of writes, by
+     method name.
+    :type db_writes: dict
+    :param stages: Dictionary filled with the time spent in each stage, in
+     seconds.
+    :type stages: dict
+    """
+
+    def _counted(cls, name):
+        """Wrap a database method to count its calls."""
+        method = getattr(cls, name)
+
+        def wrapper(self, *args, **kwargs):
+            """Count the written items, then call the wrapped method."""
+            items = args[0] if args else next(iter(kwargs.values()), None)
+            db_writes[name] = db_writes.get(name, 0) + (
+                len(items)
+                if name == "add_field" and isinstance(items, list)
+                else 1
+            )
+            return method(self, *args, **kwargs)
+
+        return wrapper
+
+    def _timed(name):
+        """Wrap an ImportWorker method to time its calls."""
+        method = getattr(ImportWorker, name)
+
+        def wrapper(self, *args, **kwargs):
+            """Time the wrapped method."""
+            start = perf_counter()
+
+            try:
+                return method(self, *args, **kwargs)
+
+            finally:
+                stages[name.strip("_")] = (
+                    stages.get(name.strip("_"), 0.0) + perf_counter() - start
+                )
+
+        return wrapper
+
+    with ExitStack() as stack:
+
+        for cls, name in DB_WRITE_METHODS:
+            stack.enter_context(patch.object(cls, name, _counted(cls, name)))
+
+        for name in IMPORT_STAGES:
+
+            if hasattr(ImportWorker, name):
+                stack.enter_context(
+                    patch.object(ImportWorker, name, _timed(name))
+                )
+
+        yield
+
+
+def run_import_benchmark(
+    nb_scans=200,
+    scan_size_mb=1.0,
+    nb_tags=50,
+    bvec_bval=False,
+    chunk_size=IMPORT_CHUNK_SIZE,
+):
+    """
+    Import a synthetic export in a temporary project and measure it.
+
+    :param nb_scans: Number of scans.
+    :type nb_scans: int
+    :param scan_size_mb: Approximate size of each NIfTI file, in MB.
+    :type scan_size_mb: float
+    :param nb_tags: Number of tags in each JSON sidecar.
+    :type nb_tags: int
+    :param bvec_bval: If True, add FSL bvec/bval files for every other scan.
+    :type bvec_bval: bool
+    :param chunk_size: Number of scans written to the database at a time
+     by the import (None for a single chunk).
+    :type chunk_size: int | None
+
+    :returns: The benchmark report, with the keys "parameters", "platform",
+     "documents", "wall_time", "db_writes", "peak_rss_mb" and "stages".
+    :rtype: dict
+    """
+    db_writes = {}
+    stages = {}
+
+    with temporary_project() as project:
+        generate_export(
+            os.path.join(project.folder, "data", "raw_data"),
+            nb_scans,
+            scan_size_mb,
+            nb_tags,
+            bvec_bval,
+        )
+        worker = ImportWorker(project, None, chunk_size)
+
+        with _instrumented_import(db_writes, stages):
+            start = perf_counter()
+            worker.run()
+            wall_time = perf_counter() - start
+
+        db_writes["total"] = sum(db_writes.values())
+
+        return {
+            "parameters": {
+                "scans": nb_scans,
+                "scan_size_mb": scan_size_mb,
+                "tags": nb_tags,
+                "bvec_bval": bvec_bval,
+                "chunk_size": chunk_size,
+            },
+            "platform": platform.platform(),
+            "documents": len(worker.scans_added),
+            "wall_time": wall_time,
+            "db_writes": db_writes,
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": stages,
+        }
+
+
+@contextmanager
+def temporary_project():
+    """
+    Give a new temporary project, removed on exit.
+
+    :returns: The project.
+    :rtype: Project
+    """
+    project = Project(None, True)
+
+    try:
+        yield project
+
+    finally:
+        config = Config()
+        opened_projects = config.get_opened_projects()
+
+        if project.folder in opened_projects:
+            opened_projects.remove(project.folder)
+            config.set_opened_projects(opened_projects)
+
+        shutil.rmtree(project.folder, ignore_errors=True)
+
+
+def compare_to_baseline(report, baseline, tolerance=0.5):
+    """
+    Compare a benchmark report to a baseline report.
+
+    :param report: The report of the current run.
+    :type report: dict
+    :param baseline: The baseline report, obtained with the same parameters.
+    :type baseline: dict
+    :param tolerance: Allowed relative slowdown of the timings (0.5 allows
+     timings up to 1.5 times the baseline).
+    :type tolerance: float
+
+    :returns: The regressions found, as human-readable messages.
+    :rtype: list[str]
+    """
+    regressions = []
+
+    if report["parameters"] != baseline["parameters"]:
+        return [
+            f"Parameters differ from the baseline: {report['parameters']} "
+            f"!= {baseline['parameters']}"
+        ]
+
+    for kind, count in report["db_writes"].items():
+
+        if count > baseline["db_writes"].get(kind, 0):
+            regressions.append(
+                f"More database writes ({kind}): {count} > "
+                f"{baseline['db_writes'].get(kind, 0)}"
+            )
+
+    timings = {"wall_time": report["wall_time"], **report["stages"]}
+    # The baseline of the deterministic metrics has no timing
+    baseline_timings = {"wall_time": baseline.get("wall_time")}
+    baseline_timings.update(baseline.get("stages", {}))
+
+    for name, seconds in timings.items():
+        reference = baseline_timings.get(name)
+
+        if reference and seconds > reference * (1 + tolerance):
+            regressions.append(
+                f"Slower {name}: {seconds:.3f} s > {reference:.3f} s "
+                f"(+{100 * (seconds / reference - 1):.0f} %)"
+            )
+
+    return regressions
+
+
+def main(argv=None):
+    """
+    Run the import benchmark from the command line.
+
+    :param argv: Command line arguments (defaults to sys.argv[1:]).
+    :type argv: list[str] | None
+
+    :returns: The exit status: 0 if no regression was found, 1 otherwise.
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the import of a synthetic MRIFileManager "
+        "export."
+    )
+    parser.add_argument("--scans", type=int, default=200)
+    parser.add_argument("--size", type=float, default=1.0, help="MB/scan")
+    parser.add_argument("--tags", type=int, default=50)
+    parser.add_argument("--bvec-bval", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--baseline", help="report to compare with")
+    parser.add_argument("--save-baseline", help="file to store the report")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    args = parser.parse_args(argv)
+    report = run_import_benchmark(
+        args.scans, args.size, args.tags, args.bvec_bval, args.chunk_size
+    )
+    print(json.dumps(report, indent=4))
+
+    if args.save_baseline:
+
+        with open(args.save_baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump(report, baseline_file, indent=4)
+            baseline_file.write("\n")
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as baseline_file:
+        regressions = compare_to_baseline(
+            report, json.load(baseline_file), args.tolerance
+        )
+
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+
+    return 1 if regressions else 0
+
+
+class TestImportBenchmark(unittest.TestCase):
+    """
+    Check the import of tiny synthetic exports.
+
+    Contains:
+        Methods:
+            - test_import_failed_chunk: Check that the chunks imported
+              before a failure are kept and recorded for undo.
+            - test_import_writes: Import a tiny export in several chunks
+              and compare the writes with the baseline.
+    """
+
+    def test_import_failed_chunk(self):
+        """
+        Check that the chunks imported before a failure are kept and
+        recorded for undo, that the failed chunk isn't, and that the failure
+        is reported with the number of scans imported.
+        """
+        update_database = ImportWorker._update_database
+        calls = []
+
+        def _update_database(worker, documents, tags_added):
+            """Fail on the write of the second chunk."""
+            calls.append(sorted(documents))
+
+            if len(calls) == 2:
+                raise OSError("Disk full")
+
+            update_database(worker, documents, tags_added)
+
+        with temporary_project() as project:
+            generate_export(
+                os.path.join(project.folder, "data", "raw_data"), 6, 0.01, 3
+            )
+            worker = ImportWorker(project, None, 2)
+            failures = []
+            progress = []
+            worker.notifyFailure.connect(
+                lambda *failure: failures.append(failure)
+            )
+            worker.notifyProgress.connect(progress.append)
+
+            with (
+                patch.object(
+                    ImportWorker, "_update_database", _update_database
+                ),
+                self.assertLogs(
+                    "populse_mia.data_manager.data_loader", "ERROR"
+                ),
+            ):
+                worker.run()
+
+            # The import stopped at the failed chunk, and reported it
+            self.assertEqual(len(calls), 2)
+            self.assertEqual(failures, [(len(calls[0]), "Disk full")])
+            self.assertNotIn(100, progress)
+            self.assertEqual(worker.scans_added, calls[0])
+            self.assertEqual(project.undos[-1][0], "add_scans")
+            self.assertEqual(project.undos[-1][1], calls[0])
+            self.assertEqual(
+                {value[0] for value in project.undos[-1][2]}, set(calls[0])
+            )
+
+            with project.database.data() as database_data:
+                self.assertEqual(
+                    sorted(
+                        database_data.get_document_names(COLLECTION_CURRENT)
+                    ),
+                    calls[0],
+                )
+
+    def test_import_writes(self):
+        """
+        Import a tiny export in several chunks and compare the number of
+        documents and of database writes with the baseline.
+        """
+
+        with open(BASELINE_PATH, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+
+        parameters = baseline["parameters"]
+        # The chunked path of the import is exercised
+        self.assertLess(parameters["chunk_size"], parameters["scans"])
+        report = run_import_benchmark(
+            parameters["scans"],
+            parameters["scan_size_mb"],
+            parameters["tags"],
+            parameters["bvec_bval"],
+            parameters["chunk_size"],
+        )
+        self.assertEqual(report["documents"], baseline["documents"])
+        self.assertEqual(report["db_writes"], baseline["db_writes"])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
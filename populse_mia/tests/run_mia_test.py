@@ -32,6 +32,7 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import unittest
 import uuid
@@ -244,7 +245,16 @@ from populse_mia.data_manager.project import Project  # noqa: E402
 from populse_mia.data_manager.project_properties import (  # noqa: E402
     SavedProjects,
 )
+from populse_mia.data_manager.query import And, Compare, Or  # noqa: E402
+from populse_mia.data_manager.scan_set import ScanSet  # noqa: E402
 from populse_mia.software_properties import Config  # noqa: E402
+from populse_mia.user_interface.data_browser.advanced_search import (  # noqa: E402, E501
+    AdvancedSearch,
+)
+from populse_mia.user_interface.data_browser.data_browser import (  # noqa: E402, E501
+    RowLoader,
+    RowPageCache,
+)
 from populse_mia.user_interface.data_browser.modify_table import (  # noqa: E402, E501
     ModifyTable,
 )
@@ -1031,10 +1041,18 @@ class TestMIADataBrowser(TestMIACase):
             - test_add_path: Tests the popup to add a path.
             - test_add_tag: Tests the pop up adding a tag.
             - test_advanced_search: Tests the advanced search widget.
+            - test_advanced_search_links: Tests the grouping of the rows of
+              the advanced search.
+            - test_apply_database_changes: Tests the incremental update of
+              the table from the changes of the database.
             - test_brick_history: Tests the brick history popup.
             - test_clear_cell: Tests the method clearing cells.
             - test_clone_tag: Tests the pop up cloning a tag.
             - test_count_table: Tests the count table popup.
+            - test_count_table_sparse: Tests the rows of the count table
+              with and without the empty combinations.
+            - test_edit_during_background_load: Edits a cell while rows are
+              loaded in the background.
             - test_mia_preferences: Tests the Mia preferences popup.
             - test_mini_viewer: Selects scans and display them in the mini
               viewer.
@@ -1051,12 +1069,15 @@ class TestMIADataBrowser(TestMIACase):
             - test_proj_remov_from_cur_proj: Tests that the projects are
               removed from the list of current projects.
             - test_rapid_search: Tests the rapid search bar.
+            - test_rapid_search_add_path: Tests that clearing the search
+              after adding a path shows every scan.
             - test_remove_scan: Tests scans removal in the DataBrowser.
             - test_remove_tag: Tests the popup removing user tags.
             - test_reset_cell: Tests the method resetting the selected cells.
             - test_reset_column: Tests the method resetting the columns
               selected.
             - test_reset_row: Tests row reset.
+            - test_row_page_cache: Tests the cache of the pages of rows.
             - test_save_project: Tests opening & saving of a project.
             - test_send_doc_to_pipeline_manager: Tests the popup sending
               documents to the pipeline manager.
@@ -1466,8 +1487,10 @@ class TestMIADataBrowser(TestMIACase):
         condition.setCurrentIndex(condition.findText("CONTAINS"))
         value.setText("G1")
         self._app.processEvents()
+        # The search runs in the background
+        search_finished = QSignalSpy(adv_search.searchFinished)
         QTest.mouseClick(adv_search.search, Qt.LeftButton)
-        self._app.processEvents()
+        self.assertTrue(len(search_finished) or search_finished.wait(2000))
 
         filtered_expected = [
             "data/raw_data/Guerbet-C6-2014-Rat-K52-Tube27-2014-02-14102317-01"
@@ -1490,21 +1513,78 @@ class TestMIADataBrowser(TestMIACase):
         self.assertEqual(len(scans), 9)
         self.assert_scans_present(scans, initial_expected)
 
+    def test_advanced_search_links(self):
+        """
+        Tests the grouping of the rows of the advanced search.
+
+        The rows are grouped from the right, as populse_db parses the flat
+        filters the advanced search used to build.
+        """
+        rows = [Or(Compare(tag, "==", "y")) for tag in ("A", "B", "C")]
+        args = ([["A"], ["B"], ["C"]], ["=="] * 3, ["y"] * 3, [""] * 3)
+        self.assertEqual(
+            AdvancedSearch.prepare_predicate(["AND", "OR"], *args),
+            And(rows[0], Or(rows[1], rows[2])),
+        )
+        self.assertEqual(
+            AdvancedSearch.prepare_predicate(["OR", "AND"], *args),
+            Or(rows[0], And(rows[1], rows[2])),
+        )
+        # A single row is left as is
+        self.assertEqual(
+            AdvancedSearch.prepare_predicate([], *(arg[:1] for arg in args)),
+            rows[0],
+        )
+
+    def test_apply_database_changes(self):
+        """Tests the incremental update of the table from the changes of the
+        database (TableDataBrowser.apply_database_changes)."""
+        project_8_path = self.get_new_test_project()
+        self.main_window.switch_project(project_8_path, "project_8")
+        table_data = self.main_window.data_browser.table_data
+        scans = self.get_visible_scans()
+        self.assertEqual(len(scans), 9)
+        new_scan = "data/derived_data/new_output.nii"
+
+        # An output added, a scan removed and a value modified by a run
+        with self.main_window.project.database.data(write=True) as db:
+            db.add_document(COLLECTION_CURRENT, new_scan)
+            db.add_document(COLLECTION_INITIAL, new_scan)
+            db.remove_documents(COLLECTION_CURRENT, [scans[0]])
+            db.remove_documents(COLLECTION_INITIAL, [scans[0]])
+            db.set_value(COLLECTION_CURRENT, scans[1], {TAG_EXP_TYPE: "T2w"})
+
+        table_data.apply_database_changes()
+        scans_after = self.get_visible_scans()
+        self.assertEqual(len(scans_after), 9)
+        self.assertIn(new_scan, scans_after)
+        self.assertNotIn(scans[0], scans_after)
+        self.assertEqual(
+            table_data.item(
+                table_data.get_scan_row(scans[1]),
+                table_data.get_tag_column(TAG_EXP_TYPE),
+            ).text(),
+            "T2w",
+        )
+
+        # Nothing left to apply
+        table_data.apply_database_changes()
+        self.assertEqual(len(self.get_visible_scans()), 9)
+
     def test_brick_history(self):
         """Tests the brick history popup."""
 
         project_8_path = self.get_new_test_project()
         self.main_window.switch_project(project_8_path, "project_8")
 
-        bricks_column = (
-            self.main_window.data_browser.table_data.get_tag_column(TAG_BRICKS)
-        )
-        bricks_widget = self.main_window.data_browser.table_data.cellWidget(
-            0, bricks_column
+        table_data = self.main_window.data_browser.table_data
+        bricks_column = table_data.get_tag_column(TAG_BRICKS)
+        smooth_item = table_data.item(0, bricks_column)
+        self.assertEqual(smooth_item.text(), "smooth_1")
+        # The brick button is painted by the bricks delegate
+        table_data.bricks_delegate.brickClicked.emit(
+            table_data.item(0, 0).text(), smooth_item.data(Qt.UserRole)
         )
-        smooth_button = bricks_widget.layout().itemAt(0).widget()
-        self.assertEqual(smooth_button.text(), "smooth_1")
-        QTest.mouseClick(smooth_button, Qt.LeftButton)
 
         brick_history = (
             self.main_window.data_browser.table_data.brick_history_popup
@@ -1807,6 +1887,125 @@ class TestMIADataBrowser(TestMIACase):
                 get_cell_text(count_table.table, row, col), expected
             )
 
+    def test_count_table_sparse(self):
+        """Tests the rows of the count table with and without the empty
+        combinations.
+
+        - Tests: CountTable.get_row_combinations,
+          CountTable._show_empty_toggled, count_table._group_key
+        """
+        project_8_path = self.get_new_test_project()
+        self.main_window.switch_project(project_8_path, "project_8")
+        QTest.mouseClick(
+            self.main_window.data_browser.count_table_button, Qt.LeftButton
+        )
+        count_table = self.main_window.data_browser.count_table_pop_up
+        QTest.mouseClick(count_table.add_tag_label, Qt.LeftButton)
+
+        # Rows: BandWidth x EchoTime, each BandWidth having one EchoTime
+        for idx, tag in enumerate(("BandWidth", "EchoTime", "EchoTime")):
+            count_table.push_buttons[idx].setText(tag)
+            count_table.fill_values(idx)
+
+        bandwidths, echo_times, _ = count_table.values_list
+        self.assertTrue(count_table.show_empty_check_box.isChecked())
+        QTest.mouseClick(count_table.push_button_count, Qt.LeftButton)
+        self.assertEqual(len(count_table.row_combinations), 9)
+        self.assertEqual(count_table.table.rowCount(), 10)
+        totals = [count_table.table.item(9, col).text() for col in range(2, 5)]
+
+        # Unchecking the box counts again, without the empty rows
+        count_table.show_empty_check_box.setChecked(False)
+        sparse_rows = [
+            (bandwidths[0], echo_times[1]),
+            (bandwidths[1], echo_times[2]),
+            (bandwidths[2], echo_times[0]),
+        ]
+        self.assertEqual(count_table.row_combinations, sparse_rows)
+        self.assertEqual(count_table.table.rowCount(), 4)
+        self.assertEqual(
+            [count_table.table.item(3, col).text() for col in range(2, 5)],
+            totals,
+        )
+
+        # Too many combinations: the empty ones aren't shown
+        count_table.show_empty_check_box.setChecked(True)
+        self.assertEqual(count_table.table.rowCount(), 10)
+
+        with patch(
+            "populse_mia.user_interface.data_browser.count_table."
+            "COUNT_TABLE_MAX_ROWS",
+            5,
+        ):
+            self.assertEqual(count_table.get_row_combinations(), sparse_rows)
+
+        # List values are grouped as tuples, the other keys are skipped
+        count_table.values_list = [[[1, 2], [3]], ["a"]]
+        count_table.scan_groups = {
+            ((1, 2), "a"): ["scan_1.nii"],
+            (None, "a"): ["scan_2.nii"],
+            ((3,), "b"): ["scan_3.nii"],
+        }
+        self.assertEqual(
+            count_table.get_row_combinations(), [([1, 2],), ([3],)]
+        )
+        count_table.show_empty_check_box.blockSignals(True)
+        count_table.show_empty_check_box.setChecked(False)
+        count_table.show_empty_check_box.blockSignals(False)
+        self.assertEqual(count_table.get_row_combinations(), [([1, 2],)])
+
+    def test_edit_during_background_load(self):
+        """Edits a cell while rows are loaded in the background.
+
+        The row loader reads the database on its own thread: a write of the
+        GUI thread during one of its sessions must neither fail nor close
+        the session of the loader.
+
+        - Tests: RowLoader.run, TableDataBrowser.on_cell_changed
+        """
+        project_8_path = self.get_new_test_project()
+        self.main_window.switch_project(project_8_path, "project_8")
+        project = self.main_window.project
+        table_data = self.main_window.data_browser.table_data
+        scans = self.get_visible_scans()
+        read_page = RowLoader.read_page
+        reading = threading.Event()
+
+        def slow_read_page(database_data, scans, fields=None, tags=None):
+            """Read a page, keeping the session open for a while."""
+            page = read_page(database_data, scans, fields, tags)
+            reading.set()
+            time.sleep(0.5)
+            return page
+
+        loader = RowLoader(project, scans, -1)
+        page_read = QSignalSpy(loader.pageRead)
+
+        with patch.object(
+            RowLoader, "read_page", new=staticmethod(slow_read_page)
+        ):
+            loader.start()
+            self.assertTrue(reading.wait(5))
+            # Edit a cell while the loader is in its session
+            type_item = table_data.item(
+                table_data.get_scan_row(scans[0]),
+                table_data.get_tag_column(TAG_TYPE),
+            )
+            type_item.setText("Test")
+            self.assertTrue(loader.wait(5000))
+
+        QApplication.processEvents()
+        self.assertEqual(len(page_read), 1)
+        self.assertEqual(page_read[0][1], scans)
+
+        with project.database.data() as database_data:
+            self.assertEqual(
+                database_data.get_value(
+                    COLLECTION_CURRENT, scans[0], TAG_TYPE
+                ),
+                "Test",
+            )
+
     @patch("PyQt5.QtWidgets.QMessageBox.exec_", return_value=QMessageBox.Ok)
     def test_mia_preferences(self, mock_qmsgbox):
         """
@@ -2479,7 +2678,10 @@ class TestMIADataBrowser(TestMIACase):
             - Verify the filtered results.
             - Clear the filter using the cross button.
             - Verify all scans are shown again.
-            - Test filtering using NOT_DEFINED_VALUE.
+            - Test filtering using NOT_DEFINED_VALUE, restricted to the
+              given scans only.
+            - Verify that typed text is searched once the user pauses, in
+              the background, and that only the latest search is shown.
         """
 
         def get_visible_scan_names():
@@ -2584,6 +2786,118 @@ class TestMIADataBrowser(TestMIACase):
             ],
         )
 
+        # The search is restricted to the given scans only, not to the
+        # scans of the widget (it runs on a worker thread)
+        data_browser = self.main_window.data_browser
+        scans_to_search = data_browser.table_data.scans_to_search
+        data_browser.table_data.scans_to_search = ScanSet()
+
+        try:
+            self.assertEqual(
+                data_browser.find_scans(
+                    self.main_window.project.database,
+                    data_browser.search_index,
+                    NOT_DEFINED_VALUE,
+                    scans_to_search,
+                ),
+                scans_displayed,
+            )
+
+        finally:
+            data_browser.table_data.scans_to_search = scans_to_search
+
+        # Typed text is searched once the user pauses, in the background
+        search_bar = self.main_window.data_browser.search_bar
+        search_bar.setText("")
+        search_finished = QSignalSpy(
+            self.main_window.data_browser.searchFinished
+        )
+        QTest.keyClicks(search_bar, "G3")
+        self.assertEqual(len(get_visible_scan_names()), 9)
+        self.assertTrue(QSignalSpy(search_bar.searchRequested).wait(1000))
+        self.assertTrue(len(search_finished) or search_finished.wait(2000))
+        self.assertEqual(len(get_visible_scan_names()), 2)
+
+        # Only the result of the latest typed search is shown
+        search_bar.setText("")
+        search_finished = QSignalSpy(
+            self.main_window.data_browser.searchFinished
+        )
+        self.main_window.data_browser.search_str("G1", True)
+        self.main_window.data_browser.search_str("G3", True)
+        self.assertTrue(search_finished.wait(2000))
+        self.main_window.data_browser.search_runner.wait()
+        self._app.processEvents()
+        self.assertEqual(len(search_finished), 1)
+        self.assertEqual(search_finished[0], ["G3"])
+        self.assertEqual(len(get_visible_scan_names()), 2)
+
+    def test_rapid_search_add_path(self):
+        """Tests that clearing the search after adding a path shows every
+        scan.
+
+        Adding a path sets the visualized scans to all the documents before
+        clearing the search bar: the rows hidden by the previous search
+        must be shown again.
+
+        - Tests: TableDataBrowser.update_visualized_rows,
+          PopUpAddPath.save_path, Project.undo (add_scans)
+        """
+        project_8_path = self.get_new_test_project()
+        self.main_window.switch_project(project_8_path, "project_8")
+        data_browser = self.main_window.data_browser
+        table_data = data_browser.table_data
+
+        def visible_rows():
+            """Returns the number of rows shown."""
+            self._app.processEvents()
+            return sum(
+                not table_data.isRowHidden(row)
+                for row in range(table_data.rowCount())
+            )
+
+        data_browser.search_bar.setText("G1")
+        self.assertEqual(visible_rows(), 2)
+
+        # Add a copy of a scan of the project
+        raw_data_folder = os.path.join(project_8_path, "data", "raw_data")
+        scan_path = os.path.join(
+            raw_data_folder,
+            "Guerbet-C6-2014-Rat-K52-Tube27-2014-02-14102317-04-G3_"
+            "Guerbet_MDEFT-MDEFTpvm-000940_800.nii",
+        )
+        new_path = os.path.join(
+            tempfile.mkdtemp(prefix="mia_add_path_"), "added_scan.nii"
+        )
+        shutil.copy(scan_path, new_path)
+
+        with patch("PyQt5.QtWidgets.QMessageBox.show"):
+            table_data.add_path()
+            add_path = table_data.pop_up_add_path
+            add_path.file_line_edit.setText(str([new_path]))
+            add_path.type_line_edit.setText(str([TYPE_NII]))
+            QTest.mouseClick(add_path.ok_button, Qt.LeftButton)
+
+        shutil.rmtree(os.path.dirname(new_path))
+        self.assertEqual(data_browser.search_bar.text(), "")
+
+        with self.main_window.project.database.data() as database_data:
+            nb_scans = len(
+                database_data.get_document_names(COLLECTION_CURRENT)
+            )
+
+        self.assertEqual(table_data.rowCount(), nb_scans)
+        self.assertEqual(visible_rows(), nb_scans)
+
+        # Undoing the addition removes the row and the scan
+        added_scan = self.main_window.project.undos[-1][1][0]
+        self.main_window.action_undo.trigger()
+        self.assertEqual(table_data.rowCount(), nb_scans - 1)
+        self.assertEqual(visible_rows(), nb_scans - 1)
+        self.assertIsNone(table_data.get_scan_row(added_scan))
+        self.assertNotIn(added_scan, table_data.scans_to_visualize)
+        self.assertNotIn(added_scan, table_data.scans_to_search)
+
     def test_remove_scan(self):
         """
         Tests the removal of scans from the database via the
@@ -3122,6 +3436,45 @@ class TestMIADataBrowser(TestMIACase):
         )
         self.assertEqual((curr, init, gui), (TYPE_NII, TYPE_NII, TYPE_NII))
 
+    def test_row_page_cache(self):
+        """Tests the LRU cache of the pages of rows of the data browser.
+
+        - Tests: RowPageCache
+        """
+
+        cache = RowPageCache(max_cells=4)
+        first = cache.add_page(
+            ["a", "b"], {"a": {}, "b": {}}, {"a": {}, "b": {}}
+        )
+        second = cache.add_page(["c"], {"c": {}}, {"c": {}})
+        self.assertIn("a", cache)
+        self.assertEqual(cache.pages(["c", "a", "b"]), [second, first])
+
+        # Invalidated pages lose their documents, not their rows
+        cache.invalidate(["b"])
+        self.assertIsNone(cache.documents(first))
+        self.assertIsNotNone(cache.documents(second))
+        self.assertIn("b", cache)
+
+        # The values of a column loaded later are added to valid pages only
+        cache.merge_documents({"b": {"T": 1}, "c": {"T": 2}}, {"c": {"T": 3}})
+        self.assertEqual(
+            cache.documents(second), ({"c": {"T": 2}}, {"c": {"T": 3}})
+        )
+        self.assertIsNone(cache.documents(first))
+
+        # 3 rows of 2 cells: the least recently used page is evicted
+        cache.touch([first])
+        self.assertEqual(cache.evict(keep={first}, columns=2), [["c"]])
+        self.assertNotIn("c", cache)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evict(keep=set(), columns=2), [])
+
+        cache.discard("a")
+        self.assertEqual(cache.scans(first), ["b"])
+        cache.clear()
+        self.assertNotIn("b", cache)
+
     def test_save_project(self):
         """
         Test creating, saving, switching, and reopening a project, while
@@ -3516,12 +3869,12 @@ class TestMIADataBrowser(TestMIACase):
                 TAG_FILENAME
             ]
 
-        # Locate and click the brick history button for the first scan
+        # Click the brick history button for the first scan
         brick_col_index = table_data.get_tag_column(TAG_BRICKS)
-        hist_button = table_data.cellWidget(0, brick_col_index).findChild(
-            QPushButton
+        table_data.bricks_delegate.brickClicked.emit(
+            table_data.item(0, 0).text(),
+            table_data.item(0, brick_col_index).data(Qt.UserRole),
         )
-        hist_button.clicked.emit()
 
         # Assert that the history pop-up was created
         self.assertTrue(
@@ -3549,13 +3902,14 @@ class TestMIADataBrowser(TestMIACase):
         )
 
         # Re-open the history pop-up for the second scan (double-smoothed)
-        hist_button = table_data.cellWidget(1, brick_col_index).findChild(
-            QPushButton
+        table_data.bricks_delegate.brickClicked.emit(
+            table_data.item(1, 0).text(),
+            table_data.item(1, brick_col_index).data(Qt.UserRole),
+        )
+        self.assertEqual(
+            table_data.brick_history_popup.windowTitle(),
+            f"History of {table_data.item(1, 0).text()}",
         )
-        hist_button.clicked.emit()
-
-        # Optional cleanup (good practice, though not strictly required here)
-        hist_button.close()
 
     def test_sort(self):
         """
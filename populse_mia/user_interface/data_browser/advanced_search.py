@@ -12,10 +12,11 @@ Module to define the advanced search.
 
 import logging
 import os
+from functools import partial
 from typing import get_origin
 
 # PyQt5 imports
-from PyQt5.QtCore import QObjectCleanupHandler
+from PyQt5.QtCore import QObjectCleanupHandler, pyqtSignal
 from PyQt5.QtGui import QPixmap
 from PyQt5.QtWidgets import (
     QComboBox,
@@ -34,9 +35,20 @@ from populse_mia.data_manager import (
     COLLECTION_CURRENT,
     FIELD_TYPE_BOOLEAN,
     FIELD_TYPE_STRING,
-    TAG_FILENAME,
 )
+from populse_mia.data_manager.query import (
+    And,
+    Between,
+    Compare,
+    Contains,
+    In,
+    IsNull,
+    Not,
+    Or,
+)
+from populse_mia.data_manager.scan_set import ScanSet
 from populse_mia.software_properties import Config
+from populse_mia.user_interface.data_browser.search_worker import SearchRunner
 from populse_mia.user_interface.pop_ups import ClickableLabel
 
 __all__ = ["AdvancedSearch"]
@@ -66,18 +78,27 @@ class AdvancedSearch(QWidget):
               depending on the tag type.
             - displayValueRules: Update the placeholder text when the condition
               choice is changed.
+            - find_scans: Return the scans matching a filter.
             - get_filters: Get the filters in list form.
-            - launch_search: Start the search and update the table.
+            - launch_search: Start the search, updating the table when done.
             - prepare_filters: Prepare the str representation of the filter.
+            - prepare_predicate: Prepare the predicate of the filter.
             - refresh_search: Refresh the widget.
             - remove_row: Remove a row.
             - rows_borders_added: Add the links and the added row to the good
               rows.
             - rows_borders_removed: Link and adds row removed from every row.
+            - search_failed: Report a failed search.
+            - search_finished: Show the result of the latest search.
             - show_search: Reset the rows when the Advanced Search button is
               clicked.
+
+    Signals:
+        - searchFinished: Emitted once the result of a search is shown.
     """
 
+    searchFinished = pyqtSignal()
+
     def __init__(
         self,
         project,
@@ -109,6 +130,11 @@ class AdvancedSearch(QWidget):
         self.rows = []
         self.search = QPushButton("Search")
         self.search.setFixedWidth(100)
+        # Searches run in the background, see launch_search
+        self.search_runner = SearchRunner(self)
+        self.search_runner.searchFinished.connect(self.search_finished)
+        self.search_runner.searchFailed.connect(self.search_failed)
+        self._searched_filters = None
 
     def add_search_bar(self):
         """
@@ -250,6 +276,8 @@ class AdvancedSearch(QWidget):
             - May display a warning dialog on error.
             - Calls self.data_browser.table_data.update_visualized_rows().
         """
+        # A search in progress is outdated
+        self.search_runner.cancel()
         # Extract filter parameters
         nots = filter.nots
         values = filter.values
@@ -289,20 +317,13 @@ class AdvancedSearch(QWidget):
             if nots:
 
                 try:
+                    # Cached for the revision of the database
                     filter_query = self.prepare_filters(
-                        links,
-                        fields,
-                        conditions,
-                        values,
-                        nots,
-                        self.scans_list,
+                        links, fields, conditions, values, nots
                     )
-                    result = database_data.filter_documents(
-                        COLLECTION_CURRENT, filter_query
+                    result_names = database_data.filter_document_names(
+                        COLLECTION_CURRENT, filter_query, self.scans_list
                     )
-                    result_names = [
-                        document[TAG_FILENAME] for document in result
-                    ]
 
                 except Exception:
                     logger.exception(
@@ -454,6 +475,34 @@ class AdvancedSearch(QWidget):
         if should_clear:
             value.setText("")
 
+    @staticmethod
+    def find_scans(database, filter_query, scans, cancelled=None):
+        """
+        Return the scans matching a filter.
+
+        The result is cached for the revision of the database. This method
+        doesn't use the widgets, and can run on a worker thread.
+
+        :param database: (DatabaseMIA) The database of the project.
+        :param filter_query: (str) The filter, see prepare_filters.
+        :param scans: (ScanSet) The scans the search is restricted to.
+        :param cancelled: (Callable[[], bool]) Returns True once the search
+         is cancelled: the database isn't queried if it is cancelled
+         before (a query in progress can't be interrupted). Defaults to
+         None.
+
+        :Returns: (ScanSet) The matching scans.
+        """
+
+        # Don't query the database for an outdated search
+        if cancelled is not None and cancelled():
+            return ScanSet()
+
+        with database.data() as database_data:
+            return database_data.filter_document_names(
+                COLLECTION_CURRENT, filter_query, scans
+            )
+
     def get_filters(self, replace_all_by_fields):
         """
         Extract filter criteria from UI widgets.
@@ -555,76 +604,79 @@ class AdvancedSearch(QWidget):
 
     def launch_search(self):
         """
-        Execute search query and update the data browser table.
+        Start the search query, to update the data browser table.
 
-        Retrieves filter parameters, constructs and executes a database query,
-        then updates the data browser's visualized scans with the results.
-        If the search fails, displays an error dialog and reverts to showing
-        all available scans.
+        Retrieves filter parameters and constructs the database query, which
+        runs on a worker thread (see search_finished). A search still running
+        is cancelled. If the filter can't be built, displays an error dialog
+        and reverts to showing all available scans.
 
         Side Effects:
-            - Updates self.data_browser.table_data.scans_to_visualize.
-            - Updates self.data_browser.table_data.scans_to_search.
-            - Updates self.project.currentFilter (if not from_pipeline).
+            - Starts self.search_runner.
             - Displays error dialog on search failure.
         """
         # Retrieve filter parameters
         fields, conditions, values, links, nots = self.get_filters(True)
-        old_scans_list = self.data_browser.table_data.scans_to_visualize
 
         try:
-            # Construct and execute database query
             filter_query = self.prepare_filters(
-                links, fields, conditions, values, nots, self.scans_list
+                links, fields, conditions, values, nots
             )
 
-            with self.project.database.data() as database_data:
-                result = database_data.filter_documents(
-                    COLLECTION_CURRENT, filter_query
-                )
-
-            # Extract document names from results
-            result_names = [doc[TAG_FILENAME] for doc in result]
-
-            if not self.from_pipeline:
-                current_filter = self.project.currentFilter
-                current_filter.nots = nots
-                current_filter.values = values
-                current_filter.fields = fields
-                current_filter.links = links
-                current_filter.conditions = conditions
-
-        except Exception:
-            logger.exception(
-                "Exception in populse_mia.user_interface.data_browser."
-                "advanced_search.AdvancedSearch.launch_search():"
+        except Exception as error:
+            self.search_runner.cancel()
+            self.search_failed(error)
+            return
+
+        # Recorded in the current filter once the search succeeds
+        self._searched_filters = (fields, conditions, values, links, nots)
+        self.search_runner.start(
+            partial(
+                self.find_scans,
+                self.project.database,
+                filter_query,
+                ScanSet.of(self.scans_list),
             )
-            # Display error dialog when search fails.
-            msg = QMessageBox()
-            msg.setIcon(QMessageBox.Warning)
-            msg.setText("Error in the search")
-            msg.setInformativeText(
-                "An issue occurred during the search. Please correct it and "
-                "try again."
-            )
-            msg.setWindowTitle("Warning")
-            msg.setStandardButtons(QMessageBox.Ok)
-            msg.buttonClicked.connect(msg.close)
-            msg.exec()
-            result_names = self.scans_list
-
-        self.data_browser.table_data.scans_to_visualize = result_names
-        self.data_browser.table_data.scans_to_search = result_names
-        self.data_browser.table_data.update_visualized_rows(old_scans_list)
+        )
 
     @staticmethod
-    def prepare_filters(links, fields, conditions, values, nots, scans):
+    def prepare_filters(links, fields, conditions, values, nots, scans=None):
         """
         Construct a filter query string from filter components.
 
-        Builds a query by combining multiple filter rows with logical operators
-        (AND/OR), where each row can filter across multiple fields with
-        optional negation.
+        See prepare_predicate for the filter components.
+
+        :param links: Logical operators joining filter rows.
+        :param fields: Nested list of the field names filtered in each row.
+        :param conditions: Filter operators for each row.
+        :param values: Filter values corresponding to each condition.
+        :param nots: Negation flags for each row.
+        :param scans: List of scan identifiers to restrict the search scope,
+         or None to leave the query unrestricted.
+
+        :Returns: Complete filter query string with all conditions and scan
+         restrictions.
+        """
+        predicate = AdvancedSearch.prepare_predicate(
+            links, fields, conditions, values, nots
+        )
+
+        # Add scan restrictions
+        if scans is not None:
+            predicate = And(predicate, ScanSet.of(scans).predicate())
+
+        return predicate.compile()
+
+    @staticmethod
+    def prepare_predicate(links, fields, conditions, values, nots):
+        """
+        Construct a filter predicate from filter components.
+
+        Combines the filter rows with their logical operators (AND/OR), where
+        each row can filter across multiple fields with optional negation.
+        The rows are grouped from the right, as populse_db parses the
+        filters ("r0 AND r1 OR r2" is "r0 AND (r1 OR r2)"), so that saved
+        filters keep their results.
 
         :param links: Logical operators joining filter rows
          (e.g. ['AND', 'OR']). Length should be len(fields) - 1.
@@ -634,85 +686,48 @@ class AdvancedSearch(QWidget):
          '==', '!=', '<', '>', '<=', '>=', 'IN', 'BETWEEN', 'CONTAINS',
          'HAS VALUE', 'HAS NO VALUE'.
         :param values: Filter values corresponding to each condition. For
-         'BETWEEN', provide a two-element sequence [min, max].
+         'BETWEEN', provide a two-element sequence [min, max], and for 'IN'
+         a sequence of values.
         :param nots: Negation flags for each row ('NOT' to negate, empty
          string otherwise).
-        :param scans: List of scan identifiers to restrict the search scope.
 
-        :Returns: Complete filter query string with all conditions and scan
-         restrictions.
-
-        Contains:
-
-            Inner functions:
-
-                - _format_value: Convert a Python value into a string safe for
-                  use in queries.
+        :Returns: (Predicate) The filter predicate.
         """
-
-        def _format_value(value):
-            """
-            Convert a Python value into a string safe for use in queries.
-
-            This function casts the input `value` to a string and replaces
-            single quotes with double quotes to reduce the risk of
-            breaking query syntax.
-
-            :param value: The Python value to format (e.g., int, float,
-                          str, bool).
-
-            :return (str): A string representation of the value with single
-                           quotes replaced by double quotes.
-            """
-            return str(value).replace("'", '"')
-
         condition_handlers = {
-            "IN": lambda field, value: (
-                f"({{{field}}} IN {_format_value(value)})"
-            ),
-            "BETWEEN": lambda field, value: (
-                f'(({{{field}}} >= "{value[0]}") AND '
-                f'({{{field}}} <= "{value[1]}"))'
+            "IN": lambda field, value: In(
+                field, [value] if isinstance(value, str) else value
             ),
-            "HAS VALUE": lambda field, _: f"({{{field}}} != null)",
-            "HAS NO VALUE": lambda field, _: f"({{{field}}} == null)",
-            "CONTAINS": lambda field, value: f'({{{field}}} LIKE "%{value}%")',
+            "BETWEEN": lambda field, value: Between(field, value[0], value[1]),
+            "HAS VALUE": lambda field, _: Not(IsNull(field)),
+            "HAS NO VALUE": lambda field, _: IsNull(field),
+            "CONTAINS": Contains,
         }
-        # Build individual row queries
-        row_queries = []
+        # Build individual row predicates
+        rows = []
 
         for row_fields, condition, value, negation in zip(
             fields, conditions, values, nots
         ):
-            # Build condition for each field in the row
-            handler = condition_handlers.get(condition)
-
-            if handler:
-                field_queries = [handler(field, value) for field in row_fields]
-
-            else:
-                field_queries = [
-                    f'({{{field}}} {condition} "{value}")'
-                    for field in row_fields
-                ]
-
-            # Combine fields with OR and apply negation if needed
-            combined = " OR ".join(field_queries)
-            row_query = (
-                f"(NOT ({combined}))" if negation == "NOT" else f"({combined})"
+            handler = condition_handlers.get(
+                condition,
+                lambda field, value, condition=condition: Compare(
+                    field, condition, value
+                ),
             )
-            row_queries.append(row_query)
-
-        # Combine rows with logical operators
-        query = row_queries[0]
+            # Combine fields with OR and apply negation if needed
+            row = Or(*(handler(field, value) for field in row_fields))
+            rows.append(Not(row) if negation == "NOT" else row)
 
-        for link, next_query in zip(links, row_queries[1:]):
-            query = f"{query} {link} {next_query}"
+        # Combine rows with logical operators, from the right
+        linked_rows = list(zip(rows[:-1], links))
+        predicate = rows[len(linked_rows)]
 
-        # Add scan restrictions
-        query = f"{query} AND ({{{TAG_FILENAME}}} IN {_format_value(scans)})"
+        for row, link in reversed(linked_rows):
+            predicate = (
+                Or(row, predicate) if link == "OR" else And(row, predicate)
+            )
 
-        return f"({query})"
+        return predicate
 
     def refresh_search(self):
         """
@@ -868,6 +883,64 @@ class AdvancedSearch(QWidget):
             # Remove link widget (assumed at index 0)
             row[0] = _remove_widget(row[0])
 
+    def search_failed(self, error):
+        """
+        Report a failed search, and show all the available scans.
+
+        :param error: (Exception) The exception raised by the search.
+
+        Side Effects:
+            - Displays error dialog.
+            - Calls search_finished with self.scans_list.
+        """
+        logger.error(
+            "Exception in populse_mia.user_interface.data_browser."
+            "advanced_search.AdvancedSearch.launch_search():",
+            exc_info=error,
+        )
+        # Display error dialog when search fails.
+        msg = QMessageBox()
+        msg.setIcon(QMessageBox.Warning)
+        msg.setText("Error in the search")
+        msg.setInformativeText(
+            "An issue occurred during the search. Please correct it and "
+            "try again."
+        )
+        msg.setWindowTitle("Warning")
+        msg.setStandardButtons(QMessageBox.Ok)
+        msg.buttonClicked.connect(msg.close)
+        msg.exec()
+        self._searched_filters = None
+        self.search_finished(self.scans_list)
+
+    def search_finished(self, result_names):
+        """
+        Show the result of the latest search in the data browser table.
+
+        :param result_names: (ScanSet) The matching scans.
+
+        Side Effects:
+            - Updates self.data_browser.table_data.scans_to_visualize.
+            - Updates self.data_browser.table_data.scans_to_search.
+            - Updates self.project.currentFilter (if not from_pipeline).
+            - Emits searchFinished.
+        """
+
+        if not self.from_pipeline and self._searched_filters is not None:
+            fields, conditions, values, links, nots = self._searched_filters
+            current_filter = self.project.currentFilter
+            current_filter.nots = nots
+            current_filter.values = values
+            current_filter.fields = fields
+            current_filter.links = links
+            current_filter.conditions = conditions
+
+        old_scans_list = self.data_browser.table_data.scans_to_visualize
+        self.data_browser.table_data.scans_to_visualize = result_names
+        self.data_browser.table_data.scans_to_search = result_names
+        self.data_browser.table_data.update_visualized_rows(old_scans_list)
+        self.searchFinished.emit()
+
     def show_search(self):
         """
         Reset the search rows and display the search bar.
@@ -56,6 +56,7 @@ Example Workflow:
 import operator
 import os
 from functools import reduce
+from itertools import product
 from typing import Any, Callable
 
 # PyQt5 import
@@ -63,6 +64,7 @@ import PyQt5.QtCore as QtCore
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QIcon, QPixmap
 from PyQt5.QtWidgets import (
+    QCheckBox,
     QDialog,
     QHBoxLayout,
     QLabel,
@@ -80,9 +82,27 @@ from populse_mia.user_interface.pop_ups import (
     ClickableLabel,
     PopUpSelectTagCountTable,
 )
-from populse_mia.utils import set_item_data, table_to_database
+from populse_mia.utils import set_item_data
 
-__all__ = ["CountTable"]
+__all__ = ["CountTable", "ScanCountItem"]
+
+#: Maximum number of rows of a count table showing the empty combinations.
+COUNT_TABLE_MAX_ROWS = 10000
+
+
+def _group_key(value: Any) -> Any:
+    """
+    Return the hashable form of a tag value, to group the scans.
+
+    :param value: (Any) The tag value.
+
+    :Returns: (Any) The value, with the lists turned into tuples.
+    """
+
+    if isinstance(value, list):
+        return tuple(_group_key(item) for item in value)
+
+    return value
 
 
 class CountTable(QDialog):
@@ -102,7 +122,9 @@ class CountTable(QDialog):
         - Visual indicators (✓/✗) for data presence/absence.
 
     Table Structure:
-        - Rows: All combinations of the first (n-1) selected tags.
+        - Rows: All combinations of the first (n-1) selected tags, or only
+          the combinations having scans (sparse table, see
+          get_row_combinations).
         - Columns: First (n-1) tag names + values of the last tag.
         - Cells: Count of matching scans or absence indicator.
         - Footer: Total counts per column.
@@ -152,6 +174,8 @@ class CountTable(QDialog):
             - _setup_labels: Set up the add/remove tag labels with icons.
             - _setup_layout: Set up the layout of the widget.
             - _setup_table: Set up the table and count button.
+            - _show_empty_toggled: Counts the scans again when the table is
+              built.
             - add_tag: Adds a tag to visualize in the count table.
             - count_scans: Counts the number of scans depending on the selected
               tags and displays the result in the table.
@@ -162,8 +186,10 @@ class CountTable(QDialog):
             - fill_last_tag: Fills the cells corresponding to the last selected
               tag.
             - fill_values: Fill values_list depending on the visualized tags.
-            - prepare_filter: Prepares the filter in order to fill the count
-              table.
+            - get_row_combinations: Returns the combinations of the first
+              tags shown as rows.
+            - group_scans: Groups the scans by their values of the selected
+              tags.
             - refresh_layout: Updates the layout of the widget.
             - remove_tag: Removes a tag to visualize in the count table.
             - select_tag: Opens a pop-up to select which tag to visualize in
@@ -187,6 +213,9 @@ class CountTable(QDialog):
         # Tag values for each selected tag
         self.values_list: list[list[Any]] = [[], []]
         self.push_buttons: list[QPushButton] = []
+        # Scans of each tag values tuple and combinations of the rows
+        self.scan_groups: dict[tuple, list[str]] = {}
+        self.row_combinations: list[tuple] = []
         # Initialize UI components
         self._setup_components()
         self._setup_labels()
@@ -284,6 +313,22 @@ class CountTable(QDialog):
         self.placeholder.setAlignment(Qt.AlignCenter)
         self.push_button_count = QPushButton("Count Scans")
         self.push_button_count.clicked.connect(self.count_scans)
+        # Sparse table (only the combinations having scans) when unchecked
+        self.show_empty_check_box = QCheckBox("Show empty combinations")
+        self.show_empty_check_box.setChecked(True)
+        self.show_empty_check_box.setToolTip(
+            "Also show the combinations of the first tags without scans "
+            f"(up to {COUNT_TABLE_MAX_ROWS} rows)"
+        )
+        self.show_empty_check_box.toggled.connect(self._show_empty_toggled)
+
+    def _show_empty_toggled(self) -> None:
+        """
+        Count the scans again when the table was already built.
+        """
+
+        if self.table.rowCount():
+            self.count_scans()
 
     def add_tag(self) -> None:
         """
@@ -321,6 +366,10 @@ class CountTable(QDialog):
                 self.content_stack.setCurrentWidget(self.placeholder)
                 return
 
+            self.scan_groups = self.group_scans(
+                database_data, [button.text() for button in self.push_buttons]
+            )
+
         # We have valid tags: show the table view
         self.content_stack.setCurrentWidget(self.table)
         # Reset and build the table
@@ -328,9 +377,10 @@ class CountTable(QDialog):
         # Calculate dimensions
         # nb_values: number of distinct values for each selected tag
         self.nb_values = [len(values) for values in self.values_list]
-        # The number of rows will be the multiplication of all these
-        # values
-        self.nb_row = reduce(operator.mul, self.nb_values[:-1], 1)
+        # One row per combination of the (n-1) first tag values, or only
+        # per combination that has scans (sparse table)
+        self.row_combinations = self.get_row_combinations()
+        self.nb_row = len(self.row_combinations)
         # The number of columns will be the addition of the number of
         # selected tags (minus 1) and the number of different values
         # that can take the last selected tag
@@ -348,60 +398,33 @@ class CountTable(QDialog):
         """
         Populate table cells for the first (n-1) selected tags.
 
-        Generates all possible combinations of the first n-1 tag values and
-        fills corresponding table cells. Also adds total counts in the bottom
-        row.
+        Fills a row per combination of the first n-1 tag values (see
+        get_row_combinations). Also adds total counts in the bottom row.
         """
 
         with self.project.database.data() as database_data:
-            # Initialize with first values for each tag
-            # current_combination will contain the n-1 element to display
-            current_combination = [
-                values[0] for values in self.values_list[:-1]
+            tag_types = [
+                database_data.get_field_attributes(
+                    COLLECTION_CURRENT, button.text()
+                )["field_type"]
+                for button in self.push_buttons[:-1]
             ]
 
-            # Fill the total row with tag value counts
-            for col, count in enumerate(self.nb_values[:-1]):
-                item = QTableWidgetItem(str(count))
-                item.setFont(self.font)
-                self.table.setItem(self.nb_row, col, item)
-
-            # Generate all combinations and fill cells
-            for row in range(self.nb_row):
-
-                # Fill a single row with tag combination values
-                for col, value in enumerate(current_combination):
-                    item = QTableWidgetItem()
-                    tag_name = self.push_buttons[col].text()
-                    tag_type = database_data.get_field_attributes(
-                        COLLECTION_CURRENT, tag_name
-                    )["field_type"]
-                    set_item_data(item, value, tag_type)
-                    self.table.setItem(row, col, item)
-
-                # Advance to next combination using odometer-like logic
-                if not current_combination:
-                    return
-
-                # Start from rightmost position
-                pos = len(current_combination) - 1
-
-                while pos >= 0:
-                    current_idx = self.values_list[pos].index(
-                        current_combination[pos]
-                    )
-
-                    if current_idx < len(self.values_list[pos]) - 1:
-                        # Can increment this position
-                        current_combination[pos] = self.values_list[pos][
-                            current_idx + 1
-                        ]
-                        break
-
-                    else:
-                        # Reset this position and carry over
-                        current_combination[pos] = self.values_list[pos][0]
-                        pos -= 1
+        # Fill the total row with tag value counts
+        for col, count in enumerate(self.nb_values[:-1]):
+            item = QTableWidgetItem(str(count))
+            item.setFont(self.font)
+            self.table.setItem(self.nb_row, col, item)
+
+        # Fill a row with each tag combination values
+        for row, combination in enumerate(self.row_combinations):
+
+            for col, (value, tag_type) in enumerate(
+                zip(combination, tag_types)
+            ):
+                item = QTableWidgetItem()
+                set_item_data(item, value, tag_type)
+                self.table.setItem(row, col, item)
 
     def fill_headers(self) -> None:
         """
@@ -449,87 +472,46 @@ class CountTable(QDialog):
         Populate cells for the last selected tag with scan counts or
         indicators.
 
-        For each combination of first n-1 tags and each value of the last tag:
-            - Queries database for matching scans.
+        The scans grouped by their values of the selected tags in a single
+        pass over the database (see group_scans) are counted. For each row
+        combination of first n-1 tags and each value of the last tag:
             - Shows count with checkmark if scans exist.
             - Shows red X if no scans found.
-            - Adds scan filenames as tooltip.
+            - Lists the scan filenames in the tooltip (built on hover).
             - Updates column totals.
         """
         sources_images_dir = Config().getSourceImageDir()
+        present_icon = QIcon(os.path.join(sources_images_dir, "green_v.png"))
+        missing_icon = QIcon(os.path.join(sources_images_dir, "red_cross.png"))
+        # Process each column for the last tag
+        for col, last_value in enumerate(
+            self.values_list[-1], self.idx_last_tag + 1
+        ):
+            total_scans = 0
+
+            for row, combination in enumerate(self.row_combinations):
+                matching_scans = self.scan_groups.get(
+                    tuple(map(_group_key, (*combination, last_value))), []
+                )
+                # Create table item showing scan count with appropriate
+                # icon
+                item = ScanCountItem(matching_scans)
+                item.setFlags(QtCore.Qt.ItemIsEnabled)
 
-        with self.project.database.data() as database_data:
+                if matching_scans:
+                    item.setText(str(len(matching_scans)))
+                    item.setIcon(present_icon)
+
+                else:
+                    # No scans - show red X
+                    item.setIcon(missing_icon)
+
+                self.table.setItem(row, col, item)
+                total_scans += len(matching_scans)
 
-            # Process each column for the last tag
-            for col in range(self.idx_last_tag + 1, self.nb_col):
-                total_scans = 0
-
-                # Creating a tag_list that will contain
-                # couples tag_name/tag_value that
-                # will then querying the Database
-                for row in range(self.nb_row):
-                    tag_list = []
-
-                    # Add filters for first n-1 tags
-                    for tag_col in range(self.idx_last_tag + 1):
-                        tag_name = self.table.horizontalHeaderItem(
-                            tag_col
-                        ).text()
-                        tag_type = database_data.get_field_attributes(
-                            COLLECTION_CURRENT, tag_name
-                        )["field_type"]
-                        value_display = self.table.item(row, tag_col).data(
-                            Qt.EditRole
-                        )
-                        value_db = table_to_database(value_display, tag_type)
-                        tag_list.append([tag_name, value_db])
-
-                    # Add filter for the last tag
-                    last_tag_name = self.push_buttons[-1].text()
-                    last_tag_type = database_data.get_field_attributes(
-                        COLLECTION_CURRENT, last_tag_name
-                    )["field_type"]
-                    last_value_display = self.table.horizontalHeaderItem(
-                        col
-                    ).data(Qt.EditRole)
-                    last_value_db = table_to_database(
-                        last_value_display, last_tag_type
-                    )
-                    tag_list.append([last_tag_name, last_value_db])
-                    # Query database for scans matching the filter criteria
-                    filter_query = self.prepare_filter(tag_list)
-                    filtered_scans = database_data.filter_documents(
-                        COLLECTION_CURRENT, filter_query
-                    )
-                    matching_scans = [
-                        scan[TAG_FILENAME] for scan in filtered_scans
-                    ]
-                    # Create table item showing scan count with appropriate
-                    # icon
-                    item = QTableWidgetItem()
-                    item.setFlags(QtCore.Qt.ItemIsEnabled)
-
-                    if matching_scans:
-                        icon = QIcon(
-                            os.path.join(sources_images_dir, "green_v.png")
-                        )
-                        item.setText(str(len(matching_scans)))
-                        # Setting as tooltip all the corresponding scans
-                        item.setToolTip("\n".join(matching_scans))
-
-                    else:
-                        # No scans - show red X
-                        icon = QIcon(
-                            os.path.join(sources_images_dir, "red_cross.png")
-                        )
-
-                    item.setIcon(icon)
-                    self.table.setItem(row, col, item)
-                    total_scans += len(matching_scans)
-
-                item = QTableWidgetItem(str(total_scans))
-                item.setFont(self.font)
-                self.table.setItem(self.nb_row, col, item)
+            item = QTableWidgetItem(str(total_scans))
+            item.setFont(self.font)
+            self.table.setItem(self.nb_row, col, item)
 
     def fill_values(self, idx: int) -> None:
         """
@@ -561,26 +543,80 @@ class CountTable(QDialog):
 
         self.values_list[idx] = sorted(unique_values)
 
-    @staticmethod
-    def prepare_filter(tag_value_pairs: list[tuple[str, Any]]) -> str:
+    def get_row_combinations(self) -> list[tuple]:
+        """
+        Return the combinations of the first (n-1) tag values shown as rows.
+
+        All the combinations are returned if "Show empty combinations" is
+        checked and there are at most COUNT_TABLE_MAX_ROWS of them.
+        Otherwise only the combinations having scans for one of the last
+        tag values are returned (sparse table). The combinations are in the
+        order of the tag values in both cases.
+
+        :Returns: (list[tuple]) The combinations of tag values.
         """
-        Build database query string from tag-value pairs.
+        first_values = self.values_list[:-1]
+        nb_combinations = reduce(
+            operator.mul, (len(values) for values in first_values), 1
+        )
+
+        if (
+            self.show_empty_check_box.isChecked()
+            and nb_combinations <= COUNT_TABLE_MAX_ROWS
+        ):
+            return list(product(*first_values))
+
+        # Rank of each value of each of the first tags
+        ranks = [
+            {_group_key(value): rank for rank, value in enumerate(values)}
+            for values in first_values
+        ]
+        last_values = {_group_key(value) for value in self.values_list[-1]}
+        occurring = {}
 
-        :param tag_value_pairs: List of (tag_name, value) tuples.
+        for key in self.scan_groups:
 
-        :Returns: Query string for database filtering.
+            if key[-1] not in last_values:
+                continue
+
+            try:
+                rank = tuple(
+                    ranks_tag[value]
+                    for ranks_tag, value in zip(ranks, key[:-1])
+                )
+
+            except KeyError:
+                # A value not in the values of the tag (e.g. None)
+                continue
+
+            occurring[rank] = tuple(
+                values[i] for values, i in zip(first_values, rank)
+            )
+
+        return [occurring[rank] for rank in sorted(occurring)]
+
+    @staticmethod
+    def group_scans(database_data, tags: list[str]) -> dict[tuple, list]:
         """
-        conditions = []
+        Group the scans of the project by their values of the given tags.
 
-        for tag, value in tag_value_pairs:
+        All the scans are read in one query, projected on the tags.
 
-            if isinstance(value, list):
-                conditions.append(f"({{{tag}}} == {value})")
+        :param database_data: The data interface of the project database.
+        :param tags: (list[str]) The tag names.
 
-            else:
-                conditions.append(f'({{{tag}}} == "{value}")')
+        :Returns: (dict) The scan filenames, in database order, for each
+         tuple of tag values (lists turned into tuples).
+        """
+        groups = {}
+
+        for document in database_data.get_document(
+            COLLECTION_CURRENT, fields=[TAG_FILENAME, *tags]
+        ):
+            key = tuple(_group_key(document.get(tag)) for tag in tags)
+            groups.setdefault(key, []).append(document[TAG_FILENAME])
 
-        return f"({' AND '.join(conditions)})"
+        return groups
 
     def refresh_layout(self) -> None:
         """
@@ -609,6 +645,7 @@ class CountTable(QDialog):
         self.h_box_top.addWidget(self.add_tag_label)
         self.h_box_top.addWidget(self.remove_tag_label)
         self.h_box_top.addWidget(self.push_button_count)
+        self.h_box_top.addWidget(self.show_empty_check_box)
         self.h_box_top.addStretch(1)
 
         # Add to main layout
@@ -654,3 +691,41 @@ class CountTable(QDialog):
             if popup.selected_tag is not None:
                 self.push_buttons[idx].setText(popup.selected_tag)
                 self.fill_values(idx)
+
+
+class ScanCountItem(QTableWidgetItem):
+    """
+    Cell of the count table, counting the scans of a tag combination.
+
+    The tooltip listing the scans is only built when it is shown.
+
+    Contains:
+
+        Methods:
+
+            - data: Return the data of the item for a role.
+    """
+
+    def __init__(self, scans: list[str]) -> None:
+        """
+        Initialize the item.
+
+        :param scans: (list[str]) The scans of the tag combination.
+        """
+        super().__init__()
+        self.scans = scans
+
+    def data(self, role: int) -> Any:
+        """
+        Return the data of the item for a role.
+
+        :param role: (int) The Qt item data role.
+
+        :Returns: (Any) The scan filenames, one per line, for the tooltip
+         role, else the data stored for the role.
+        """
+
+        if role == Qt.ToolTipRole and self.scans:
+            return "\n".join(self.scans)
+
+        return super().data(role)
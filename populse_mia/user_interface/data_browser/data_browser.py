@@ -16,13 +16,15 @@ import logging
 import os
 import platform
 import subprocess
+from collections import OrderedDict
 from contextlib import contextmanager
 from functools import partial
+from itertools import chain
 from pathlib import Path
 from typing import get_origin
 
 # PyQt5 import
-from PyQt5.QtCore import Qt, QVariant
+from PyQt5.QtCore import QEvent, QSize, Qt, QThread, QVariant, pyqtSignal
 from PyQt5.QtGui import QColor, QIcon, QPixmap
 from PyQt5.QtWidgets import (
     QAbstractItemView,
@@ -37,10 +39,11 @@ from PyQt5.QtWidgets import (
     QItemDelegate,
     QMenu,
     QMessageBox,
-    QProgressDialog,
     QPushButton,
     QSizePolicy,
     QSplitter,
+    QStyle,
+    QStyleOptionButton,
     QTableWidget,
     QTableWidgetItem,
     QTimeEdit,
@@ -52,6 +55,7 @@ from PyQt5.QtWidgets import (
 
 # populse_mia import
 from populse_mia.data_manager import (
+    BRICK_ID,
     BRICK_INPUTS,
     BRICK_NAME,
     BRICK_OUTPUTS,
@@ -79,6 +83,14 @@ from populse_mia.data_manager import (
     TAG_ORIGIN_BUILTIN,
     TAG_ORIGIN_USER,
 )
+from populse_mia.data_manager.database_mia import (
+    CHANGE_ADDED,
+    CHANGE_MODIFIED,
+    CHANGE_REMOVED,
+    ChangeSet,
+)
+from populse_mia.data_manager.scan_set import ScanSet
+from populse_mia.data_manager.search_index import SearchIndex
 from populse_mia.software_properties import Config
 from populse_mia.user_interface.data_browser.advanced_search import (
     AdvancedSearch,
@@ -87,6 +99,7 @@ from populse_mia.user_interface.data_browser.count_table import CountTable
 from populse_mia.user_interface.data_browser.mini_viewer import MiniViewer
 from populse_mia.user_interface.data_browser.modify_table import ModifyTable
 from populse_mia.user_interface.data_browser.rapid_search import RapidSearch
+from populse_mia.user_interface.data_browser.search_worker import SearchRunner
 from populse_mia.user_interface.pop_ups import (
     ClickableLabel,
     PopUpAddPath,
@@ -102,6 +115,7 @@ from populse_mia.user_interface.pop_ups import (
 )
 from populse_mia.utils import (
     check_value_type,
+    remove_files,
     safe_connect,
     safe_disconnect,
     set_item_data,
@@ -110,16 +124,149 @@ from populse_mia.utils import (
 )
 
 __all__ = [
+    "BricksDelegate",
     "DataBrowser",
     "DateFormatDelegate",
     "DateTimeFormatDelegate",
     "NumberFormatDelegate",
+    "RowLoader",
+    "RowPageCache",
     "TableDataBrowser",
     "TimeFormatDelegate",
 ]
 
 logger = logging.getLogger(__name__)
 
+#: Number of rows of the data browser loaded from the database at once.
+ROW_PAGE_SIZE = 100
+
+#: Default memory budget of the data browser row cache, in table cells.
+ROW_CACHE_MAX_CELLS = 300000
+
+#: Background colors of the data browser cells, by (state, even row).
+CELL_COLORS = {
+    ("white", True): (255, 255, 255),  # White
+    ("white", False): (230, 230, 230),  # Grey
+    ("modified", True): (200, 230, 245),  # Cyan
+    ("modified", False): (150, 215, 230),  # Blue
+    ("user_or_null", True): (245, 215, 215),  # Pink
+    ("user_or_null", False): (245, 175, 175),  # Red
+}
+
+
+class BricksDelegate(QItemDelegate):
+    """
+    A delegate painting the last brick of a document as a push button.
+
+    The data browser used to create a QPushButton widget per cell of the
+    bricks column, which made the filling of the table slow for large
+    projects. The button is now painted from the item (its text is the brick
+    name, and its Qt.UserRole data the brick uuid) and a click on it emits
+    brickClicked.
+
+    Contains:
+
+        Methods:
+
+            - button_rect: Return the rectangle of the button in a cell.
+            - editorEvent: Emit brickClicked when the button is clicked.
+            - paint: Paint the brick button of a cell.
+            - sizeHint: Return the size of a cell with its button.
+    """
+
+    #: Margin between the cell and its button, in pixels.
+    MARGIN = 4
+
+    # Emitted with the document (scan) and the brick uuid
+    brickClicked = pyqtSignal(str, str)
+
+    def __init__(self, parent=None):
+        """
+        Initialize the BricksDelegate.
+
+        :param parent: Optional parent QObject. Defaults to None.
+        """
+        super().__init__(parent)
+
+    def button_rect(self, rect):
+        """
+        Return the rectangle of the button in a cell.
+
+        :param rect: (QRect) The rectangle of the cell.
+
+        :Returns: (QRect) The rectangle of the button.
+        """
+        return rect.adjusted(
+            self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN
+        )
+
+    def editorEvent(self, event, model, option, index):
+        """
+        Emit brickClicked when the button of a cell is clicked.
+
+        :param event: (QEvent) The event sent to the cell.
+        :param model: (QAbstractItemModel) The model of the cell.
+        :param option: (QStyleOptionViewItem) Style options of the cell.
+        :param index: (QModelIndex) The index of the cell.
+
+        :Returns: (bool) True if the event was handled, False otherwise.
+        """
+        brick_uuid = index.data(Qt.UserRole)
+
+        if (
+            brick_uuid
+            and index.data()
+            and event.type() == QEvent.MouseButtonRelease
+            and event.button() == Qt.LeftButton
+            and self.button_rect(option.rect).contains(event.pos())
+        ):
+            self.brickClicked.emit(
+                index.sibling(index.row(), 0).data(), brick_uuid
+            )
+            return True
+
+        return super().editorEvent(event, model, option, index)
+
+    def paint(self, painter, option, index):
+        """
+        Paint the brick button of a cell.
+
+        Cells without brick are painted as any other cell.
+
+        :param painter: (QPainter) The painter of the view.
+        :param option: (QStyleOptionViewItem) Style options of the cell.
+        :param index: (QModelIndex) The index of the cell.
+        """
+
+        if not (index.data(Qt.UserRole) and index.data()):
+            super().paint(painter, option, index)
+            return
+
+        self.drawBackground(painter, option, index)
+        button = QStyleOptionButton()
+        button.rect = self.button_rect(option.rect)
+        button.text = index.data()
+        button.state = QStyle.State_Enabled | QStyle.State_Raised
+        widget = option.widget
+        style = widget.style() if widget else QApplication.style()
+        style.drawControl(QStyle.CE_PushButton, button, painter, widget)
+
+    def sizeHint(self, option, index):
+        """
+        Return the size of a cell with its button.
+
+        :param option: (QStyleOptionViewItem) Style options of the cell.
+        :param index: (QModelIndex) The index of the cell.
+
+        :Returns: (QSize) The size hint of the cell.
+        """
+        size = super().sizeHint(option, index)
+
+        if not index.data(Qt.UserRole):
+            return size
+
+        return size + QSize(4 * self.MARGIN, 4 * self.MARGIN)
+
 
 class DataBrowser(QWidget):
     """
@@ -143,6 +290,7 @@ class DataBrowser(QWidget):
             - count_table_pop_up: Open the count table.
             - create_layout: Create the layout of the data browser.
             - create_toolbar_view: Create the toolbar views.
+            - find_scans: Return the scans matching a search string.
             - move_splitter: Check if the viewer's splitter is at its lowest
               position.
             - open_filter: Open a project filter that has already been saved.
@@ -150,6 +298,7 @@ class DataBrowser(QWidget):
             - remove_tag_infos: Remove user tags after the pop-up.
             - remove_tag_pop_up: Display the pop-up to remove user tags.
             - reset_search_bar: Reset the rapid search bar.
+            - search_finished: Show the result of the latest rapid search.
             - search_str: Search a string in the table and updates the
               visualized documents.
             - send_documents_to_pipeline: Send the current list of scans to
@@ -158,8 +307,14 @@ class DataBrowser(QWidget):
             - toggle_advanced_search: Toggle the visibility of the advanced
               search interface.
             - update_database: Update the database in the software.
+
+    Signals:
+        - searchFinished: Emits the text of a rapid search once its result
+          is shown.
     """
 
+    searchFinished = pyqtSignal(str)
+
     def __init__(self, project, main_window):
         """
         Initialization of the data_browser class.
@@ -183,8 +338,13 @@ class DataBrowser(QWidget):
             "Open filter", self, shortcut="Ctrl+F"
         )
         # Initialize core Mia functional components
-        # Quick search functionality
+        # Quick search functionality, and its index of the values
         self.search_bar = RapidSearch(self)
+        self.search_index = SearchIndex(self.project.database)
+        # Typed searches run in the background, see search_str
+        self.search_runner = SearchRunner(self)
+        self.search_runner.searchFinished.connect(self.search_finished)
+        self._searched_text = ""
         # Compact data viewer component
         self.viewer = MiniViewer(self.project)
         # Advanced search interface
@@ -482,7 +642,7 @@ class DataBrowser(QWidget):
 
     def connect_toolbar(self):
         """Connect methods to toolbar."""
-        self.search_bar.textChanged.connect(self.search_str)
+        self.search_bar.searchRequested.connect(self.search_str)
         self.button_cross.clicked.connect(self.reset_search_bar)
         self.advanced_search_button.clicked.connect(
             self.toggle_advanced_search
@@ -772,54 +932,117 @@ class DataBrowser(QWidget):
         """
         self.search_bar.setText("")
 
-    def search_str(self, str_search):
+    def search_finished(self, scans):
+        """
+        Show the result of the latest rapid search.
+
+        :param scans: (ScanSet) The scans matching the search.
+        """
+        old_scan_list = self.table_data.scans_to_visualize
+        self.table_data.scans_to_visualize = scans
+        self.table_data.update_visualized_rows(old_scan_list)
+        self.project.currentFilter.search_bar = self._searched_text
+        self.searchFinished.emit(self._searched_text)
+
+    def search_str(self, str_search, typed=False):
         """
         Search and filter documents in the table based on a search string.
 
-        Updates the table's visualized documents based on the search criteria.
-        An empty string shows all searchable scans. The special value
-        NOT_DEFINED_VALUE filters for documents with undefined field values.
+        Updates the table's visualized documents based on the search criteria
+        (see find_scans). An empty string shows all searchable scans. The
+        searches of typed text run on a worker thread, the table being
+        updated with the result of the latest one only (see
+        search_finished); the other searches are run at once.
 
         :param str_search: The search string to filter documents. Empty string
          returns all searchable scans. NOT_DEFINED_VALUE returns scans with
          undefined values.
+        :param typed: (bool) True if the text was typed by the user. Defaults
+         to False.
         """
-        old_scan_list = self.table_data.scans_to_visualize
+        # A previous search is outdated
+        self.search_runner.cancel()
+        self._searched_text = str_search
+        scans = self.table_data.scans_to_search
 
         # Handle empty search - return all searchable scans
         if not str_search:
-            filtered_scans = self.table_data.scans_to_search
+            self.search_finished(scans)
+            return
+
+        search = partial(
+            self.find_scans,
+            self.project.database,
+            self.search_index,
+            str_search,
+            scans,
+        )
+
+        if typed:
+            self.search_runner.start(search)
 
         else:
+            self.search_finished(search())
 
-            with self.project.database.data() as database_data:
-                shown_tags = database_data.get_shown_tags()
+    def find_scans(
+        self, database, search_index, str_search, scans, cancelled=None
+    ):
+        """
+        Return the scans matching a search string.
+
+        The searches are answered by the search index, or by a database
+        query when the project is too large to be indexed. This method
+        doesn't use the widgets, and can run on a worker thread.
+
+        :param database: (DatabaseMIA) The database of the project.
+        :param search_index: (SearchIndex) The search index of the project.
+        :param str_search: (str) The search string, not empty.
+         NOT_DEFINED_VALUE matches the scans with undefined values.
+        :param scans: (ScanSet) The scans the search is restricted to.
+        :param cancelled: (Callable[[], bool]) Returns True once the search
+         is cancelled, its result being ignored: the database isn't read
+         anymore. Defaults to None.
+
+        :Returns: (ScanSet) The matching scans.
+        """
+
+        with database.data() as database_data:
+            shown_tags = database_data.get_shown_tags()
+
+        filtered_scans = (
+            None
+            if str_search == NOT_DEFINED_VALUE
+            else search_index.search(str_search, shown_tags, scans, cancelled)
+        )
+
+        if filtered_scans is None:
+
+            # Don't query the database for an outdated search
+            if cancelled is not None and cancelled():
+                return ScanSet()
+
+            with database.data() as database_data:
 
                 # Prepare filter based on search type
                 if str_search == NOT_DEFINED_VALUE:
                     filter_criteria = (
-                        self.search_bar.prepare_not_defined_filter(shown_tags)
+                        self.search_bar.prepare_not_defined_predicate(
+                            shown_tags
+                        )
                     )
 
                 else:
                     filter_criteria = self.search_bar.prepare_filter(
-                        str_search,
-                        shown_tags,
-                        self.table_data.scans_to_search,
+                        str_search, shown_tags
                     )
 
-                # Apply filter and extract filenames
-                filtered_documents = database_data.filter_documents(
-                    COLLECTION_CURRENT, filter_criteria
+                # Apply filter to the searched scans, cached for the
+                # revision of the database
+                filtered_scans = database_data.filter_document_names(
+                    COLLECTION_CURRENT, filter_criteria, scans
                 )
-                filtered_scans = [
-                    scan[TAG_FILENAME] for scan in filtered_documents
-                ]
 
-        # Update table state
-        self.table_data.scans_to_visualize = filtered_scans
-        self.table_data.update_visualized_rows(old_scan_list)
-        self.project.currentFilter.search_bar = str_search
+        return ScanSet.of(filtered_scans)
 
     def send_documents_to_pipeline(self):
         """
@@ -876,7 +1099,8 @@ class DataBrowser(QWidget):
 
         else:
             # Hide the advanced search interface and restore the original
-            # scans list
+            # scans list, dropping the search in progress
+            self.advanced_search.search_runner.cancel()
             old_scans_list = self.table_data.scans_to_visualize
             self.frame_advanced_search.setHidden(True)
             self.advanced_search.rows = []
@@ -918,6 +1142,11 @@ class DataBrowser(QWidget):
         ):
             component.project = database
 
+        # The index follows the documents of the new project, the search
+        # in progress is outdated
+        self.search_runner.cancel()
+        self.search_index.close()
+        self.search_index = SearchIndex(database.database)
         # Reset UI state for new project
         self.frame_advanced_search.setHidden(True)
 
@@ -1057,6 +1286,393 @@ class NumberFormatDelegate(QItemDelegate):
         return editor
 
 
+class RowLoader(QThread):
+    """
+    Worker thread reading the rows of the data browser in the background.
+
+    The documents of the scans are read by pages of ROW_PAGE_SIZE scans, with
+    a database session per page, and each page is sent to the table with the
+    pageRead signal: the items are created on the GUI thread, when the
+    signal is received. The loading stops between two pages when an
+    interruption is requested.
+
+    The sessions of the worker use their own connection to the database
+    (see DatabaseMIA._thread_storage), so the table can write meanwhile.
+
+    Contains:
+
+        Methods:
+
+            - read_page: Read the documents of a page of scans.
+            - run: Read the pages and send them to the table.
+
+    Signals:
+        - pageRead: Emits the id of the load, the scans of a page and the
+          page read by read_page.
+    """
+
+    pageRead = pyqtSignal(int, list, dict)
+
+    def __init__(self, project, scans, load_id, parent=None, tags=None):
+        """
+        Initialize the RowLoader.
+
+        :param project: (Project) The project whose documents are read.
+        :param scans: (list[str]) The scans whose rows are loaded, in the
+         order in which they are read.
+        :param load_id: (int) The id of the load, sent with each page so that
+         the pages of a cancelled load can be ignored.
+        :param parent: (QObject) The parent object. Defaults to None.
+        :param tags: (list[str]) The tags read, those of the loaded columns.
+         All the tags if None.
+        """
+        super().__init__(parent)
+        self.project = project
+        self.scans = scans
+        self.load_id = load_id
+        self.tags = tags
+
+    @staticmethod
+    def read_page(database_data, scans, fields=None, tags=None):
+        """
+        Read the documents of a page of scans.
+
+        :param database_data: (DatabaseMiaData) An open database session.
+        :param scans: (list[str]) The scans of the page.
+        :param fields: (dict) Field attributes, by field name. Read from the
+         database if None.
+        :param tags: (list[str]) The tags read (the documents only hold
+         these values). All the tags if None.
+
+        :Returns: (dict) The "current" and "initial" documents by scan, the
+         "brick_names" by uuid of the last brick of each document, and the
+         "fields" attributes.
+        """
+
+        if fields is None:
+            fields = TableDataBrowser._field_attributes(database_data)
+
+        documents_curr = TableDataBrowser._documents_by_scan(
+            database_data, COLLECTION_CURRENT, scans, fields=tags
+        )
+        documents_init = TableDataBrowser._documents_by_scan(
+            database_data, COLLECTION_INITIAL, scans, fields=tags
+        )
+        # Names of the last brick of each document
+        brick_uuids = list(
+            {
+                document[TAG_BRICKS][-1]
+                for document in documents_curr.values()
+                if document.get(TAG_BRICKS)
+            }
+        )
+        brick_names = {
+            brick[BRICK_ID]: brick[BRICK_NAME]
+            for brick in (
+                database_data.get_document(
+                    COLLECTION_BRICK,
+                    brick_uuids,
+                    fields=[BRICK_ID, BRICK_NAME],
+                )
+                if brick_uuids
+                else []
+            )
+        }
+        return {
+            "current": documents_curr,
+            "initial": documents_init,
+            "brick_names": brick_names,
+            "fields": fields,
+        }
+
+    def run(self):
+        """
+        Read the pages of scans and emit them, until interrupted.
+
+        This method overrides the QThread run method.
+        """
+        fields = None
+
+        for start in range(0, len(self.scans), ROW_PAGE_SIZE):
+
+            if self.isInterruptionRequested():
+                return
+
+            end = start + ROW_PAGE_SIZE
+            scans = self.scans[start:end]
+
+            with self.project.database.data() as database_data:
+                page = self.read_page(database_data, scans, fields, self.tags)
+
+            fields = page["fields"]
+            self.pageRead.emit(self.load_id, scans, page)
+
+
+class RowPageCache:
+    """
+    LRU cache of the pages of rows loaded in the data browser.
+
+    A page is a group of at most ROW_PAGE_SIZE rows loaded together: the
+    table holds the items of its rows, and the cache the current and initial
+    documents of its scans. The documents of a page are set to None when
+    the page is invalidated by an edit, and read again when needed.
+
+    The least recently used pages are evicted when the rows of the cached
+    pages hold more than max_cells cells.
+
+    Contains:
+
+        Methods:
+
+            - __contains__: Return True if a scan is in a cached page.
+            - __len__: Return the number of cached scans.
+            - add_page: Add a page of scans and their documents.
+            - clear: Forget all the pages.
+            - discard: Forget a scan.
+            - documents: Return the documents of a page.
+            - evict: Evict the least recently used pages over the budget.
+            - invalidate: Forget the documents of the pages of scans.
+            - merge_documents: Add values to the cached documents.
+            - pages: Return the pages of scans.
+            - scans: Return the scans of a page.
+            - set_documents: Set the documents of a page.
+            - set_value: Update a value of a cached current document.
+            - touch: Mark pages as the most recently used.
+    """
+
+    def __init__(self, max_cells=ROW_CACHE_MAX_CELLS):
+        """
+        Initialize the RowPageCache.
+
+        :param max_cells: (int) The memory budget of the cache, as a number
+         of table cells. Defaults to ROW_CACHE_MAX_CELLS.
+        """
+        self.max_cells = max_cells
+        # Page id -> {"scans": [...], "current": {...}, "initial": {...}},
+        # from the least to the most recently used
+        self._pages = OrderedDict()
+        self._scan_pages = {}
+        self._next_page = 0
+
+    def __contains__(self, scan):
+        """
+        Return True if a scan is in a cached page.
+
+        :param scan: (str) The scan.
+
+        :Returns: (bool) True if the row of the scan is loaded.
+        """
+        return scan in self._scan_pages
+
+    def __len__(self):
+        """
+        Return the number of cached scans.
+
+        :Returns: (int) The number of loaded rows.
+        """
+        return len(self._scan_pages)
+
+    def add_page(self, scans, documents_curr, documents_init):
+        """
+        Add a page of scans and their documents, as the most recently used.
+
+        :param scans: (list[str]) The scans of the page.
+        :param documents_curr: (dict) The current documents, by scan.
+        :param documents_init: (dict) The initial documents, by scan.
+
+        :Returns: (int) The id of the new page.
+        """
+        page = self._next_page
+        self._next_page += 1
+        self._pages[page] = {
+            "scans": list(scans),
+            "current": documents_curr,
+            "initial": documents_init,
+        }
+
+        for scan in scans:
+            self._scan_pages[scan] = page
+
+        return page
+
+    def clear(self):
+        """
+        Forget all the pages.
+        """
+        self._pages.clear()
+        self._scan_pages.clear()
+
+    def discard(self, scan):
+        """
+        Forget a scan, when its row is removed from the table.
+
+        :param scan: (str) The scan.
+        """
+        page = self._scan_pages.pop(scan, None)
+
+        if page is None:
+            return
+
+        entry = self._pages[page]
+        entry["scans"].remove(scan)
+
+        if not entry["scans"]:
+            del self._pages[page]
+
+    def documents(self, page):
+        """
+        Return the documents of a page.
+
+        :param page: (int) The id of the page.
+
+        :Returns: (tuple[dict, dict]) The current and initial documents, by
+         scan, or None if the page was invalidated.
+        """
+        entry = self._pages[page]
+
+        if entry["current"] is None:
+            return None
+
+        return entry["current"], entry["initial"]
+
+    def evict(self, keep, columns):
+        """
+        Evict the least recently used pages while over the budget.
+
+        :param keep: (set[int]) The pages that must not be evicted.
+        :param columns: (int) The number of cells of a row.
+
+        :Returns: (list[list[str]]) The scans of each evicted page.
+        """
+        rows = len(self._scan_pages)
+        evicted = []
+
+        for page in list(self._pages):
+
+            if rows * max(columns, 1) <= self.max_cells:
+                break
+
+            if page in keep:
+                continue
+
+            scans = self._pages.pop(page)["scans"]
+
+            for scan in scans:
+                del self._scan_pages[scan]
+
+            rows -= len(scans)
+            evicted.append(scans)
+
+        return evicted
+
+    def invalidate(self, scans=None):
+        """
+        Forget the documents of the pages of scans.
+
+        :param scans: (iterable[str]) The scans whose values changed. All
+         the pages are invalidated if None.
+        """
+        pages = self._pages if scans is None else self.pages(scans)
+
+        for page in pages:
+            self._pages[page]["current"] = None
+            self._pages[page]["initial"] = None
+
+    def merge_documents(self, documents_curr, documents_init):
+        """
+        Add values to the cached documents, when a column is loaded.
+
+        The documents of the pages that are not cached or were invalidated
+        are ignored.
+
+        :param documents_curr: (dict) Current values, by scan.
+        :param documents_init: (dict) Initial values, by scan.
+        """
+
+        for scan, values_curr in documents_curr.items():
+            page = self._scan_pages.get(scan)
+
+            if page is None or self._pages[page]["current"] is None:
+                continue
+
+            entry = self._pages[page]
+            entry["current"].setdefault(scan, {}).update(values_curr)
+
+            if scan in documents_init:
+                entry["initial"].setdefault(scan, {}).update(
+                    documents_init[scan]
+                )
+
+    def pages(self, scans):
+        """
+        Return the pages of scans.
+
+        :param scans: (iterable[str]) The scans.
+
+        :Returns: (list[int]) The ids of the pages holding the scans, without
+         duplicates. The scans not in the cache are ignored.
+        """
+        return list(
+            dict.fromkeys(
+                self._scan_pages[scan]
+                for scan in scans
+                if scan in self._scan_pages
+            )
+        )
+
+    def scans(self, page):
+        """
+        Return the scans of a page.
+
+        :param page: (int) The id of the page.
+
+        :Returns: (list[str]) The scans of the page.
+        """
+        return self._pages[page]["scans"]
+
+    def set_documents(self, page, documents_curr, documents_init):
+        """
+        Set the documents of a page, read again after an invalidation.
+
+        :param page: (int) The id of the page.
+        :param documents_curr: (dict) The current documents, by scan.
+        :param documents_init: (dict) The initial documents, by scan.
+        """
+        self._pages[page]["current"] = documents_curr
+        self._pages[page]["initial"] = documents_init
+
+    def set_value(self, scan, tag, value):
+        """
+        Update a value of a cached current document, after an edit.
+
+        Nothing is done if the page of the scan isn't cached or was
+        invalidated.
+
+        :param scan: (str) The scan of the document.
+        :param tag: (str) The tag of the value.
+        :param value: The new current value (None if removed).
+        """
+        page = self._scan_pages.get(scan)
+
+        if page is None:
+            return
+
+        documents = self._pages[page]["current"]
+
+        if documents is not None and scan in documents:
+            documents[scan][tag] = value
+
+    def touch(self, pages):
+        """
+        Mark pages as the most recently used.
+
+        :param pages: (iterable[int]) The ids of the pages.
+        """
+
+        for page in pages:
+            self._pages.move_to_end(page)
+
+
 class TableDataBrowser(QTableWidget):
     """
     Table widget that displays the documents contained in the database and
@@ -1066,10 +1682,39 @@ class TableDataBrowser(QTableWidget):
 
         Methods:
 
+            - _add_background_page: Install a page read in the background.
+            - _cancel_background_load: Stop loading rows in the background.
+            - _color_rows: Set the background colors of loaded rows.
+            - _documents_by_scan: Fetch the documents of scans.
+            - _cell_item: Create the item of a cell.
+            - _field_attributes: Read the attributes of all the fields.
+            - _fill_row: Create the items of a row.
+            - _hidden_tags: Return the tags of the hidden columns.
+            - _install_page: Create the items of the rows of a page.
+            - _load_columns: Create the items of columns in the loaded rows.
+            - _load_rows: Create the items of the rows not loaded yet.
+            - _loaded_tags: Return the tags of the loaded columns.
+            - _load_visible_rows: Load the rows in view.
+            - _page_documents: Return the documents of cached pages.
+            - _refresh_rows: Create again the items of changed rows.
+            - _remove_rows: Remove the rows of scans.
+            - _row_cells: Return the number of loaded cells of a row.
+            - _row_parity: Return whether each row is an even visible row.
+            - _scan_rows: Return the row of each scan of the table.
+            - _set_cell_value: Set the value of a cell.
+            - _set_column_delegates: Set the delegate of each column.
+            - _set_row_order: Lay the rows out in a new order.
+            - _set_row_scans: Set the scans of the rows.
+            - _sort_rows: Sort the rows by the values of tags.
+            - _sorted_scans: Return scans sorted by the values of tags.
+            - _start_background_load: Load the rows in the background.
+            - _unload_pages: Drop the items of the rows of evicted pages.
             - add_column: Add a column to the table.
             - add_columns: Add columns to the table.
             - add_path: Call a pop-up to add any document to the project.
             - add_rows: Insert rows if they are not already in the table.
+            - apply_database_changes: Apply the changes of the database
+              since the table was filled.
             - batch_update: Context manager for efficient batch updates.
             - clear_cell: Clear the selected cells.
             - context_menu_table: Create the context menu of the table.
@@ -1086,6 +1731,9 @@ class TableDataBrowser(QTableWidget):
             - get_index_insertion: Get index insertion of a new column.
             - get_scan_row: Return the row index of the scan.
             - get_tag_column: Return the column index of the tag.
+            - hideEvent: Stop the background load when the table is hidden.
+            - invalidate_scans: Invalidate the cached documents of scans.
+            - item: Return the item of a cell, loading its row if needed.
             - mouseReleaseEvent: Called when clicking released on cells.
             - multiple_sort_infos: Sort the table according to the tags specify
               in list_tags.
@@ -1093,21 +1741,29 @@ class TableDataBrowser(QTableWidget):
             - on_cell_changed: Changes the background color and the value of
               cells when edited by the user.
             - remove_scan: Remove documents from table and project.
+            - removeColumn: Remove a column from the table.
+            - removeRow: Remove a row from the table.
             - reset_cell: Reset the selected cells to their original values.
             - reset_column: Reset the selected columns to their original
               values.
             - reset_row: Reset the selected rows to their original values.
+            - resizeEvent: Load the rows brought into view by a resize.
+            - scans_to_search: The scans the searches are restricted to.
+            - scans_to_visualize: The scans shown in the table.
             - section_moved: Called when the columns of the data_browser are
               moved.
             - select_all_column: Called when single clicking on the column
               header to select the whole column.
             - select_all_columns: Called from context menu to select the
               columns.
+            - selectedItems: Return the selected items.
             - selection_changed: Called when the selection is changed.
             - show_brick_history: Show brick history pop-up.
+            - showEvent: Load the rows when the table is shown.
             - sort_column: Sort the current column.
             - sort_updated: Called when the button advanced search is called.
-            - update_colors: Update the background of all the cells.
+            - update_cached_value: Record a value written in the database.
+            - update_colors: Update the background of the loaded cells.
             - update_selection: Called after searches to update the selection.
             - update_table: Fill the table with the project's data.
             - update_visualized_columns: Update the visualized tags.
@@ -1159,7 +1815,37 @@ class TableDataBrowser(QTableWidget):
         self.update_values = update_values
         self.activate_selection = activate_selection
         self.link_viewer = link_viewer
-        self.bricks = {}
+        # Scan of each row, row of each scan (see _scan_rows), and cache of
+        # the loaded pages of rows
+        self._row_scans = []
+        self._row_index = {}
+        self.row_cache = RowPageCache()
+        # Shown scans and scans searched, see the properties
+        self._scans_to_visualize = ScanSet()
+        self._scans_to_search = ScanSet()
+        self._last_scroll_value = 0
+        # Color key of each cell of the colored rows, by scan
+        self._cell_states = {}
+        # Tags of the columns whose items are not created: hidden columns
+        # are only filled when they are shown
+        self._unloaded_columns = set()
+        # Background load of the rows: worker, id of the current load, row
+        # of each scan to load, row parity, and scans edited meanwhile
+        self._row_loader = None
+        self._background_load_id = 0
+        self._background_rows = {}
+        self._background_parity = []
+        self._background_edits = set()
+        # Changes of the database since the table was filled, applied as
+        # deltas by apply_database_changes, and the recorded database
+        self._database_changes = ChangeSet()
+        self._changes_database = None
+        # Read once, updated by the preferences pop-up
+        self.auto_save = Config().isAutoSave()
+        # Delegates shared by the columns, by delegate class
+        self._format_delegates = {}
+        self.bricks_delegate = BricksDelegate(self)
+        self.bricks_delegate.brickClicked.connect(self.show_brick_history)
         # Configure table behavior
         # Configure selection mode based on activate_selection setting
         self.setSelectionMode(
@@ -1200,40 +1886,984 @@ class TableDataBrowser(QTableWidget):
         horizontal_header.sortIndicatorChanged.connect(self.sort_updated)
         horizontal_header.sectionDoubleClicked.connect(self.select_all_column)
         horizontal_header.sectionMoved.connect(self.section_moved)
+        # Rows are loaded when they are scrolled into view
+        self.verticalScrollBar().valueChanged.connect(self._load_visible_rows)
         # Initialize table content
         self.update_table(True)
 
-    def add_column(self, column, tag):
+    def _add_background_page(self, load_id, scans, page):
         """
-        Add a new column to the table with the specified tag.
-
-        Inserts a column at the given index, configures its header with
-        metadata from the database, sets the appropriate delegate based on
-        field type, and populates cells with current values from the database.
+        Install a page of rows read in the background by the row loader.
 
-        :param column: (int) Zero-based index where the column should be
-         inserted.
-        :param tag: (str) Tag name identifying the field to add from the
-         database.
+        The page is ignored if it belongs to a cancelled load. The rows that
+        were loaded, moved or edited since the load started are skipped, and
+        the load stops when the row cache has no room left.
 
-        Note:
-            Temporarily disconnects item change signals during insertion to
-            prevent unwanted event triggers, then reconnects them after
-            completion.
+        :param load_id: (int) The id of the load of the page.
+        :param scans: (list[str]) The scans of the page.
+        :param page: (dict) The page, as read by RowLoader.read_page.
         """
-        # Safely disconnect signals
-        safe_disconnect(self.itemChanged, self.on_cell_changed)
 
-        if self.activate_selection:
-            safe_disconnect(self.itemSelectionChanged, self.selection_changed)
+        if load_id != self._background_load_id:
+            return
 
-        try:
-            # Insert column and configure header
-            self.insertColumn(column)
-            header_item = QTableWidgetItem()
-            self.setHorizontalHeaderItem(column, header_item)
+        rows_page = [
+            (row, scan)
+            for scan in scans
+            if (row := self._background_rows.get(scan)) is not None
+            and row < len(self._row_scans)
+            and self._row_scans[row] == scan
+            and scan not in self.row_cache
+            and scan not in self._background_edits
+        ]
 
-            with self.project.database.data() as database_data:
+        if not rows_page:
+            return
+
+        if (
+            len(self.row_cache) + len(rows_page)
+        ) * self._row_cells() > self.row_cache.max_cells:
+            self._cancel_background_load()
+            return
+
+        rows = [row for row, _ in rows_page]
+        scans = [scan for _, scan in rows_page]
+        # The page only keeps the documents of its rows
+        page = dict(
+            page,
+            current={
+                scan: page["current"][scan]
+                for scan in scans
+                if scan in page["current"]
+            },
+            initial={
+                scan: page["initial"][scan]
+                for scan in scans
+                if scan in page["initial"]
+            },
+        )
+        tags = [
+            (
+                header.text()
+                if (header := self.horizontalHeaderItem(col))
+                else None
+            )
+            for col in range(self.columnCount())
+        ]
+        signals_blocked = self.blockSignals(True)
+
+        try:
+            self._install_page(rows, scans, page, tags)
+            self._color_rows(
+                rows,
+                page["current"],
+                page["initial"],
+                page["fields"],
+                self._background_parity,
+            )
+
+        finally:
+            self.blockSignals(signals_blocked)
+
+        for row in rows:
+            self.resizeRowToContents(row)
+
+    def _cancel_background_load(self):
+        """
+        Stop loading rows in the background.
+
+        The worker is interrupted between two pages and waited for, and the
+        pages it already sent are ignored.
+        """
+        self._background_load_id += 1
+
+        if self._row_loader is not None:
+            self._row_loader.requestInterruption()
+            self._row_loader.wait()
+            self._row_loader.deleteLater()
+            self._row_loader = None
+
+    def _cell_item(self, column, tag, scan, document, fields, brick_names):
+        """
+        Create the item of a cell from the document of its scan.
+
+        :param column: (int) The index of the column.
+        :param tag: (str) The tag of the column.
+        :param scan: (str) The scan of the row.
+        :param document: (dict) The current document of the scan.
+        :param fields: (dict) Field attributes, by field name.
+        :param brick_names: (dict) Brick names, by brick uuid.
+
+        :Returns: (QTableWidgetItem) The item of the cell.
+        """
+        item = QTableWidgetItem()
+
+        if column == 0:
+            # Name column: read-only
+            item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+            set_item_data(item, scan, FIELD_TYPE_STRING)
+
+        elif tag == TAG_BRICKS:
+            # Bricks column: read-only, the last brick is painted as a
+            # button by the bricks delegate
+            item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+            bricks = document.get(TAG_BRICKS)
+            brick_name = brick_names.get(bricks[-1]) if bricks else None
+            set_item_data(item, brick_name or "", FIELD_TYPE_STRING)
+
+            if brick_name:
+                item.setData(Qt.UserRole, bricks[-1])
+
+        else:
+            self._set_cell_value(
+                item,
+                document.get(tag),
+                (fields.get(tag) or {}).get("field_type", str),
+            )
+
+        return item
+
+    def _color_rows(
+        self, rows, documents_curr, documents_init, fields, row_parity=None
+    ):
+        """
+        Set the background colors of the cells of loaded rows.
+
+        Colors indicate:
+            - White/Grey: Unmodified builtin tags (alternating for visible
+              rows).
+            - Cyan/Blue: Modified builtin tags (alternating for visible rows).
+            - Pink/Red: User-defined tags or null values (alternating for
+              visible rows).
+
+        The color key of each cell is kept in _cell_states, so only the
+        cells whose state changed since they were last colored are painted
+        again.
+
+        :param rows: (iterable[int]) Indexes of the rows to color.
+        :param documents_curr: (dict) Current documents, by scan.
+        :param documents_init: (dict) Initial documents, by scan.
+        :param fields: (dict) Field attributes, by field name.
+        :param row_parity: (list[bool]) The parity of each row, as returned
+                           by _row_parity (computed if None).
+        """
+        tags = [
+            (
+                header.text()
+                if (header := self.horizontalHeaderItem(col))
+                else None
+            )
+            for col in range(self.columnCount())
+        ]
+
+        if row_parity is None:
+            row_parity = self._row_parity()
+
+        for row in rows:
+
+            if self.isRowHidden(row):
+                continue
+
+            scan_curr = documents_curr.get(self._row_scans[row])
+
+            if scan_curr is None:
+                continue
+
+            scan_init = documents_init.get(self._row_scans[row]) or {}
+            is_even = row_parity[row]
+            states = self._cell_states.get(self._row_scans[row])
+
+            if states is None or len(states) != len(tags):
+                states = [None] * len(tags)
+                self._cell_states[self._row_scans[row]] = states
+
+            for column, tag in enumerate(tags):
+                item = QTableWidget.item(self, row, column)
+
+                if item is None:
+                    continue
+
+                # Determine the appropriate color key for a cell
+                # First column always uses default white/grey
+                if column == 0:
+                    color_key = ("white", is_even)
+
+                # Null values get user_or_null coloring
+                elif scan_curr.get(tag) is None:
+                    color_key = ("user_or_null", is_even)
+
+                # Builtin tags: check if modified
+                elif (fields.get(tag) or {}).get(
+                    "origin"
+                ) == TAG_ORIGIN_BUILTIN:
+
+                    if scan_curr[tag] != scan_init.get(tag):
+                        color_key = ("modified", is_even)
+
+                    else:
+                        color_key = ("white", is_even)
+
+                # User-defined tags
+                else:
+                    color_key = ("user_or_null", is_even)
+
+                if states[column] == color_key:
+                    continue
+
+                states[column] = color_key
+                color = QColor(*CELL_COLORS[color_key])
+                item.setData(Qt.BackgroundRole, QVariant(color))
+
+    @staticmethod
+    def _documents_by_scan(database_data, collection, scans, fields=None):
+        """
+        Fetch the documents of scans, with one query per batch of scans.
+
+        :param database_data: (DatabaseMiaData) An open database session.
+        :param collection: (str) The collection of the documents.
+        :param scans: (list[str]) The scans whose documents are fetched.
+        :param fields: (list[str]) The fields to fetch (TAG_FILENAME is
+         always fetched). All the fields if None.
+
+        :Returns: (dict) The documents, by scan.
+        """
+
+        if not scans:
+            return {}
+
+        if fields is not None:
+            fields = [TAG_FILENAME] + list(fields)
+
+        return {
+            document[TAG_FILENAME]: document
+            for document in database_data.get_document(
+                collection, list(scans), fields=fields
+            )
+        }
+
+    @staticmethod
+    def _field_attributes(database_data):
+        """
+        Read the attributes of all the fields of the current collection.
+
+        :param database_data: (DatabaseMiaData) An open database session.
+
+        :Returns: (dict) The field attributes, by field name.
+        """
+        return {
+            attributes["index"].split("|", 1)[1]: attributes
+            for attributes in database_data.get_field_attributes(
+                COLLECTION_CURRENT
+            )
+        }
+
+    def _fill_row(self, row, scan, tags, document, fields, brick_names):
+        """
+        Create the items of a row from the document of its scan.
+
+        :param row: (int) The index of the row.
+        :param scan: (str) The scan of the row.
+        :param tags: (list[str]) The tag of each column.
+        :param document: (dict) The current document of the scan.
+        :param fields: (dict) Field attributes, by field name.
+        :param brick_names: (dict) Brick names, by brick uuid.
+        """
+        # The new items are not colored yet
+        self._cell_states.pop(scan, None)
+
+        for column, tag in enumerate(tags):
+
+            # Hidden columns are filled when they are shown
+            if tag in self._unloaded_columns:
+                continue
+
+            self.setItem(
+                row,
+                column,
+                self._cell_item(
+                    column, tag, scan, document, fields, brick_names
+                ),
+            )
+
+    def _hidden_tags(self):
+        """
+        Return the tags of the hidden columns.
+
+        :Returns: (set[str]) The tags of the hidden columns.
+        """
+        return {
+            header.text()
+            for column in range(self.columnCount())
+            if self.isColumnHidden(column)
+            and (header := self.horizontalHeaderItem(column))
+        }
+
+    def _install_page(self, rows, scans, page, tags):
+        """
+        Create the items of the rows of a page and add it to the row cache.
+
+        :param rows: (list[int]) The index of the row of each scan.
+        :param scans: (list[str]) The scans of the page.
+        :param page: (dict) The page, as read by RowLoader.read_page.
+        :param tags: (list[str]) The tag of each column.
+
+        :Returns: (int) The id of the page in the row cache.
+        """
+
+        for row, scan in zip(rows, scans):
+            self._fill_row(
+                row,
+                scan,
+                tags,
+                page["current"].get(scan) or {},
+                page["fields"],
+                page["brick_names"],
+            )
+
+        return self.row_cache.add_page(scans, page["current"], page["initial"])
+
+    def _load_columns(self, tags):
+        """
+        Create the items of columns in the loaded rows.
+
+        The hidden columns are not filled when the rows are loaded: the
+        values of a column are read when it is shown, for the loaded rows
+        only, with a query per collection.
+
+        :param tags: (iterable[str]) The tags of the columns. Those already
+         loaded are ignored.
+        """
+        tags = [tag for tag in tags if tag in self._unloaded_columns]
+
+        if not tags:
+            return
+
+        self._unloaded_columns.difference_update(tags)
+        # The pages being read in the background lack these columns
+        reload = self._row_loader is not None
+        self._cancel_background_load()
+        loaded_rows = [
+            (row, scan)
+            for row, scan in enumerate(self._row_scans)
+            if scan in self.row_cache
+        ]
+        columns = [
+            (column, tag)
+            for tag in tags
+            if (column := self.get_tag_column(tag)) is not None
+        ]
+
+        if loaded_rows and columns:
+            scans = [scan for _, scan in loaded_rows]
+            signals_blocked = self.blockSignals(True)
+
+            try:
+
+                with self.project.database.data() as database_data:
+                    page = RowLoader.read_page(database_data, scans, tags=tags)
+                    self.row_cache.merge_documents(
+                        page["current"], page["initial"]
+                    )
+                    documents_curr, documents_init = self._page_documents(
+                        database_data, self.row_cache.pages(scans)
+                    )
+
+                for row, scan in loaded_rows:
+                    document = page["current"].get(scan) or {}
+                    states = self._cell_states.get(scan)
+
+                    for column, tag in columns:
+                        self.setItem(
+                            row,
+                            column,
+                            self._cell_item(
+                                column,
+                                tag,
+                                scan,
+                                document,
+                                page["fields"],
+                                page["brick_names"],
+                            ),
+                        )
+
+                        # The new items are not colored yet
+                        if states is not None and column < len(states):
+                            states[column] = None
+
+                self._color_rows(
+                    [row for row, _ in loaded_rows],
+                    documents_curr,
+                    documents_init,
+                    page["fields"],
+                )
+
+            finally:
+                self.blockSignals(signals_blocked)
+
+        if reload:
+            self._start_background_load()
+
+    def _load_rows(self, rows):
+        """
+        Create the items of the rows that are not loaded yet.
+
+        The documents of the rows are read from the database by pages of
+        ROW_PAGE_SIZE rows, with a query per collection and page, and the
+        pages are added to the row cache. The least recently used pages
+        other than those of the rows are then evicted if the cache is over
+        its budget.
+
+        :param rows: (iterable[int]) Indexes of the rows to load.
+        """
+        rows = list(dict.fromkeys(rows))
+        keep = set(self.row_cache.pages(self._row_scans[row] for row in rows))
+        self.row_cache.touch(keep)
+        to_load = [
+            (row, self._row_scans[row])
+            for row in rows
+            if self._row_scans[row] not in self.row_cache
+        ]
+
+        if not to_load:
+            return
+
+        tags = [
+            (
+                header.text()
+                if (header := self.horizontalHeaderItem(col))
+                else None
+            )
+            for col in range(self.columnCount())
+        ]
+        documents_curr = {}
+        documents_init = {}
+        signals_blocked = self.blockSignals(True)
+
+        try:
+
+            with self.project.database.data() as database_data:
+                fields = self._field_attributes(database_data)
+
+                for start in range(0, len(to_load), ROW_PAGE_SIZE):
+                    end = start + ROW_PAGE_SIZE
+                    rows_page = to_load[start:end]
+                    scans = [scan for _, scan in rows_page]
+                    page = RowLoader.read_page(
+                        database_data, scans, fields, self._loaded_tags()
+                    )
+                    documents_curr.update(page["current"])
+                    documents_init.update(page["initial"])
+                    keep.add(
+                        self._install_page(
+                            [row for row, _ in rows_page], scans, page, tags
+                        )
+                    )
+
+            self._color_rows(
+                [row for row, _ in to_load],
+                documents_curr,
+                documents_init,
+                fields,
+            )
+            self._unload_pages(self.row_cache.evict(keep, self._row_cells()))
+
+        finally:
+            self.blockSignals(signals_blocked)
+
+        for row, _ in to_load:
+            self.resizeRowToContents(row)
+
+    def _load_visible_rows(self):
+        """
+        Load the rows in view, and prefetch ROW_PAGE_SIZE rows in the
+        scroll direction.
+
+        Nothing is loaded while the table isn't shown: the rows are then
+        loaded when they are accessed (see item).
+        """
+        scroll_value = self.verticalScrollBar().value()
+        scrolling_up = scroll_value < self._last_scroll_value
+        self._last_scroll_value = scroll_value
+
+        if (
+            not self._row_scans
+            or len(self._row_scans) != self.rowCount()
+            or not self.isVisible()
+            or self.viewport().height() <= 0
+        ):
+            return
+
+        first = max(self.rowAt(0), 0)
+        last = self.rowAt(self.viewport().height() - 1)
+
+        if last < 0:
+            last = self.rowCount() - 1
+
+        prefetched = (
+            range(first - 1, max(first - ROW_PAGE_SIZE, 0) - 1, -1)
+            if scrolling_up
+            else range(
+                last + 1, min(last + ROW_PAGE_SIZE, self.rowCount() - 1) + 1
+            )
+        )
+        self._load_rows(
+            row
+            for row in chain(range(first, last + 1), prefetched)
+            if not self.isRowHidden(row)
+        )
+
+    def _loaded_tags(self):
+        """
+        Return the tags of the loaded columns, read when rows are loaded.
+
+        :Returns: (list[str]) The tags of the columns that are filled, or
+         None if all the columns are.
+        """
+
+        if not self._unloaded_columns:
+            return None
+
+        return [
+            header.text()
+            for column in range(self.columnCount())
+            if (header := self.horizontalHeaderItem(column))
+            and header.text() not in self._unloaded_columns
+        ]
+
+    def _page_documents(self, database_data, pages):
+        """
+        Return the documents of cached pages, reading the invalidated ones.
+
+        :param database_data: (DatabaseMiaData) An open database session.
+        :param pages: (iterable[int]) The ids of the pages.
+
+        :Returns: (tuple[dict, dict]) The current and initial documents, by
+         scan.
+        """
+        documents_curr = {}
+        documents_init = {}
+
+        for page in pages:
+            documents = self.row_cache.documents(page)
+
+            if documents is None:
+                scans = self.row_cache.scans(page)
+                documents = (
+                    self._documents_by_scan(
+                        database_data, COLLECTION_CURRENT, scans
+                    ),
+                    self._documents_by_scan(
+                        database_data, COLLECTION_INITIAL, scans
+                    ),
+                )
+                self.row_cache.set_documents(page, *documents)
+
+            documents_curr.update(documents[0])
+            documents_init.update(documents[1])
+
+        return documents_curr, documents_init
+
+    def _refresh_rows(self, scans):
+        """
+        Create again the items of the loaded rows of scans whose documents
+        changed in the database.
+
+        The documents of the other rows are read when the rows are loaded.
+
+        :param scans: (iterable[str]) The scans whose documents changed.
+        """
+        scans = set(scans)
+        self.invalidate_scans(scans)
+        rows = sorted(
+            (row, scan)
+            for scan in scans
+            if scan in self.row_cache
+            and (row := self.get_scan_row(scan)) is not None
+        )
+
+        if not rows:
+            return
+
+        tags = [
+            (
+                header.text()
+                if (header := self.horizontalHeaderItem(col))
+                else None
+            )
+            for col in range(self.columnCount())
+        ]
+        signals_blocked = self.blockSignals(True)
+
+        try:
+
+            with self.project.database.data() as database_data:
+                page = RowLoader.read_page(
+                    database_data,
+                    [scan for _, scan in rows],
+                    tags=self._loaded_tags(),
+                )
+
+            for row, scan in rows:
+                self._fill_row(
+                    row,
+                    scan,
+                    tags,
+                    page["current"].get(scan) or {},
+                    page["fields"],
+                    page["brick_names"],
+                )
+
+        finally:
+            self.blockSignals(signals_blocked)
+
+    def _remove_rows(self, scans):
+        """
+        Remove the rows of scans from the table, in a single pass.
+
+        The rows are removed from the last one, with the updates of the
+        table disabled, and the scans are removed from scans_to_visualize
+        and scans_to_search.
+
+        :param scans: (iterable[str]) The scans whose rows are removed.
+        """
+        removed = ScanSet.of(scans)
+        self.scans_to_visualize = self.scans_to_visualize - removed
+        self.scans_to_search = self.scans_to_search - removed
+        rows = sorted(
+            row
+            for scan in removed
+            if (row := self.get_scan_row(scan)) is not None
+        )
+
+        if not rows:
+            return
+
+        self.setUpdatesEnabled(False)
+
+        try:
+
+            for row in reversed(rows):
+                self.removeRow(row)
+
+        finally:
+            self.setUpdatesEnabled(True)
+
+        # The following rows changed parity
+        self._start_background_load()
+
+    def _row_cells(self):
+        """
+        Return the number of loaded cells of a row, for the cache budget.
+
+        :Returns: (int) The number of columns that are filled (at least 1).
+        """
+        return max(self.columnCount() - len(self._unloaded_columns), 1)
+
+    def _row_parity(self):
+        """
+        Return whether each row is an even row among the visible rows.
+
+        :Returns: (list[bool]) The parity of each row of the table.
+        """
+        row_parity = []
+        is_even = True
+
+        for row in range(self.rowCount()):
+            row_parity.append(is_even)
+
+            if not self.isRowHidden(row):
+                is_even = not is_even
+
+        return row_parity
+
+    def _scan_rows(self):
+        """
+        Return the row of each scan of the table.
+
+        The index follows the rows as they are inserted, removed and
+        sorted; when rows move up it is dropped, and built again here.
+
+        :Returns: (dict[str, int]) The row index of each scan.
+        """
+
+        if self._row_index is None:
+            self._row_index = {
+                scan: row for row, scan in enumerate(self._row_scans)
+            }
+
+        return self._row_index
+
+    @staticmethod
+    def _set_cell_value(item, value, field_type):
+        """
+        Set the value of a cell, or the undefined value in italic bold.
+
+        :param item: (QTableWidgetItem) The item of the cell.
+        :param value: The value of the cell, None if undefined.
+        :param field_type: The type of the value.
+        """
+
+        if value is not None:
+            set_item_data(item, value, field_type)
+
+        else:
+            set_item_data(item, NOT_DEFINED_VALUE, FIELD_TYPE_STRING)
+            font = item.font()
+            font.setItalic(True)
+            font.setBold(True)
+            item.setFont(font)
+
+    def _set_column_delegates(self):
+        """
+        Set the delegate of each column according to the type of its tag.
+
+        Qt keeps the column delegates by column index, so this must be done
+        again whenever columns are inserted or removed.
+        """
+        # Mapping of field types to their corresponding delegates
+        delegate_map = {
+            FIELD_TYPE_FLOAT: NumberFormatDelegate,
+            FIELD_TYPE_DATETIME: DateTimeFormatDelegate,
+            FIELD_TYPE_DATE: DateFormatDelegate,
+            FIELD_TYPE_TIME: TimeFormatDelegate,
+        }
+
+        with self.project.database.data() as database_data:
+            fields = self._field_attributes(database_data)
+
+        for column in range(self.columnCount()):
+            header = self.horizontalHeaderItem(column)
+            tag = header.text() if header else None
+            delegate = None
+
+            if tag == TAG_BRICKS:
+                delegate = self.bricks_delegate
+
+            elif delegate_class := delegate_map.get(
+                (fields.get(tag) or {}).get("field_type")
+            ):
+
+                if delegate_class not in self._format_delegates:
+                    self._format_delegates[delegate_class] = delegate_class(
+                        self
+                    )
+
+                delegate = self._format_delegates[delegate_class]
+
+            self.setItemDelegateForColumn(column, delegate)
+
+    def _set_row_order(self, scans):
+        """
+        Lay the rows out in a new order of their scans.
+
+        The items are dropped and the rows in view are loaded again; hidden
+        rows stay hidden and the selection is restored.
+
+        :param scans: (list[str]) The scans of the table, in the new order.
+        """
+        self._cancel_background_load()
+        hidden_scans = {
+            scan
+            for row, scan in enumerate(self._row_scans)
+            if self.isRowHidden(row)
+        }
+        signals_blocked = self.blockSignals(True)
+
+        try:
+            self.clearContents()
+            self._set_row_scans(scans)
+            self.row_cache.clear()
+            self._cell_states.clear()
+            self._unloaded_columns = self._hidden_tags()
+
+            for row, scan in enumerate(self._row_scans):
+                hidden = scan in hidden_scans
+
+                if self.isRowHidden(row) != hidden:
+                    self.setRowHidden(row, hidden)
+
+            if self.activate_selection:
+                self.update_selection()
+
+        finally:
+            self.blockSignals(signals_blocked)
+
+        self._load_visible_rows()
+        self._start_background_load()
+
+    def _set_row_scans(self, scans):
+        """
+        Set the scans of the rows, and index their rows.
+
+        :param scans: (Iterable[str]) The scans of the table, in the order of
+         the rows.
+        """
+        self._row_scans = list(scans)
+        self._row_index = {
+            scan: row for row, scan in enumerate(self._row_scans)
+        }
+
+    def _sort_rows(self, tags, descending=False):
+        """
+        Sort the rows by the values of one or more tags.
+
+        :param tags: (str or list[str]) The tag, or the tags (primary first),
+                     whose values are sorted.
+        :param descending: (bool) True for a descending sort.
+        """
+        self._set_row_order(
+            self._sorted_scans(self._row_scans, tags, descending)
+        )
+
+    def _sorted_scans(self, scans, tags, descending=False):
+        """
+        Return scans sorted by the values of one or more tags.
+
+        The values of the sorted tags only are read, with a single query,
+        and sorted in Python by get_sorted_document_names (populse_db
+        filters have no ORDER BY; see there for the collation). When the
+        scans are a subset of the rows, only their documents are read. The
+        rows are then laid out by _set_row_order without being filled again.
+        The scans without document come last.
+
+        :param scans: (list[str]) The scans to sort.
+        :param tags: (str or list[str]) The tag, or the tags (primary first),
+                     whose values are sorted.
+        :param descending: (bool) True for a descending sort.
+
+        :Returns: (list[str]) The sorted scans.
+        """
+
+        # When all the rows are sorted, the whole collection is read instead
+        # of selecting the documents by key: it is cheaper for the data
+        # browser, whose rows are all the documents, and only a cost
+        # heuristic for the filter tables, whose rows are a subset of them
+        primary_keys = (
+            None if len(scans) >= len(self._row_scans) else list(scans)
+        )
+
+        with self.project.database.data() as database_data:
+            order = database_data.get_sorted_document_names(
+                COLLECTION_CURRENT, tags, descending, primary_keys
+            )
+
+        rank = {scan: position for position, scan in enumerate(order)}
+        return sorted(scans, key=lambda scan: rank.get(scan, len(rank)))
+
+    def _start_background_load(self):
+        """
+        Load the rows that are not loaded yet in the background.
+
+        The documents are read by a RowLoader worker, starting from the rows
+        in view, and the pages are installed as they arrive (see
+        _add_background_page), while the table stays responsive. Only the
+        visible rows are loaded, as many as the row cache can hold. A load
+        in progress is cancelled first.
+        """
+        self._cancel_background_load()
+
+        if (
+            not self.isVisible()
+            or not self._row_scans
+            or len(self._row_scans) != self.rowCount()
+        ):
+            return
+
+        room = max(
+            self.row_cache.max_cells // self._row_cells()
+            - len(self.row_cache),
+            0,
+        )
+        first = max(self.rowAt(0), 0)
+        rows = [
+            row
+            for row in chain(range(first, self.rowCount()), range(first))
+            if not self.isRowHidden(row)
+            and self._row_scans[row] not in self.row_cache
+        ][:room]
+
+        if not rows:
+            return
+
+        scans = [self._row_scans[row] for row in rows]
+        self._background_rows = dict(zip(scans, rows))
+        self._background_parity = self._row_parity()
+        self._background_edits = set()
+        self._row_loader = RowLoader(
+            self.project,
+            scans,
+            self._background_load_id,
+            self,
+            self._loaded_tags(),
+        )
+        self._row_loader.pageRead.connect(self._add_background_page)
+        self._row_loader.start()
+
+    def _unload_pages(self, pages):
+        """
+        Drop the items of the rows of evicted pages.
+
+        The rows are loaded again from the database when they are needed.
+
+        :param pages: (list[list[str]]) The scans of each evicted page.
+        """
+
+        if not pages:
+            return
+
+        rows = self._scan_rows()
+        signals_blocked = self.blockSignals(True)
+
+        try:
+
+            for scans in pages:
+
+                for scan in scans:
+                    self._cell_states.pop(scan, None)
+                    row = rows.get(scan)
+
+                    if row is None:
+                        continue
+
+                    for column in range(self.columnCount()):
+                        self.takeItem(row, column)
+
+        finally:
+            self.blockSignals(signals_blocked)
+
+    def add_column(self, column, tag):
+        """
+        Add a new column to the table with the specified tag.
+
+        Inserts a column at the given index, configures its header with
+        metadata from the database, sets the appropriate delegate based on
+        field type, and populates the cells of the loaded rows with current
+        values from the database (the other rows are filled when they are
+        loaded).
+
+        :param column: (int) Zero-based index where the column should be
+         inserted.
+        :param tag: (str) Tag name identifying the field to add from the
+         database.
+
+        Note:
+            Temporarily disconnects item change signals during insertion to
+            prevent unwanted event triggers, then reconnects them after
+            completion.
+        """
+        # Safely disconnect signals
+        safe_disconnect(self.itemChanged, self.on_cell_changed)
+
+        if self.activate_selection:
+            safe_disconnect(self.itemSelectionChanged, self.selection_changed)
+
+        try:
+            # Insert column and configure header
+            self.insertColumn(column)
+            header_item = QTableWidgetItem()
+            self.setHorizontalHeaderItem(column, header_item)
+
+            with self.project.database.data() as database_data:
                 tag_attrib = database_data.get_field_attributes(
                     COLLECTION_CURRENT, tag
                 )
@@ -1245,42 +2875,34 @@ class TableDataBrowser(QTableWidget):
                     f"Unit: {tag_attrib['unit']}\n"
                     f"Type: {field_type}"
                 )
-                # Map field types to their corresponding delegates
-                delegate_map = {
-                    FIELD_TYPE_FLOAT: NumberFormatDelegate,
-                    FIELD_TYPE_DATETIME: DateTimeFormatDelegate,
-                    FIELD_TYPE_DATE: DateFormatDelegate,
-                    FIELD_TYPE_TIME: TimeFormatDelegate,
-                }
-                # Set appropriate delegate for column based on field type
-                delegate_class = delegate_map.get(field_type)
-                delegate = delegate_class(self) if delegate_class else None
-                self.setItemDelegateForColumn(column, delegate)
+                # Populate the cells of the loaded rows with values from
+                # database
+                loaded_rows = [
+                    (row, scan)
+                    for row, scan in enumerate(self._row_scans)
+                    if scan in self.row_cache
+                ]
+                documents = self._documents_by_scan(
+                    database_data,
+                    COLLECTION_CURRENT,
+                    [scan for _, scan in loaded_rows],
+                    fields=[tag],
+                )
 
-                # Populate column cells with values from database
-                for row in range(self.rowCount()):
+                for row, scan in loaded_rows:
                     item = QTableWidgetItem()
-                    self.setItem(row, column, item)
-                    scan = self.item(row, 0).text()
-                    cur_value = database_data.get_value(
-                        collection_name=COLLECTION_CURRENT,
-                        primary_key=scan,
-                        field=tag,
+                    self._set_cell_value(
+                        item,
+                        (documents.get(scan) or {}).get(tag),
+                        field_type,
                     )
+                    self.setItem(row, column, item)
 
-                    if cur_value is not None:
-                        set_item_data(item, cur_value, field_type)
-
-                    else:
-                        # Style undefined values with italic bold font
-                        set_item_data(
-                            item, NOT_DEFINED_VALUE, FIELD_TYPE_STRING
-                        )
-                        font = item.font()
-                        font.setItalic(True)
-                        font.setBold(True)
-                        item.setFont(font)
-
+            # Set appropriate delegates for columns based on field type
+            self._set_column_delegates()
+            # The cached documents don't hold the new field
+            self.invalidate_scans()
+            self._cell_states.clear()
             # Update UI state
             self.resizeColumnsToContents()
             self.update_selection()
@@ -1302,7 +2924,8 @@ class TableDataBrowser(QTableWidget):
         schema by:
             - Adding columns for new database fields that don't exist in the
               table.
-            - Populating new columns with values from the database.
+            - Populating new visible columns of the loaded rows with values
+              from the database (hidden columns are filled when shown).
             - Removing columns that no longer exist in the database.
             - Applying appropriate formatting delegates based on field types.
             - Maintaining column visibility settings.
@@ -1331,13 +2954,33 @@ class TableDataBrowser(QTableWidget):
                 tags -= {TAG_CHECKSUM, TAG_HISTORY}
                 tags = [TAG_FILENAME] + sorted(tags - {TAG_FILENAME})
                 visible_tags = database_data.get_shown_tags()
+                new_tags = [
+                    tag for tag in tags if self.get_tag_column(tag) is None
+                ]
+                # Hidden columns are filled when they are shown
+                self._unloaded_columns.update(
+                    tag for tag in new_tags if tag not in visible_tags
+                )
+                shown_tags = [tag for tag in new_tags if tag in visible_tags]
+                # Values of the new visible tags for the loaded rows
+                loaded_rows = [
+                    (row, scan)
+                    for row, scan in enumerate(self._row_scans)
+                    if scan in self.row_cache
+                ]
+                documents = (
+                    self._documents_by_scan(
+                        database_data,
+                        COLLECTION_CURRENT,
+                        [scan for _, scan in loaded_rows],
+                        fields=shown_tags,
+                    )
+                    if shown_tags and loaded_rows
+                    else {}
+                )
 
                 # Add missing columns
-                for tag in tags:
-
-                    if self.get_tag_column(tag) is not None:
-                        continue
-
+                for tag in new_tags:
                     column_index = self.get_index_insertion(tag)
                     self.insertColumn(column_index)
 
@@ -1347,6 +2990,7 @@ class TableDataBrowser(QTableWidget):
                     tag_attrib = database_data.get_field_attributes(
                         COLLECTION_CURRENT, tag
                     )
+                    field_type = str
 
                     if tag_attrib:
                         field_type = tag_attrib["field_type"]
@@ -1356,50 +3000,22 @@ class TableDataBrowser(QTableWidget):
                             f"Type: {type_name(field_type)}"
                         )
                         header_item.setToolTip(tooltip)
-                        # Apply field-type specific delegate
-                        delegate_map = {
-                            FIELD_TYPE_FLOAT: NumberFormatDelegate,
-                            FIELD_TYPE_DATETIME: DateTimeFormatDelegate,
-                            FIELD_TYPE_DATE: DateFormatDelegate,
-                            FIELD_TYPE_TIME: TimeFormatDelegate,
-                        }
-
-                        delegate_class = delegate_map.get(field_type)
-
-                        if delegate_class:
-                            self.setItemDelegateForColumn(
-                                column_index, delegate_class(self)
-                            )
 
                     # Set visibility
                     self.setColumnHidden(column_index, tag not in visible_tags)
 
+                    if tag in self._unloaded_columns:
+                        continue
+
                     # Populate column with data
-                    for row in range(self.rowCount()):
+                    for row, scan in loaded_rows:
                         item = QTableWidgetItem()
-                        self.setItem(row, column_index, item)
-
-                        scan = self.item(row, 0).text()
-                        value = database_data.get_value(
-                            collection_name=COLLECTION_CURRENT,
-                            primary_key=scan,
-                            field=tag,
+                        self._set_cell_value(
+                            item,
+                            (documents.get(scan) or {}).get(tag),
+                            field_type,
                         )
-
-                        if value is not None:
-                            set_item_data(
-                                item, value, tag_attrib["field_type"]
-                            )
-
-                        else:
-                            # Style undefined values distinctly
-                            set_item_data(
-                                item, NOT_DEFINED_VALUE, FIELD_TYPE_STRING
-                            )
-                            font = item.font()
-                            font.setItalic(True)
-                            font.setBold(True)
-                            item.setFont(font)
+                        self.setItem(row, column_index, item)
 
                 # Remove obsolete columns
                 current_fields = set(
@@ -1415,6 +3031,11 @@ class TableDataBrowser(QTableWidget):
                     if tag_name not in current_fields:
                         self.removeColumn(column)
 
+            # Apply field-type specific delegates
+            self._set_column_delegates()
+            # The cached documents don't hold the new fields
+            self.invalidate_scans()
+            self._cell_states.clear()
             # Update UI
             self.resizeColumnsToContents()
             self.update_selection()
@@ -1442,10 +3063,9 @@ class TableDataBrowser(QTableWidget):
         """
         Insert rows into the table if they don't already exist.
 
-        This method adds new scans to the table, populating each column with
-        data from the database. It displays a progress dialog during the
-        operation and handles special cases like the TAG_BRICKS column with
-        custom widgets.
+        The rows of the new scans are appended to the table, and their items
+        are loaded from the database when they are scrolled into view or
+        accessed (see _load_rows).
 
         :param rows: An iterable of scan identifiers to be added to the table.
 
@@ -1453,8 +3073,6 @@ class TableDataBrowser(QTableWidget):
             - Duplicate scans (already present in the table) are automatically
               skipped.
             - Sorting is temporarily disabled during the insertion process.
-            - The first column (name) is set as non-editable.
-            - TAG_BRICKS columns receive custom button widgets for interaction.
         """
 
         # Temporarily disable sorting and disconnect signals
@@ -1467,138 +3085,23 @@ class TableDataBrowser(QTableWidget):
                 )
 
             try:
-                # Initialize and configure progress dialog
-                cells_number = len(rows) * self.columnCount()
-                self.progress = QProgressDialog(
-                    "Please wait while the paths are being added...",
-                    None,
-                    0,
-                    cells_number,
-                )
-                self.progress.setMinimumDuration(0)
-                self.progress.setValue(0)
-                self.progress.setMinimumWidth(350)  # For mac OS
-                self.progress.setWindowTitle("Adding the paths")
-                self.progress.setWindowFlags(
-                    Qt.Window | Qt.WindowTitleHint | Qt.CustomizeWindowHint
+                # Skip the scans that already exist in the table
+                table_rows = self._scan_rows()
+                new_scans = [
+                    scan
+                    for scan in dict.fromkeys(rows)
+                    if scan not in table_rows
+                ]
+                self.setRowCount(self.rowCount() + len(new_scans))
+                table_rows.update(
+                    (scan, row)
+                    for row, scan in enumerate(new_scans, len(self._row_scans))
                 )
-                self.progress.setModal(True)
-                self.progress.setAttribute(Qt.WA_DeleteOnClose, True)
-                self.progress.show()
-                # Add rows with database context
-                idx = 0
-
-                with self.project.database.data() as database_data:
-
-                    for scan in rows:
-
-                        # Skip if scan already exists in table
-                        if self.get_scan_row(scan) is not None:
-                            continue
-
-                        row_index = self.rowCount()
-                        self.insertRow(row_index)
-
-                        # Populate columns for the new row
-                        for column_index in range(self.columnCount()):
-                            idx += 1
-                            self.progress.setValue(idx)
-                            QApplication.processEvents()
-                            tag = self.horizontalHeaderItem(
-                                column_index
-                            ).text()
-                            item = QTableWidgetItem()
-
-                            if column_index == 0:
-                                # First column: name tag (non-editable)
-                                item.setFlags(
-                                    item.flags() & ~Qt.ItemIsEditable
-                                )
-                                set_item_data(item, scan, FIELD_TYPE_STRING)
-
-                            else:
-                                # Retrieve value from database
-                                cur_value = database_data.get_value(
-                                    collection_name=COLLECTION_CURRENT,
-                                    primary_key=scan,
-                                    field=tag,
-                                )
-
-                                if cur_value is not None:
-
-                                    if tag == TAG_BRICKS:
-                                        # Tag bricks, display list with buttons
-                                        widget = QWidget()
-                                        layout = QVBoxLayout()
-                                        brick_uuid = cur_value[-1]
-                                        brick_name = database_data.get_value(
-                                            collection_name=COLLECTION_BRICK,
-                                            primary_key=brick_uuid,
-                                            field=BRICK_NAME,
-                                        )
-                                        brick_name_button = QPushButton(
-                                            brick_name
-                                        )
-                                        brick_name_button.setFocusPolicy(
-                                            Qt.NoFocus
-                                        )
-                                        self.bricks[brick_name_button] = (
-                                            brick_uuid
-                                        )
-
-                                        if TAG_FILENAME in scan:
-                                            brick_name_button.clicked.connect(
-                                                partial(
-                                                    self.show_brick_history,
-                                                    scan[TAG_FILENAME],
-                                                )
-                                            )
-
-                                        layout.addWidget(brick_name_button)
-                                        widget.setLayout(layout)
-                                        self.setCellWidget(
-                                            row_index, column_index, widget
-                                        )
-
-                                    else:
-                                        # Standard cell with database value
-                                        field_type = (
-                                            database_data.get_field_attributes(
-                                                COLLECTION_CURRENT, tag
-                                            )["field_type"]
-                                        )
-                                        set_item_data(
-                                            item, cur_value, field_type
-                                        )
-
-                                else:
-
-                                    # Handle undefined values
-                                    if tag == TAG_BRICKS:
-                                        set_item_data(
-                                            item, "", FIELD_TYPE_STRING
-                                        )
-                                        # bricks not editable
-                                        item.setFlags(
-                                            item.flags() & ~Qt.ItemIsEditable
-                                        )
-
-                                    else:
-                                        set_item_data(
-                                            item,
-                                            NOT_DEFINED_VALUE,
-                                            FIELD_TYPE_STRING,
-                                        )
-                                        font = item.font()
-                                        font.setItalic(True)
-                                        font.setBold(True)
-                                        item.setFont(font)
-
-                            self.setItem(row_index, column_index, item)
-
+                self._row_scans.extend(new_scans)
+                self._load_visible_rows()
+                self._start_background_load()
                 # Restore table state
                 self.resizeColumnsToContents()
-                self.resizeRowsToContents()
                 # Selection updated
                 self.update_selection()
                 self.update_colors()
@@ -1612,8 +3115,56 @@ class TableDataBrowser(QTableWidget):
                     )
 
                 safe_connect(self.itemChanged, self.on_cell_changed)
-                # Clean up
-                self.progress.close()
+
+    def apply_database_changes(self):
+        """
+        Apply the changes of the database since the table was filled.
+
+        Instead of rebuilding the whole table (see update_table), the
+        documents and fields added, modified and removed in the database,
+        as recorded by a ChangeSet, are applied as deltas: the columns of
+        the changed fields are added or removed, the rows of the removed
+        documents are removed, those of the new documents are appended
+        (see add_rows), and only the loaded rows of the modified documents
+        are filled again. The table is rebuilt if the project changed.
+        """
+
+        if self._changes_database is not self.project.database:
+            self.update_table()
+            return
+
+        changes = self._database_changes.take()
+
+        if not changes:
+            return
+
+        safe_disconnect(self.itemChanged, self.on_cell_changed)
+
+        try:
+
+            if changes.fields(
+                COLLECTION_CURRENT, CHANGE_ADDED
+            ) or changes.fields(COLLECTION_CURRENT, CHANGE_REMOVED):
+                self.add_columns()
+
+            removed = changes.documents(COLLECTION_CURRENT, CHANGE_REMOVED)
+            self._remove_rows(removed)
+            changed = changes.documents(
+                COLLECTION_CURRENT, CHANGE_ADDED
+            ) | changes.documents(COLLECTION_CURRENT, CHANGE_MODIFIED)
+            table_scans = self._scan_rows().keys()
+            self._refresh_rows(changed & table_scans)
+            # The rows after the removed ones changed parity
+            self.update_colors(None if removed else changed & table_scans)
+            new_scans = sorted(changed - table_scans)
+
+        finally:
+            safe_connect(self.itemChanged, self.on_cell_changed)
+
+        if new_scans:
+            self.scans_to_visualize = self.scans_to_visualize | new_scans
+            self.scans_to_search = self.scans_to_search | new_scans
+            self.add_rows(new_scans)
 
     @contextmanager
     def batch_update(self, *, disable_sorting=True):
@@ -1694,6 +3245,7 @@ class TableDataBrowser(QTableWidget):
                 database_data.remove_value(
                     COLLECTION_CURRENT, scan_name, tag_name
                 )
+                self.update_cached_value(scan_name, tag_name, None)
                 # Update cell appearance to indicate cleared state
                 cell_item = self.item(row, col)
                 set_item_data(cell_item, NOT_DEFINED_VALUE, FIELD_TYPE_STRING)
@@ -2033,37 +3585,25 @@ class TableDataBrowser(QTableWidget):
         try:
 
             with self.project.database.data() as database_data:
+                fields = self._field_attributes(database_data)
 
                 for item in self.selectedItems():
                     column, row = item.column(), item.row()
-                    self.coordinates.append([row, column])
                     tag_name = self.horizontalHeaderItem(column).text()
-                    tag_attrib = database_data.get_field_attributes(
-                        COLLECTION_CURRENT, tag_name
-                    )
-                    tag_type = tag_attrib["field_type"]
-                    scan_name = self.item(row, 0).text()
+                    tag_type = (fields.get(tag_name) or {}).get("field_type")
 
-                    if tag_name == TAG_BRICKS:
+                    if (
+                        tag_name == TAG_BRICKS
+                        or get_origin(tag_type) is not list
+                    ):
                         self.setMouseTracking(True)
                         return
 
-                    # Scan, tag, type added
+                    # Coordinates, scan, tag, type added
+                    self.coordinates.append([row, column])
                     self.tags.append(tag_name)
-                    self.scans_list.append(scan_name)
+                    self.scans_list.append(self._row_scans[row])
                     self.types.add(tag_type)
-
-                    if get_origin(tag_type) is not list:
-                        self.setMouseTracking(True)
-                        return
-
-                    # Fetch and store old values
-                    database_value = database_data.get_value(
-                        collection_name=COLLECTION_CURRENT,
-                        primary_key=scan_name,
-                        field=tag_name,
-                    )
-                    self.old_database_values.append(database_value)
                     table_value = item.data(Qt.EditRole)
 
                     try:
@@ -2074,12 +3614,24 @@ class TableDataBrowser(QTableWidget):
 
                     self.old_table_values.append(table_value)
 
-                    # Store length if valid
-                    try:
-                        lengths.add(len(database_value))
+                # Fetch the old values of all the cells at once
+                documents = self._documents_by_scan(
+                    database_data,
+                    COLLECTION_CURRENT,
+                    list(dict.fromkeys(self.scans_list)),
+                    fields=list(dict.fromkeys(self.tags)),
+                )
+
+            for scan, tag in zip(self.scans_list, self.tags):
+                database_value = (documents.get(scan) or {}).get(tag)
+                self.old_database_values.append(database_value)
 
-                    except TypeError:
-                        lengths.add(None)
+                # Store length if valid
+                try:
+                    lengths.add(len(database_value))
+
+                except TypeError:
+                    lengths.add(None)
 
             # Error if lists of different lengths
             lengths = [x for x in lengths if x is not None]
@@ -2121,50 +3673,45 @@ class TableDataBrowser(QTableWidget):
                 self.scans_list,
                 self.tags,
             )
+            self.popup.exec_()
+            # Values written by the dialog (none if it was cancelled)
+            new_values = self.popup.database_values
+            self.popup.deleteLater()
+            del self.popup
 
-            if self.popup.exec_():
-                self.popup.deleteLater()
-                del self.popup
+            if not new_values:
+                return
 
-            # Record changes for history
+            # Record the changed cells as a single history entry
             history_maker = ["modified_values", []]
             safe_disconnect(self.itemChanged, self.on_cell_changed)
 
-            with self.project.database.data() as database_data:
+            for i, (scan, tag) in enumerate(zip(self.scans_list, self.tags)):
+                old_value = self.old_database_values[i]
+                new_value = new_values[scan][tag]
 
-                for i, (scan, tag) in enumerate(
-                    zip(self.scans_list, self.tags)
-                ):
-                    new_item = QTableWidgetItem()
-                    old_value = self.old_database_values[i]
-                    new_cur_value = (
-                        database_data.get_value(
-                            collection_name=COLLECTION_CURRENT,
-                            primary_key=scan,
-                            field=tag,
-                        )
-                        or NOT_DEFINED_VALUE
-                    )
-                    history_maker[1].append(
-                        [scan, tag, old_value, new_cur_value]
-                    )
-                    set_item_data(
-                        new_item,
-                        new_cur_value,
-                        database_data.get_field_attributes(
-                            COLLECTION_CURRENT, tag
-                        )["field_type"],
-                    )
-                    self.setItem(
-                        self.coordinates[i][0],
-                        self.coordinates[i][1],
-                        new_item,
-                    )
+                if new_value != old_value:
+                    history_maker[1].append([scan, tag, old_value, new_value])
+
+                self.update_cached_value(scan, tag, new_value)
+                new_item = QTableWidgetItem()
+                set_item_data(new_item, new_value, fields[tag]["field_type"])
+                self.setItem(
+                    self.coordinates[i][0],
+                    self.coordinates[i][1],
+                    new_item,
+                )
 
             # For history
-            self.project.undos.append(history_maker)
-            self.project.redos.clear()
-            self.update_colors()
+            if history_maker[1]:
+                self.project.undos.append(history_maker)
+                self.project.redos.clear()
+
+            # The new items are not colored yet
+            for scan in self.scans_list:
+                self._cell_states.pop(scan, None)
+
+            self.update_colors(self.scans_list)
             safe_connect(self.itemChanged, self.on_cell_changed)
 
         except Exception as exc:
@@ -2175,52 +3722,27 @@ class TableDataBrowser(QTableWidget):
         finally:
             self.setMouseTracking(True)
             self.resizeColumnsToContents()
-            self.resizeRowsToContents()
+
+            # Only the selected rows may have been edited
+            for row in {index.row() for index in self.selectedIndexes()}:
+                self.resizeRowToContents(row)
 
     def fill_cells_update_table(self):
         """
-        Initialize and populate table cells with scan data from the database.
+        Lay out the rows of the scans to visualize and apply the saved sort.
 
-        This method performs the following operations:
-            1. Creates a progress dialog to track cell population.
-            2. Retrieves scan documents matching scans_to_visualize from the
-               database.
-            3. Populates each cell with appropriate data based on column type.
-            4. Handles special cases (name column, bricks column).
-            5. Applies saved sorting preferences.
-            6. Resizes rows and columns to fit content.
+        The table holds one row per scan of scans_to_visualize, but the
+        items of a row are only created when the row is scrolled into view
+        or accessed (see _load_rows), by pages of ROW_PAGE_SIZE rows read
+        from the database. Filling the table therefore no longer depends on
+        the number of documents of the project.
 
-        Special column handling:
+        Special column handling (when the rows are loaded):
             - Column 0 (name): Read-only, always displays as string.
-            - Bricks column: Displays clickable buttons for brick history.
+            - Bricks column: Read-only, the last brick is painted as a
+              clickable button by the bricks delegate.
             - Other columns: Editable, type-specific formatting.
-
-        Note:
-            - Displays a modal progress dialog during population.
-            - Temporarily hides the table during updates for performance.
-            - Connects cell change signals after population completes.
         """
-        # Initialize progress dialog
-        cells_count = len(self.scans_to_visualize) * len(
-            self.horizontalHeader()
-        )
-        self.progress = QProgressDialog(
-            "Please wait while the cells are being filled...",
-            None,
-            0,
-            cells_count,
-        )
-        self.progress.setMinimumDuration(0)
-        self.progress.setValue(0)
-        self.progress.setMinimumWidth(350)  # For mac OS
-        self.progress.setWindowTitle("Filling the cells")
-        self.progress.setWindowFlags(
-            Qt.Window | Qt.WindowTitleHint | Qt.CustomizeWindowHint
-        )
-        self.progress.setModal(True)
-        self.progress.setAttribute(Qt.WA_DeleteOnClose, True)
-        self.progress.show()
-        cell_index = 0
 
         with self.batch_update(disable_sorting=True):
             # Disconnect signals
@@ -2232,154 +3754,47 @@ class TableDataBrowser(QTableWidget):
                 )
 
             try:
+                self._cancel_background_load()
+                self.clearContents()
+                self.setRowCount(len(self.scans_to_visualize))
+                self._set_row_scans(self.scans_to_visualize)
+                self.row_cache.clear()
+                self._cell_states.clear()
+                self._unloaded_columns = self._hidden_tags()
 
-                with self.project.database.data() as database_data:
-                    primary_key = database_data.get_primary_key_name(
-                        COLLECTION_CURRENT
-                    )
-
-                    # Fetch scans from database
-                    if self.scans_to_visualize:
-                        escaped_scans = [
-                            scan.replace("\\", "\\\\").replace('"', '\\"')
-                            for scan in self.scans_to_visualize
-                        ]
-                        joined_scans = ", ".join(
-                            f'"{scan}"' for scan in escaped_scans
-                        )
-                        query = f"{primary_key} IN [{joined_scans}]"
-                        scans = database_data.filter_documents(
-                            COLLECTION_CURRENT, query
-                        )
+                for row in range(self.rowCount()):
 
-                    else:
-                        scans = []
+                    if self.isRowHidden(row):
+                        self.setRowHidden(row, False)
 
-                    # Extract column tags and their types
-                    tags = [
-                        self.horizontalHeaderItem(col).text()
-                        for col in range(len(self.horizontalHeader()))
-                    ]
-                    field_names = database_data.get_field_names(
-                        COLLECTION_CURRENT
-                    )
-                    tag_type_map = {
-                        field_name: (
-                            database_data.get_field_attributes(
-                                COLLECTION_CURRENT, field_name
-                            )
-                            or {}
-                        ).get("field_type", str)
-                        for field_name in field_names
-                    }
-                    tag_types = [tag_type_map[tag] for tag in tags]
-
-                    # Populate table cells
-                    for row, scan in enumerate(scans):
-
-                        for column, tag in enumerate(tags):
-                            cell_index += 1
-
-                            # Only update progress every 50 cells to save time
-                            if cell_index % 50 == 0:
-                                self.progress.setValue(cell_index)
-                                QApplication.processEvents()
-
-                            item = QTableWidgetItem()
-
-                            if column == 0:
-                                # Name column: read-only
-                                item.setFlags(
-                                    item.flags() & ~Qt.ItemIsEditable
-                                )
-                                set_item_data(
-                                    item, scan[tag], FIELD_TYPE_STRING
-                                )
-
-                            else:
-                                current_value = scan[tag]
-                                col_type = tag_types[column]
-
-                                if current_value:
-
-                                    if tag != TAG_BRICKS:
-                                        set_item_data(
-                                            item, current_value, col_type
-                                        )
-
-                                    else:
-                                        # Bricks column: create widget with
-                                        # button
-                                        widget = QWidget()
-                                        layout = QVBoxLayout()
-
-                                        brick_uuid = current_value[-1]
-                                        brick_name = database_data.get_value(
-                                            collection_name=COLLECTION_BRICK,
-                                            primary_key=brick_uuid,
-                                            field=BRICK_NAME,
-                                        )
-
-                                        if brick_name:
-                                            button = QPushButton(brick_name)
-                                            button.setFocusPolicy(Qt.NoFocus)
-                                            self.bricks[button] = brick_uuid
-                                            button.clicked.connect(
-                                                partial(
-                                                    self.show_brick_history,
-                                                    scan[TAG_FILENAME],
-                                                )
-                                            )
-                                            layout.addWidget(button)
-
-                                        widget.setLayout(layout)
-                                        self.setCellWidget(row, column, widget)
-
-                                else:
-
-                                    # Handle undefined values
-                                    if tag != TAG_BRICKS:
-                                        set_item_data(
-                                            item,
-                                            NOT_DEFINED_VALUE,
-                                            FIELD_TYPE_STRING,
-                                        )
-                                        font = item.font()
-                                        font.setItalic(True)
-                                        font.setBold(True)
-                                        item.setFont(font)
-
-                                    else:
-                                        # No brick: clear widget and mark
-                                        # non-editable
-                                        self.setCellWidget(row, column, None)
-                                        set_item_data(
-                                            item, "", FIELD_TYPE_STRING
-                                        )
-                                        item.setFlags(
-                                            item.flags() & ~Qt.ItemIsEditable
-                                        )
-
-                            self.setItem(row, column, item)
-
-                # Apply saved sorting preferences
+                # Apply saved sorting preferences (the default is by name)
                 tag_to_sort = self.project.getSortedTag()
                 column_to_sort = self.get_tag_column(tag_to_sort)
                 sort_order = self.project.getSortOrder()
 
-                if column_to_sort is not None:
-                    self.horizontalHeader().setSortIndicator(
-                        column_to_sort, sort_order
-                    )
+                if column_to_sort is None:
+                    column_to_sort, sort_order = 0, 0
 
-                else:
-                    self.horizontalHeader().setSortIndicator(0, 0)
+                header = self.horizontalHeader()
+                header_blocked = header.blockSignals(True)
 
-                self.resizeRowsToContents()
+                try:
+                    header.setSortIndicator(column_to_sort, sort_order)
+
+                finally:
+                    header.blockSignals(header_blocked)
+
+                self.project.setSortOrder(int(sort_order))
+                self.project.setSortedTag(
+                    self.horizontalHeaderItem(column_to_sort).text()
+                )
+                self._sort_rows(
+                    self.project.getSortedTag(),
+                    sort_order == Qt.DescendingOrder,
+                )
                 self.resizeColumnsToContents()
 
             finally:
-                self.progress.close()
 
                 # Reconnect signals
                 if self.activate_selection:
@@ -2395,9 +3810,13 @@ class TableDataBrowser(QTableWidget):
 
         Sets up table columns based on database fields, configuring each with:
             - Appropriate tooltips showing description, unit, and type.
-            - Specialized delegates for numeric and temporal data types.
+            - Specialized delegates for numeric and temporal data types, and
+              for the bricks.
             - Visibility based on display settings or field attributes.
 
+        The columns shown that were not filled yet are filled for the loaded
+        rows (see _load_columns).
+
         :param take_tags_to_update: If True, use tags_to_display for
          visibility. If False, use field visibility attributes. Defaults to
          False.
@@ -2413,13 +3832,6 @@ class TableDataBrowser(QTableWidget):
 
         tags = [TAG_FILENAME] + sorted(tags)
         self.setColumnCount(len(tags))
-        # Mapping of field types to their corresponding delegates
-        DELEGATE_MAP = {
-            FIELD_TYPE_FLOAT: NumberFormatDelegate,
-            FIELD_TYPE_DATETIME: DateTimeFormatDelegate,
-            FIELD_TYPE_DATE: DateFormatDelegate,
-            FIELD_TYPE_TIME: TimeFormatDelegate,
-        }
 
         with self.project.database.data() as database_data:
 
@@ -2436,14 +3848,6 @@ class TableDataBrowser(QTableWidget):
                         f"Unit: {tag_attrib['unit']}\n"
                         f"Type: {type_name(tag_attrib['field_type'])}"
                     )
-                    # Apply specialized delegate based on field type
-                    delegate_class = DELEGATE_MAP.get(tag_attrib["field_type"])
-
-                    if delegate_class:
-                        self.setItemDelegateForColumn(
-                            column, delegate_class(self)
-                        )
-
                     # Determine column visibility
                     is_visible = (
                         tag_name in self.tags_to_display
@@ -2454,6 +3858,10 @@ class TableDataBrowser(QTableWidget):
 
                 self.setHorizontalHeaderItem(column, item)
 
+        # Apply specialized delegates based on field type
+        self._set_column_delegates()
+        self._load_columns(set(tags) - self._hidden_tags())
+
     def get_current_filter(self):
         """
         Get the current data browser selection.
@@ -2503,21 +3911,15 @@ class TableDataBrowser(QTableWidget):
         """
         Find the row index for a given scan filename.
 
+        The row is looked up in the index of the rows (see _scan_rows).
+
         :param scan: The scan filename to search for.
 
         :Returns: (int) The zero-based row index if the scan is found, None
          otherwise.
 
         """
-
-        return next(
-            (
-                row
-                for row in range(self.rowCount())
-                if self.item(row, 0).text() == scan
-            ),
-            None,
-        )
+        return self._scan_rows().get(scan)
 
     def get_tag_column(self, tag):
         """
@@ -2539,7 +3941,72 @@ class TableDataBrowser(QTableWidget):
             ) and item.text() == tag:
                 return column
 
-        return None
+        return None
+
+    def hideEvent(self, event):
+        """
+        Stop loading rows in the background when the table is hidden.
+
+        :param event: (QHideEvent) The hide event.
+        """
+        self._cancel_background_load()
+        super().hideEvent(event)
+
+    def invalidate_scans(self, scans=None):
+        """
+        Invalidate the cached documents of the pages holding scans.
+
+        This must be called when values of loaded rows are changed in the
+        database. The documents of the pages are read again when they are
+        needed (e.g. by update_colors); the other pages stay cached. The
+        rows of the scans are no longer loaded in the background, as the
+        pages already read may hold their previous values.
+
+        :param scans: (iterable[str]) The scans whose values changed. All
+         the pages are invalidated if None.
+        """
+
+        if scans is None:
+            self._cancel_background_load()
+
+        else:
+            scans = list(scans)
+            self._background_edits.update(scans)
+
+        self.row_cache.invalidate(scans)
+
+    def item(self, row, column):
+        """
+        Return the item of a cell, loading its row if needed.
+
+        The rows are loaded by pages (see _load_rows), so accessing the
+        items of consecutive rows only queries the database once per page.
+        A hidden column that was never shown is filled first (see
+        _load_columns).
+
+        :param row: (int) The row of the cell.
+        :param column: (int) The column of the cell.
+
+        :Returns: (QTableWidgetItem) The item of the cell, None if the cell
+         doesn't exist.
+        """
+
+        if (
+            0 <= row < len(self._row_scans)
+            and self._row_scans[row] not in self.row_cache
+        ):
+            start = row - row % ROW_PAGE_SIZE
+            end = min(start + ROW_PAGE_SIZE, len(self._row_scans))
+            self._load_rows(range(start, end))
+
+        if (
+            self._unloaded_columns
+            and (header := self.horizontalHeaderItem(column))
+            and header.text() in self._unloaded_columns
+        ):
+            self._load_columns([header.text()])
+
+        return super().item(row, column)
 
     def mouseReleaseEvent(self, event):
         """
@@ -2560,8 +4027,8 @@ class TableDataBrowser(QTableWidget):
         Sort table rows by multiple tag values.
 
         Sorts the visualized scans based on the values of specified tags, then
-        reorganizes the table rows to reflect the new order. Handles both
-        regular items and special brick widgets during the reordering.
+        lays the table rows out in the new order. The order is computed by
+        the database (see _sorted_scans); the cells aren't filled again.
 
         :param list_tags: (list) List of tag names to sort by (primary to
          secondary).
@@ -2571,202 +4038,19 @@ class TableDataBrowser(QTableWidget):
             Temporarily disables item change signals during sorting to prevent
             triggering update handlers. The sort is stable and preserves the
             relative order of items with equal sort keys.
-
-        Contains:
-
-            Inner functions:
-
-                - _clear_cell: clears the specified cell.
-                - _create_brick_widget: Create and set a brick widget for the
-                  specified table cell.
         """
-
-        def _clear_cell(row, column, item):
-            """
-            Clears the specified cell and sets an optional non-editable item.
-
-            :param row: (int) The row index of the cell to clear.
-            :param column: (int) The column index of the cell to clear.
-            :param item: (QTableWidgetItem) The item to set in the cleared
-             cell. If None, the cell remains empty.
-            """
-            self.setCellWidget(row, column, None)
-
-            if item:
-                set_item_data(item, "", FIELD_TYPE_STRING)
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                self.setItem(row, column, item)
-
-        def _create_brick_widget(
-            row,
-            column,
-            scan,
-            database_data,
-            old_widget,
-            item,
-            clicked_scan=None,
-        ):
-            """
-            Create and set a brick widget for the specified table cell.
-
-            The brick name is fetched from the database and displayed as a
-            clickable button. Clicking the button shows the brick's history.
-            Existing brick references are updated if necessary.
-
-            :param row :(int) Row index of the cell to fill.
-            :param column: (int) Column index of the cell to fill.
-            :param scan: (str) Primary key of the scan linked to the brick.
-            :param db: (Database) Active database connection.
-            :param old_widget: (QWidget) Existing widget previously in the
-             same cell (if any).
-            :param item: (QTableWidgetItem) The table item for this cell.
-            :param clicked_scan: (str) The scan ID to use when connecting the
-             brick button’s clicked signal. If None, defaults to `scan`.
-            """
-            app_thread = QApplication.instance().thread()
-            widget = QWidget()
-            widget.moveToThread(app_thread)
-            layout = QVBoxLayout(widget)
-            cur_val = database_data.get_value(
-                collection_name=COLLECTION_CURRENT,
-                primary_key=scan,
-                field=TAG_BRICKS,
-            )
-
-            if not cur_val:
-                _clear_cell(row, column, item)
-                return
-
-            brick_uuid = cur_val[0]
-            brick_name = database_data.get_value(
-                collection_name=COLLECTION_BRICK,
-                primary_key=brick_uuid,
-                field=BRICK_NAME,
-            )
-
-            if not brick_name:
-                _clear_cell(row, column, item)
-                return
-
-            brick_name_button = QPushButton(brick_name)
-            brick_name_button.setFocusPolicy(Qt.NoFocus)
-            brick_name_button.moveToThread(app_thread)
-            # Replace the old brick reference if needed
-            old_button = (
-                old_widget.findChild(QPushButton) if old_widget else None
-            )
-
-            for key, value in list(self.bricks.items()):
-
-                if value == brick_uuid and key == old_button:
-                    del self.bricks[key]
-                    self.bricks[brick_name_button] = brick_uuid
-                    break
-
-            # Use the appropriate scan for the clicked signal
-            target_scan = clicked_scan or scan
-            brick_name_button.clicked.connect(
-                partial(self.show_brick_history, target_scan)
-            )
-            layout.addWidget(brick_name_button)
-            self.setCellWidget(row, column, widget)
-            self.setItem(row, column, item)
-
         safe_disconnect(self.itemChanged, self.on_cell_changed)
 
         try:
 
-            with self.project.database.data() as db:
-                # Fetch tag field attributes
-                tag_attributes = [
-                    db.get_field_attributes(COLLECTION_CURRENT, tag_name)
-                    for tag_name in list_tags
-                ]
-                # Build sort keys for each scan
-                sort_keys = []
-
-                for scan in self.scans_to_visualize:
-                    key = []
-
-                    for tag in tag_attributes:
-                        field_name = tag["index"].split("|")[1]
-                        value = db.get_value(
-                            collection_name=COLLECTION_CURRENT,
-                            primary_key=scan,
-                            field=field_name,
-                        )
-                        key.append(
-                            str(value)
-                            if value is not None
-                            else NOT_DEFINED_VALUE
-                        )
-
-                    sort_keys.append(key)
-
-                # Sort scans by the computed keys
-                reverse = order == "Descending"
-                self.scans_to_visualize = [
-                    scan
-                    for _, scan in sorted(
-                        zip(sort_keys, self.scans_to_visualize),
-                        reverse=reverse,
-                    )
-                ]
-                # Reorder table rows to match sorted scans
-                self.setSortingEnabled(False)
-
-                for row, scan in enumerate(self.scans_to_visualize):
-                    old_row = self.get_scan_row(scan)
-
-                    if old_row == row:
-                        continue
-
-                    # Swap all columns between current_row and target_row
-                    for column in range(self.columnCount()):
-                        header_text = self.horizontalHeaderItem(column).text()
-
-                        if header_text == TAG_BRICKS:
-                            # Handle brick widget cells
-                            widget_to_move = self.cellWidget(old_row, column)
-                            item_to_move = self.takeItem(old_row, column)
-                            widget_wrong_row = self.cellWidget(row, column)
-                            item_wrong_row = self.takeItem(row, column)
-
-                            # Move widget_to_move to row
-                            if widget_to_move:
-                                _create_brick_widget(
-                                    row,
-                                    column,
-                                    scan,
-                                    db,
-                                    widget_to_move,
-                                    item_to_move,
-                                )
-
-                            else:
-                                _clear_cell(row, column, item_to_move)
-
-                            # widget_wrong_row to old_row
-                            if widget_wrong_row:
-                                old_scan = self.item(old_row, 0).text()
-                                _create_brick_widget(
-                                    old_row,
-                                    column,
-                                    old_scan,
-                                    db,
-                                    widget_wrong_row,
-                                    item_wrong_row,
-                                    clicked_scan=old_scan,
-                                )
-
-                            else:
-                                _clear_cell(old_row, column, item_wrong_row)
-
-                        else:
-                            item_to_move = self.takeItem(old_row, column)
-                            item_wrong_row = self.takeItem(row, column)
-                            self.setItem(row, column, item_to_move)
-                            self.setItem(old_row, column, item_wrong_row)
+            self.scans_to_visualize = self._sorted_scans(
+                self.scans_to_visualize, list_tags, order == "Descending"
+            )
+            # Reorder table rows to match sorted scans, hidden rows last
+            self.setSortingEnabled(False)
+            table_scans = ScanSet(self._row_scans)
+            sorted_scans = self.scans_to_visualize & table_scans
+            self._set_row_order([*sorted_scans, *(table_scans - sorted_scans)])
 
         finally:
             # Re-enable sorting and reconnect signals
@@ -2774,7 +4058,6 @@ class TableDataBrowser(QTableWidget):
             # self.setSortingEnabled(True)
             self.setSortingEnabled(False)
             safe_connect(self.itemChanged, self.on_cell_changed)
-            self.resizeRowsToContents()
             self.resizeColumnsToContents()
 
     def multiple_sort_pop_up(self):
@@ -2981,6 +4264,9 @@ class TableDataBrowser(QTableWidget):
                         primary_key=scan_path,
                         values_dict={tag_name: database_value},
                     )
+                    self.update_cached_value(
+                        scan_path, tag_name, database_value
+                    )
 
                     # Reset font if this was a previously undefined cell
                     if old_value is None:
@@ -3006,7 +4292,13 @@ class TableDataBrowser(QTableWidget):
             if self.activate_selection:
                 safe_connect(self.itemSelectionChanged, self.selection_changed)
 
-            self.update_colors()
+            # Only the rows of the selected cells were edited
+            self.update_colors(
+                {
+                    self._row_scans[index.row()]
+                    for index in self.selectedIndexes()
+                }
+            )
             safe_connect(self.itemChanged, self.on_cell_changed)
 
     def remove_scan(self):
@@ -3026,6 +4318,10 @@ class TableDataBrowser(QTableWidget):
         multiple scans are selected, the user can choose to apply their
         decision to all remaining scans.
 
+        The documents of all the selected scans are read at once, removed in
+        a single transaction, their files are deleted concurrently and the
+        table is updated once.
+
         Side effects:
             - Modifies database by removing documents from COLLECTION_CURRENT
               and COLLECTION_INITIAL.
@@ -3042,8 +4338,12 @@ class TableDataBrowser(QTableWidget):
             if not selected_points:
                 return
 
-            scans_removed = []
-            values_removed = []
+            # Scans of the selected rows, each once
+            scans = list(
+                dict.fromkeys(
+                    self._row_scans[point.row()] for point in selected_points
+                )
+            )
             scan_list = (
                 self.data_browser.main_window.pipeline_manager.scan_list
             )
@@ -3051,108 +4351,148 @@ class TableDataBrowser(QTableWidget):
             suppress_dialog = False
             user_cancelled = False
 
-            with self.project.database.data(write=True) as database_data:
+            with self.project.database.data() as database_data:
+                documents_curr = self._documents_by_scan(
+                    database_data, COLLECTION_CURRENT, scans
+                )
+                documents_init = self._documents_by_scan(
+                    database_data, COLLECTION_INITIAL, scans
+                )
 
-                for point in selected_points:
-                    scan_path = self.item(point.row(), 0).text()
-                    scan_object = database_data.get_document(
-                        collection_name=COLLECTION_CURRENT,
-                        primary_keys=scan_path,
-                    )
+            scans_removed = []
+            values_removed = []
 
-                    if not scan_object:
-                        continue
+            for scan_path in scans:
+                document_curr = documents_curr.get(scan_path)
 
-                    # Confirm removal if scan is in active pipeline
-                    is_in_pipeline = (
-                        scan_path in scan_list and self.data_browser.data_sent
-                    )
+                if document_curr is None:
+                    continue
 
-                    if is_in_pipeline:
+                # Confirm removal if scan is in active pipeline
+                is_in_pipeline = (
+                    scan_path in scan_list and self.data_browser.data_sent
+                )
 
-                        if not suppress_dialog:
-                            popup = PopUpRemoveScan(
-                                scan_path, len(selected_points)
-                            )
-                            popup.exec()
-                            user_cancelled = popup.stop
-                            suppress_dialog = popup.repeat
+                if is_in_pipeline:
 
-                        if user_cancelled:
-                            continue
+                    if not suppress_dialog:
+                        popup = PopUpRemoveScan(
+                            scan_path, len(selected_points)
+                        )
+                        popup.exec()
+                        user_cancelled = popup.stop
+                        suppress_dialog = popup.repeat
 
-                    # Preserve modification history for all fields except
-                    # filename
-                    for tag in database_data.get_field_names(
-                        COLLECTION_CURRENT
-                    ):
+                    if user_cancelled:
+                        continue
 
-                        if tag == TAG_FILENAME:
-                            continue
+                # Preserve modification history for all fields except
+                # filename
+                document_init = documents_init.get(scan_path) or {}
 
-                        current_value = database_data.get_value(
-                            collection_name=COLLECTION_CURRENT,
-                            primary_key=scan_path,
-                            field=tag,
-                        )
-                        initial_value = database_data.get_value(
-                            collection_name=COLLECTION_INITIAL,
-                            primary_key=scan_path,
-                            field=tag,
+                for tag, current_value in document_curr.items():
+
+                    if tag == TAG_FILENAME:
+                        continue
+
+                    initial_value = document_init.get(tag)
+
+                    # Only archive if at least one value exists
+                    if current_value is not None or initial_value is not None:
+                        values_removed.append(
+                            [scan_path, tag, current_value, initial_value]
                         )
 
-                        # Only archive if at least one value exists
-                        if (
-                            current_value is not None
-                            or initial_value is not None
-                        ):
-                            values_removed.append(
-                                [
-                                    scan_path,
-                                    tag,
-                                    current_value,
-                                    initial_value,
-                                ]
-                            )
+                scans_removed.append(scan_path)
 
-                    # Remove from database collections
-                    self.scans_to_visualize.remove(scan_path)
-                    database_data.remove_document(
-                        COLLECTION_CURRENT, scan_path
-                    )
-                    database_data.remove_document(
-                        COLLECTION_INITIAL, scan_path
-                    )
-                    # Remove associated files from file system
-                    full_scan_path = os.path.join(
-                        self.project.folder, scan_path
-                    )
-                    files_to_remove = [full_scan_path]
+            if not scans_removed:
+                return
 
-                    # Include associated JSON for NIfTI files
-                    if scan_path.endswith(".nii"):
-                        files_to_remove.append(full_scan_path[:-4] + ".json")
+            # Remove from database collections
+            with self.project.database.data(write=True) as database_data:
+                database_data.remove_documents(
+                    COLLECTION_CURRENT, scans_removed
+                )
+                database_data.remove_documents(
+                    COLLECTION_INITIAL, scans_removed
+                )
 
-                    for file_path in files_to_remove:
+            # Remove associated files from file system
+            files_to_remove = []
 
-                        if os.path.isfile(file_path):
-                            os.remove(file_path)
+            for scan_path in scans_removed:
+                full_scan_path = os.path.join(self.project.folder, scan_path)
+                files_to_remove.append(full_scan_path)
 
-                    scans_removed.append(scan_object[0])
+                # Include associated JSON for NIfTI files
+                if scan_path.endswith(".nii"):
+                    files_to_remove.append(full_scan_path[:-4] + ".json")
 
-            # Update UI table
-            for scan in scans_removed:
-                scan_name = scan[TAG_FILENAME]
-                self.removeRow(self.get_scan_row(scan_name))
+            try:
+                remove_files(files_to_remove)
 
-            if scans_removed:
-                self.project.unsavedModifications = True
-                self.resizeColumnsToContents()
+            except OSError as exc:
+                logger.warning("Some scan files were not removed: %s", exc)
+
+            # Update UI table
+            self._remove_rows(scans_removed)
+            self.update_colors()
+            self.project.unsavedModifications = True
+            self.resizeColumnsToContents()
 
         finally:
             # Safely disconnect signals
             safe_connect(self.itemChanged, self.on_cell_changed)
 
+    def removeColumn(self, column):
+        """
+        Remove a column from the table, and shift the column delegates.
+
+        Qt keeps the column delegates by column index, so the delegates of
+        the following columns are moved one column to the left.
+
+        :param column: (int) The index of the column to remove.
+        """
+        delegates = [
+            self.itemDelegateForColumn(col)
+            for col in range(self.columnCount())
+        ]
+
+        if header := self.horizontalHeaderItem(column):
+            self._unloaded_columns.discard(header.text())
+
+        super().removeColumn(column)
+        del delegates[column]
+        # The color states are kept by column index
+        self._cell_states.clear()
+
+        for col, delegate in enumerate(delegates):
+            self.setItemDelegateForColumn(col, delegate)
+
+        self.setItemDelegateForColumn(len(delegates), None)
+
+    def removeRow(self, row):
+        """
+        Remove a row from the table, and forget its scan.
+
+        :param row: (int) The index of the row to remove.
+        """
+        # The rows move, and their parity with them
+        self._cancel_background_load()
+        super().removeRow(row)
+
+        if 0 <= row < len(self._row_scans):
+            scan = self._row_scans.pop(row)
+            self.row_cache.discard(scan)
+            self._cell_states.pop(scan, None)
+
+            # The following rows moved up, index them again when needed
+            if row == len(self._row_scans) and self._row_index is not None:
+                self._row_index.pop(scan, None)
+
+            else:
+                self._row_index = None
+
     def reset_cell(self):
         """
         Reset selected cells to their original values from the initial
@@ -3211,6 +4551,9 @@ class TableDataBrowser(QTableWidget):
                         primary_key=scan_name,
                         values_dict={tag_name: initial_value},
                     )
+                    self.update_cached_value(
+                        scan_name, tag_name, initial_value
+                    )
 
                     field_type = database_data.get_field_attributes(
                         COLLECTION_CURRENT, tag_name
@@ -3274,7 +4617,7 @@ class TableDataBrowser(QTableWidget):
                 )["field_type"]
 
                 for row in range(len(self.scans_to_visualize)):
-                    scan = self.item(row, 0).text()
+                    scan = self._row_scans[row]
                     initial_value = database_data.get_value(
                         collection_name=COLLECTION_INITIAL,
                         primary_key=scan,
@@ -3297,11 +4640,11 @@ class TableDataBrowser(QTableWidget):
                             primary_key=scan,
                             values_dict={tag_name: initial_value},
                         )
-                        set_item_data(
-                            self.item(row, col),
-                            initial_value,
-                            field_type,
-                        )
+                        self.update_cached_value(scan, tag_name, initial_value)
+                        # Rows not loaded yet will be read from the database
+                        if item := QTableWidget.item(self, row, col):
+                            set_item_data(item, initial_value, field_type)
+
                         modified_values.append(
                             [scan, tag_name, current_value, initial_value]
                         )
@@ -3386,6 +4729,7 @@ class TableDataBrowser(QTableWidget):
                             primary_key=scan_name,
                             values_dict={tag: initial_value},
                         )
+                        self.update_cached_value(scan_name, tag, initial_value)
                         # Update table cell display
                         field_type = database_data.get_field_attributes(
                             COLLECTION_CURRENT, tag
@@ -3412,6 +4756,51 @@ class TableDataBrowser(QTableWidget):
 
         self.resizeColumnsToContents()
 
+    def resizeEvent(self, event):
+        """
+        Load the rows brought into view by the resizing of the table.
+
+        :param event: (QResizeEvent) The resize event.
+        """
+        super().resizeEvent(event)
+        self._load_visible_rows()
+
+    @property
+    def scans_to_search(self):
+        """
+        The scans the searches of the table are restricted to.
+
+        :Returns: (ScanSet) The scans, shared with the other widgets.
+        """
+        return self._scans_to_search
+
+    @scans_to_search.setter
+    def scans_to_search(self, scans):
+        """
+        Set the scans the searches of the table are restricted to.
+
+        :param scans: (Iterable[str]) The scans, turned into a scan set.
+        """
+        self._scans_to_search = ScanSet.of(scans)
+
+    @property
+    def scans_to_visualize(self):
+        """
+        The scans shown in the table, in the order of the rows.
+
+        :Returns: (ScanSet) The scans, shared with the other widgets.
+        """
+        return self._scans_to_visualize
+
+    @scans_to_visualize.setter
+    def scans_to_visualize(self, scans):
+        """
+        Set the scans shown in the table.
+
+        :param scans: (Iterable[str]) The scans, turned into a scan set.
+        """
+        self._scans_to_visualize = ScanSet.of(scans)
+
     def section_moved(self, logical_index, old_index, new_index):
         """
         Handle section movement to keep the FileName column fixed at
@@ -3485,6 +4874,17 @@ class TableDataBrowser(QTableWidget):
 
         self.setSelectionMode(QAbstractItemView.ExtendedSelection)
 
+    def selectedItems(self):
+        """
+        Return the selected items, loading the selected rows if needed.
+
+        :Returns: (list[QTableWidgetItem]) The selected items.
+        """
+        self._load_rows(
+            sorted({index.row() for index in self.selectedIndexes()})
+        )
+        return super().selectedItems()
+
     def selection_changed(self):
         """
         Update the tab view when the table selection changes.
@@ -3510,8 +4910,8 @@ class TableDataBrowser(QTableWidget):
             self.scans.clear()
             scan_dict = {}
 
-            for point in self.selectedItems():
-                scan_name = self.item(point.row(), 0).text()
+            for point in self.selectedIndexes():
+                scan_name = self._row_scans[point.row()]
                 tag_name = self.horizontalHeaderItem(point.column()).text()
                 # Group tags by scan name using a dictionary
                 scan_dict.setdefault(scan_name, []).append(tag_name)
@@ -3533,20 +4933,17 @@ class TableDataBrowser(QTableWidget):
 
             safe_connect(self.itemChanged, self.on_cell_changed)
 
-    def show_brick_history(self, scan):
+    def show_brick_history(self, scan, brick_uuid):
         """
         Display a popup window showing the history of a brick.
 
-        This method retrieves the brick UUID associated with the triggering
-        sender, creates a history popup dialog, and displays it to the user.
+        This method is called when the brick button of a document is clicked
+        (see BricksDelegate), creates a history popup dialog, and displays it
+        to the user.
 
-        :param scan: The scan data to display in the history popup.
-
-        Note:
-            The sender (typically a UI widget) must be registered in
-            self.bricks to retrieve the corresponding brick UUID.
+        :param scan: (str) The scan whose brick button was clicked.
+        :param brick_uuid: (str) The uuid of the brick.
         """
-        brick_uuid = self.bricks[self.sender()]
         self.brick_history_popup = PopUpShowHistory(
             project=self.project,
             brick_uuid=brick_uuid,
@@ -3556,6 +4953,17 @@ class TableDataBrowser(QTableWidget):
         )
         self.brick_history_popup.show()
 
+    def showEvent(self, event):
+        """
+        Load the rows in view when the table is shown, and the other rows
+        in the background.
+
+        :param event: (QShowEvent) The show event.
+        """
+        super().showEvent(event)
+        self._load_visible_rows()
+        self._start_background_load()
+
     def sort_column(self, order):
         """
         Sort the currently selected column.
@@ -3589,8 +4997,8 @@ class TableDataBrowser(QTableWidget):
         Update project state and apply sorting to the table.
 
         Temporarily disconnects signals, updates the project's sort
-        configuration, applies the sort to table items, refreshes visual
-        elements, and reconnects signals.
+        configuration, sorts the rows by the values of the column in the
+        database, refreshes visual elements, and reconnects signals.
 
         :param column: The column index to sort by. Use -1 to indicate no
          sorting.
@@ -3607,25 +5015,42 @@ class TableDataBrowser(QTableWidget):
         safe_disconnect(self.itemChanged, self.on_cell_changed)
 
         try:
+            tag = self.horizontalHeaderItem(column).text()
             self.project.setSortOrder(int(order))
-            self.project.setSortedTag(self.horizontalHeaderItem(column).text())
-            self.sortItems(column, order)
+            self.project.setSortedTag(tag)
+            self._sort_rows(tag, order == Qt.DescendingOrder)
             self.update_colors()
-            self.resizeRowsToContents()
 
         finally:
             safe_connect(self.itemChanged, self.on_cell_changed)
 
-    def update_colors(self):
+    def update_cached_value(self, scan, tag, value):
+        """
+        Record in the row cache a value written in the database.
+
+        The cached current document of the scan is updated in place, so the
+        color of the cell is computed by the next update_colors without
+        reading the database again.
+
+        :param scan: (str) The scan whose value changed.
+        :param tag: (str) The tag of the value.
+        :param value: The new current value (None if removed).
+        """
+        self._background_edits.add(scan)
+        self.row_cache.set_value(scan, tag, value)
+
+    def update_colors(self, scans=None):
         """
         Update cell background colors based on data state and visibility.
 
-        Colors indicate:
-            - White/Grey: Unmodified builtin tags (alternating for visible
-              rows).
-            - Cyan/Blue: Modified builtin tags (alternating for visible rows).
-            - Pink/Red: User-defined tags or null values (alternating for
-              visible rows).
+        Only the loaded rows are colored here, the other rows are colored
+        when they are loaded (see _color_rows for the meaning of the colors).
+        The documents of the loaded rows come from the row cache; only the
+        pages invalidated since they were read are fetched again, and only
+        the cells whose state changed are painted.
+
+        :param scans: (iterable) The scans whose rows must be recolored
+                      (all the loaded rows if None).
 
         Note:
             This method assumes the `itemChanged` signal is disconnected.
@@ -3633,135 +5058,33 @@ class TableDataBrowser(QTableWidget):
         """
 
         # itemChanged signal is always disconnected when calling this method
-        # Extract headers and scan identifiers
-        tags = [
-            self.horizontalHeaderItem(col).text()
-            for col in range(self.columnCount())
-        ]
-        scans = [
-            self.item(row, 0).text() if self.item(row, 0) else None
-            for row in range(self.rowCount())
-        ]
-
-        # Fetch database documents and field metadata
-        with self.project.database.data() as database_data:
-            primary_key = database_data.get_primary_key_name(
-                COLLECTION_CURRENT
-            )
-
-            if scans:
-                escaped_scans = [
-                    scan.replace("\\", "\\\\")
-                    for scan in self.scans_to_visualize
-                ]
-                joined_scans = ", ".join(f'"{scan}"' for scan in escaped_scans)
-                req = f"{primary_key} IN [{joined_scans}]"
-                documents_curr = database_data.filter_documents(
-                    COLLECTION_CURRENT, req
-                )
-                documents_init = database_data.filter_documents(
-                    COLLECTION_INITIAL, req
-                )
-
-            else:
-                documents_curr = []
-                documents_init = []
-
-            fields = {
-                field_name: database_data.get_field_attributes(
-                    COLLECTION_CURRENT, field_name
-                )
-                for field_name in database_data.get_field_names(
-                    COLLECTION_CURRENT
-                )
-            }
-
-        # Build lookup tables for efficient access
-        table_scans = {
-            self.item(row, 0).text(): row for row in range(self.rowCount())
-        }
-        table_tags = {
-            self.horizontalHeaderItem(column).text(): column
-            for column in range(self.columnCount())
-        }
-        column_indices = [table_tags[tag] for tag in tags]
-        # Precompute even/odd status for visible rows
-        row_parity = []
-        is_even = True
-
-        for row in range(self.rowCount()):
-            row_parity.append(is_even)
-
-            if not self.isRowHidden(row):
-                is_even = not is_even
-
-        # Color mapping for different states
-        COLORS = {
-            ("white", True): (255, 255, 255),  # White
-            ("white", False): (230, 230, 230),  # Grey
-            ("modified", True): (200, 230, 245),  # Cyan
-            ("modified", False): (150, 215, 230),  # Blue
-            ("user_or_null", True): (245, 215, 215),  # Pink
-            ("user_or_null", False): (245, 175, 175),  # Red
-        }
-
-        # Update cell colors
-        for scan_curr, scan_init in zip(documents_curr, documents_init):
+        if scans is not None:
+            scans = set(scans)
 
-            try:
-                row = table_scans[scan_curr[tags[0]]]
+        loaded_rows = [
+            row
+            for row, scan in enumerate(self._row_scans)
+            if scan in self.row_cache and (scans is None or scan in scans)
+        ]
 
-            except KeyError:
-                break
+        if loaded_rows:
 
-            except Exception:
-                logger.exception(
-                    "Unexpected exception while updating DataBrowser colors. "
-                    "Display may be in degraded state."
+            # Fetch invalidated documents and field metadata
+            with self.project.database.data() as database_data:
+                documents_curr, documents_init = self._page_documents(
+                    database_data,
+                    self.row_cache.pages(
+                        self._row_scans[row] for row in loaded_rows
+                    ),
                 )
-                break
-
-            if self.isRowHidden(row):
-                continue
-
-            is_even = row_parity[row]
-
-            for column, tag in zip(column_indices, tags):
-
-                if self.isColumnHidden(column):
-                    continue
+                fields = self._field_attributes(database_data)
 
-                item = self.item(row, column)
-
-                # Determine the appropriate color key for a cell
-                # First column always uses default white/grey
-                if column == 0:
-                    color_key = ("white", is_even)
-
-                # Null values get user_or_null coloring
-                elif scan_curr[tag] is None:
-                    color_key = ("user_or_null", is_even)
-
-                # Builtin tags: check if modified
-                elif fields[tag]["origin"] == TAG_ORIGIN_BUILTIN:
-
-                    if scan_curr[tag] != scan_init[tag]:
-                        color_key = ("modified", is_even)
-
-                    else:
-                        color_key = ("white", is_even)
-
-                # User-defined tags
-                else:
-                    color_key = ("user_or_null", is_even)
-
-                color = QColor(*COLORS[color_key])
-                item.setData(Qt.BackgroundRole, QVariant(color))
+            self._color_rows(
+                loaded_rows, documents_curr, documents_init, fields
+            )
 
         # Auto-save if enabled
-        config = Config()
-
-        if config.isAutoSave():
+        if self.auto_save:
             self.project.saveModifications()
 
     def update_selection(self):
@@ -3809,13 +5132,27 @@ class TableDataBrowser(QTableWidget):
         self.setSortingEnabled(False)
         self.clearSelection()  # Selection cleared when switching project
 
+        # The table is filled from the database as it is now: record the
+        # changes made from now on
+        if self._changes_database is not self.project.database:
+
+            if self._changes_database is not None:
+                self._changes_database.remove_change_set(
+                    self._database_changes
+                )
+
+            self._changes_database = self.project.database
+            self._changes_database.add_change_set(self._database_changes)
+
+        self._database_changes.clear()
+
         # Fetch current scans from database
         with self.project.database.data() as database_data:
             self.scans_to_visualize = database_data.get_document_names(
                 COLLECTION_CURRENT
             )
 
-        self.scans_to_search = list(self.scans_to_visualize)
+        self.scans_to_search = self.scans_to_visualize
 
         # Reset selected scans if selection mode is active
         if self.activate_selection:
@@ -3835,7 +5172,6 @@ class TableDataBrowser(QTableWidget):
             self.fill_cells_update_table()
             # Adjust dimensions and styling
             self.resizeColumnsToContents()
-            self.resizeRowsToContents()
             self.update_colors()
 
         finally:
@@ -3852,7 +5188,8 @@ class TableDataBrowser(QTableWidget):
 
         Synchronizes the table's visible columns with the provided tag list by:
             - Hiding columns for tags that are no longer displayed.
-            - Showing columns for newly displayed tags.
+            - Showing columns for newly displayed tags, whose values are only
+              read for the loaded rows if they were never shown.
             - Updating advanced search dropdowns if the search panel is open.
             - Refreshing column sizing and colors.
 
@@ -3877,6 +5214,9 @@ class TableDataBrowser(QTableWidget):
             for tag in new_set:
                 self.setColumnHidden(self.get_tag_column(tag), False)
 
+            # Fill the columns shown for the first time
+            self._load_columns(new_set)
+
             if not (
                 hasattr(self.data_browser, "frame_advanced_search")
                 and not self.data_browser.frame_advanced_search.isHidden()
@@ -3912,8 +5252,13 @@ class TableDataBrowser(QTableWidget):
         longer in the visualization list, shows rows for newly visualized
         scans, and updates the table appearance.
 
-        :param old_scans: Collection of scans from the previous state, used to
-         determine which rows need to be hidden.
+        A row is shown if and only if its scan is in scans_to_visualize. The
+        rows are compared with their hidden state rather than with
+        old_scans, which callers may have set to other scans than the shown
+        ones, and only the rows whose state changes are hidden or shown.
+
+        :param old_scans: Collection of scans from the previous state (not
+         used, kept for the callers).
         """
         # Disconnect signals
         safe_disconnect(self.itemChanged, self.on_cell_changed)
@@ -3922,22 +5267,20 @@ class TableDataBrowser(QTableWidget):
             safe_disconnect(self.itemSelectionChanged, self.selection_changed)
 
         try:
-            # Hide rows for scans removed from visualization
-            old_scan_set = set(old_scans)
-            current_scan_set = set(self.scans_to_visualize)
-
-            for scan in old_scan_set - current_scan_set:
-
-                if (row := self.get_scan_row(scan)) is not None:
-                    self.setRowHidden(row, True)
+            # The rows to load change
+            self._cancel_background_load()
+            scans_to_visualize = ScanSet.of(self.scans_to_visualize)
 
-            # Show rows for scans added to visualization
-            for scan in current_scan_set:
+            # Hide or show the rows whose visualization changed
+            for row, scan in enumerate(self._row_scans):
+                hidden = scan not in scans_to_visualize
 
-                if (row := self.get_scan_row(scan)) is not None:
-                    self.setRowHidden(row, False)
+                if self.isRowHidden(row) != hidden:
+                    self.setRowHidden(row, hidden)
 
-            # Update table appearance
+            # Load the rows brought into view and update table appearance
+            self._load_visible_rows()
+            self._start_background_load()
             self.resizeColumnsToContents()
 
             # Update selection and colors
@@ -88,6 +88,8 @@ class ModifyTable(QDialog):
         self.tags = tags
         self.project = project
         self.value = value
+        # Values written to the database, as {scan: {tag: value}}
+        self.database_values = {}
         # Create and configure the table
         self.table = QTableWidget()
         self.fill_table()
@@ -254,30 +256,37 @@ class ModifyTable(QDialog):
 
                 return
 
-        # Only update database if all values are valid
-        # Update database for each cell with validated values
+        # Only update database if all values are valid, in one transaction
+        texts = [
+            self.table.item(0, i).text()
+            for i in range(self.table.columnCount())
+        ]
+        # Values converted once per field type
+        converted = {}
+        database_values = {}
 
         with self.project.database.data(write=True) as database_data:
+            field_types = {
+                tag: database_data.get_field_attributes(
+                    COLLECTION_CURRENT, tag
+                )["field_type"]
+                for tag in dict.fromkeys(self.tags)
+            }
 
             for scan, tag in zip(self.scans, self.tags):
-                # Get field attributes
-                tag_attrib = database_data.get_field_attributes(
-                    COLLECTION_CURRENT, tag
-                )
-                tag_type = tag_attrib["field_type"]
-                # Convert values according to field type
-                database_value = []
-
-                for i in range(self.table.columnCount()):
-                    item = self.table.item(0, i)
-                    text = item.text()
-                    database_value.append(self._convert_value(text, tag_type))
-
-                # Update database
-                database_data.set_value(
-                    collection_name=COLLECTION_CURRENT,
-                    primary_key=scan,
-                    values_dict={tag: database_value},
+                tag_type = field_types[tag]
+
+                if tag_type not in converted:
+                    converted[tag_type] = [
+                        self._convert_value(text, tag_type) for text in texts
+                    ]
+
+                # Each cell gets its own list
+                database_values.setdefault(scan, {})[tag] = list(
+                    converted[tag_type]
                 )
 
+            database_data.set_values(COLLECTION_CURRENT, database_values)
+
+        self.database_values = database_values
         self.close()
@@ -19,13 +19,19 @@ patterns as well as finding entries with undefined or missing values.
 ##########################################################################
 
 # PyQt5 import
+from PyQt5.QtCore import QTimer, pyqtSignal
 from PyQt5.QtWidgets import QLineEdit
 
 # populse_mia import
-from populse_mia.data_manager import TAG_BRICKS, TAG_FILENAME
+from populse_mia.data_manager import TAG_BRICKS
+from populse_mia.data_manager.query import And, Contains, IsNull, Or
+from populse_mia.data_manager.scan_set import ScanSet
 
 __all__ = ["RapidSearch"]
 
+#: Delay (ms) without keystroke after which a typed search is run.
+SEARCH_DEBOUNCE_MS = 250
+
 
 class RapidSearch(QLineEdit):
     """
@@ -38,15 +44,31 @@ class RapidSearch(QLineEdit):
 
     Dates should be formatted as: yyyy-mm-dd hh:mm:ss.fff.
 
+    The searchRequested signal is emitted SEARCH_DEBOUNCE_MS after the last
+    keystroke of the user, so that a search isn't run for each typed
+    character, and immediately when the text is set by the program. The
+    searches of typed text can run in the background.
+
     Contains:
 
         Methods:
 
+            - _request_search: Emit searchRequested with the current text.
             - prepare_filter: Prepares the rapid search filter.
             - prepare_not_defined_filter: Prepares the rapid search filter for
               not defined values.
+            - prepare_not_defined_predicate: Prepares the rapid search
+              predicate for not defined values.
+            - prepare_predicate: Prepares the rapid search predicate.
+            - setText: Set the text and request the search at once.
+
+    Signals:
+        - searchRequested: Emits the text to search, and whether it was
+          typed by the user (the search may then run in the background).
     """
 
+    searchRequested = pyqtSignal(str, bool)
+
     def __init__(self, databrowser):
         """
         Initialize the RapidSearch widget.
@@ -60,31 +82,43 @@ class RapidSearch(QLineEdit):
             "*Not Defined* (missing values), "
             "dates as yyyy-mm-dd hh:mm:ss.fff"
         )
+        # Typed text is searched once the user pauses
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._request_search)
+        self.textEdited.connect(self._search_timer.start)
+        self.returnPressed.connect(self._request_search)
+
+    def _request_search(self, typed=True):
+        """
+        Emit searchRequested with the current text.
+
+        :param typed: (bool) True if the text was typed by the user, False
+         if it was set by the program.
+        """
+        self._search_timer.stop()
+        self.searchRequested.emit(self.text(), typed)
 
     @staticmethod
-    def prepare_filter(search, tags, scans):
+    def prepare_filter(search, tags, scans=None):
         """
         Create a filter for searching text across specified tags.
 
         :param search: (str) Search pattern to look for.
         :param tags: (list) List of tags to search within.
-        :param scans: (list) List of scans to restrict the search to.
+        :param scans: (list) List of scans to restrict the search to, or None
+                      to leave the filter unrestricted.
 
         :Returns (str) SQL-like filter expression for the search.
         """
-        conditions = []
-
-        for tag in tags:
+        predicate = RapidSearch.prepare_predicate(search, tags)
 
-            if tag != TAG_BRICKS:
-                conditions.append(f'({{{tag}}} LIKE "%{search}%")')
-
-        # Join all conditions with OR
-        tag_query = " OR ".join(conditions)
         # Add filename constraint
-        scans_str = str(scans).replace("'", '"')
-        query = f"({tag_query}) AND ({{{TAG_FILENAME}}} IN {scans_str})"
-        return query
+        if scans is not None:
+            predicate = And(predicate, ScanSet.of(scans).predicate())
+
+        return predicate.compile()
 
     def prepare_not_defined_filter(self, tags):
         """
@@ -94,18 +128,46 @@ class RapidSearch(QLineEdit):
 
         :Returns (str) QL-like filter expression for finding null values.
         """
-        conditions = []
+        # Any of the tags undefined, within the searched scans
+        return And(
+            RapidSearch.prepare_not_defined_predicate(tags),
+            ScanSet.of(
+                self.databrowser.table_data.scans_to_search
+            ).predicate(),
+        ).compile()
 
-        for tag in tags:
+    @staticmethod
+    def prepare_not_defined_predicate(tags):
+        """
+        Create the predicate of a search for undefined values.
 
-            if tag != TAG_BRICKS:
-                conditions.append(f"({{{tag}}} == null)")
+        :param tags: (list) List of tags to check for null values.
 
-        # Join all conditions with OR
-        query = " OR ".join(conditions)
-        # Add filename constraint
-        scans_str = str(self.databrowser.table_data.scans_to_search).replace(
-            "'", '"'
+        :Returns (Predicate) The predicate matching the scans with one of the
+                 tags (except the bricks) undefined.
+        """
+        return Or(*(IsNull(tag) for tag in tags if tag != TAG_BRICKS))
+
+    @staticmethod
+    def prepare_predicate(search, tags):
+        """
+        Create the predicate of a text search across specified tags.
+
+        :param search: (str) Search pattern to look for.
+        :param tags: (list) List of tags to search within.
+
+        :Returns (Predicate) The predicate matching the scans with a value of
+                 one of the tags (except the bricks) containing the pattern.
+        """
+        return Or(
+            *(Contains(tag, search) for tag in tags if tag != TAG_BRICKS)
         )
-        query = f"({query}) AND ({{{TAG_FILENAME}}} IN {scans_str})"
-        return f"({query})"
+
+    def setText(self, text):
+        """
+        Set the text and request the search at once.
+
+        :param text: (str) The new text.
+        """
+        super().setText(text)
+        self._request_search(False)
@@ -0,0 +1,206 @@
+"""
+Background execution of the searches of the data browser.
+
+This module provides the `SearchWorker` thread, which runs one search away
+from the GUI thread, and the `SearchRunner`, which starts the searches of a
+widget on workers and only delivers the result of the latest one, so that
+typing in a search bar never waits for the queries of outdated searches.
+"""
+
+##########################################################################
+# Populse_mia - Copyright (C) IRMaGe/CEA, 2018
+# Distributed under the terms of the CeCILL license, as published by
+# the CEA-CNRS-INRIA. Refer to the LICENSE file or to
+# http://www.cecill.info/licences/Licence_CeCILL_V2.1-en.html
+# for details.
+##########################################################################
+
+import logging
+
+# PyQt5 import
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+__all__ = ["SearchRunner", "SearchWorker"]
+
+logger = logging.getLogger(__name__)
+
+
+class SearchWorker(QThread):
+    """
+    Worker thread running a search in the background.
+
+    The search is a callable, called on the worker thread with a callable
+    returning True once the search is cancelled. It must not use the
+    widgets, and returns the matching scans. Its database sessions use the
+    connection of the worker thread (see DatabaseMIA._thread_storage), and
+    it should stop reading the database once cancelled. The result is sent
+    with the searchDone signal, received on the GUI thread, unless an
+    interruption was requested meanwhile. A search cancelled before the
+    worker runs isn't called.
+
+    Contains:
+
+        Methods:
+
+            - run: Run the search and send its result.
+
+    Signals:
+        - searchDone: Emits the id of the search, whether it succeeded and
+          its result (the exception raised if it failed).
+    """
+
+    searchDone = pyqtSignal(int, bool, object)
+
+    def __init__(self, search, search_id, parent=None):
+        """
+        Initialize the SearchWorker.
+
+        :param search: (Callable[[Callable[[], bool]], Any]) The search,
+         called with a callable telling whether it is cancelled.
+        :param search_id: (int) The id of the search, sent with the result
+         so that the results of outdated searches can be ignored.
+        :param parent: (QObject) The parent object. Defaults to None.
+        """
+        super().__init__(parent)
+        self.search = search
+        self.search_id = search_id
+
+    def run(self):
+        """
+        Run the search and emit its result, unless interrupted.
+
+        This method overrides the QThread run method.
+        """
+
+        # Cancelled before starting
+        if self.isInterruptionRequested():
+            return
+
+        try:
+            result = self.search(self.isInterruptionRequested)
+            succeeded = True
+
+        except Exception as error:
+            logger.exception("Exception in SearchWorker.run()")
+            result = error
+            succeeded = False
+
+        if not self.isInterruptionRequested():
+            self.searchDone.emit(self.search_id, succeeded, result)
+
+
+class SearchRunner(QObject):
+    """
+    Runner of the searches of a widget, keeping only the latest one.
+
+    Each search is run by a SearchWorker. Starting a search cancels the
+    previous one: its worker is asked to stop, and its result is dropped if
+    it still arrives. Only the result of the latest search is emitted, with
+    the searchFinished signal (or searchFailed), on the GUI thread.
+
+    The workers aren't waited for when cancelled, a query in progress
+    can't be interrupted, so they are kept until they finish. They don't
+    share the database session of the GUI thread, and a cancelled search
+    doesn't start new queries.
+
+    Contains:
+
+        Methods:
+
+            - _search_done: Deliver the result of a search, if it is the
+              latest.
+            - _worker_finished: Forget a finished worker.
+            - cancel: Cancel the search in progress.
+            - is_running: Return True if a search is in progress.
+            - start: Start a search, cancelling the previous one.
+            - wait: Wait for the workers to finish.
+
+    Signals:
+        - searchFailed: Emits the exception raised by the latest search.
+        - searchFinished: Emits the result of the latest search.
+    """
+
+    searchFailed = pyqtSignal(object)
+    searchFinished = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        """
+        Initialize the SearchRunner.
+
+        :param parent: (QObject) The parent object. Defaults to None.
+        """
+        super().__init__(parent)
+        # Id of the latest search, and the workers not finished yet
+        self._search_id = 0
+        self._worker = None
+        self._workers = set()
+
+    def _search_done(self, search_id, succeeded, result):
+        """
+        Deliver the result of a search, if it is the latest one.
+
+        :param search_id: (int) The id of the search.
+        :param succeeded: (bool) False if the search raised an exception.
+        :param result: (Any) The result of the search, or the exception.
+        """
+
+        if search_id != self._search_id:
+            return
+
+        self._worker = None
+
+        if succeeded:
+            self.searchFinished.emit(result)
+
+        else:
+            self.searchFailed.emit(result)
+
+    def _worker_finished(self, worker):
+        """
+        Forget a finished worker.
+
+        :param worker: (SearchWorker) The worker.
+        """
+        self._workers.discard(worker)
+        worker.deleteLater()
+
+    def cancel(self):
+        """
+        Cancel the search in progress, whose result won't be emitted.
+        """
+        self._search_id += 1
+
+        if self._worker is not None:
+            self._worker.requestInterruption()
+            self._worker = None
+
+    def is_running(self):
+        """
+        Return True if a search is in progress.
+
+        :Returns: (bool) True if the latest search hasn't finished yet.
+        """
+        return self._worker is not None
+
+    def start(self, search):
+        """
+        Start a search on a worker thread, cancelling the previous one.
+
+        :param search: (Callable[[Callable[[], bool]], Any]) The search, see
+         SearchWorker.
+        """
+        self.cancel()
+        worker = SearchWorker(search, self._search_id)
+        worker.searchDone.connect(self._search_done)
+        worker.finished.connect(lambda: self._worker_finished(worker))
+        self._workers.add(worker)
+        self._worker = worker
+        worker.start()
+
+    def wait(self):
+        """
+        Wait for the workers to finish, the cancelled ones included.
+        """
+
+        for worker in list(self._workers):
+            worker.wait()
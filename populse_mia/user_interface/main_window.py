@@ -14,7 +14,6 @@ Initialize the software appearance and defines interactions with the user.
 
 # isort: off
 
-import glob
 import logging
 import os
 import shutil
@@ -37,6 +36,7 @@ from PyQt5.QtWidgets import (
     QMainWindow,
     QMenu,
     QMessageBox,
+    QProgressDialog,
     QPushButton,
     QTabWidget,
     QVBoxLayout,
@@ -75,6 +75,7 @@ from populse_mia.user_interface.pop_ups import (
     PopUpSaveProjectAs,
     PopUpSeeAllProjects,
 )
+from populse_mia.utils import copy_file, copy_tree
 
 __all__ = ["MainWindow"]
 
@@ -1261,41 +1262,52 @@ class MainWindow(QMainWindow):
                     os.mkdir(downloaded_data_path)
                     os.mkdir(filters_path)
 
-                # Data files copied
+                # Data files copied (reflinked when the filesystem allows
+                # it, raw data optionally hard-linked)
                 if os.path.exists(os.path.join(old_folder_rel, "data")):
-
-                    for filename in glob.glob(
-                        os.path.join(old_folder, "data", "raw_data", "*")
-                    ):
-                        shutil.copy(
-                            filename, os.path.join(data_path, "raw_data")
-                        )
-
-                    shutil.copytree(
-                        os.path.join(old_folder, "data", "derived_data"),
-                        os.path.join(data_path, "derived_data"),
+                    hardlink_subdirs = (
+                        ["raw_data"]
+                        if self.exPopup.hardlink_raw_data.isChecked()
+                        else []
                     )
-
-                    for filename in glob.glob(
-                        os.path.join(
-                            old_folder, "data", "downloaded_data", "*"
+                    progress = QProgressDialog(
+                        "Copying the project data...", None, 0, 1000, self
+                    )
+                    progress.setWindowTitle("Save project as")
+                    progress.setWindowModality(Qt.WindowModal)
+                    progress.setMinimumDuration(500)
+
+                    def _show_progress(done, total, elapsed):
+                        """Show the copy progress and throughput."""
+                        progress.setValue(
+                            int(1000 * done / total) if total else 1000
                         )
-                    ):
-                        shutil.copy(
-                            filename,
-                            os.path.join(data_path, "downloaded_data"),
+                        progress.setLabelText(
+                            f"Copying the project data...\n"
+                            f"{done / 1e9:.2f} GB / {total / 1e9:.2f} GB "
+                            f"({done / 1e6 / max(elapsed, 1e-6):.0f} MB/s)"
+                        )
+                        QApplication.processEvents()
+
+                    try:
+                        copy_tree(
+                            os.path.join(old_folder, "data"),
+                            data_path,
+                            hardlink_subdirs=hardlink_subdirs,
+                            progress_callback=_show_progress,
                         )
 
-                if os.path.exists(os.path.join(old_folder_rel, "filters")):
+                    finally:
+                        progress.close()
 
-                    for filename in glob.glob(
-                        os.path.join(old_folder, "filters", "*")
-                    ):
-                        shutil.copy(filename, os.path.join(filters_path))
+                if os.path.exists(os.path.join(old_folder_rel, "filters")):
+                    copy_tree(
+                        os.path.join(old_folder, "filters"), filters_path
+                    )
 
                 # First we register the Database before committing the last
                 # pending modifications
-                shutil.copy(
+                copy_file(
                     os.path.join(old_folder, "database", "mia.db"),
                     os.path.join(
                         old_folder, "database", "mia_before_commit.db"
@@ -1311,7 +1323,7 @@ class MainWindow(QMainWindow):
                 # We copy the Database with all the modifications committed in
                 # the new project
                 os.mkdir(database_path)
-                shutil.copy(
+                copy_file(
                     os.path.join(old_folder, "database", "mia.db"),
                     database_path,
                 )
@@ -1335,7 +1347,7 @@ class MainWindow(QMainWindow):
                     os.remove(os.path.join(old_folder, "database", "mia.db"))
                     # We reput the Database without the last modifications
                     # in the old project
-                    shutil.copy(
+                    copy_file(
                         os.path.join(
                             old_folder, "database", "mia_before_commit.db"
                         ),
@@ -10,8 +10,6 @@ Module that handles pipeline iteration.
 # for details.
 ##########################################################################
 
-import ast
-import json
 import os
 from functools import partial
 
@@ -33,6 +31,7 @@ from PyQt5.QtWidgets import (
 
 # Populse_mia import
 from populse_mia.data_manager import COLLECTION_CURRENT, TAG_FILENAME
+from populse_mia.data_manager.scan_set import ScanSet
 from populse_mia.software_properties import Config
 from populse_mia.user_interface.pipeline_manager.process_mia import ProcessMIA
 from populse_mia.user_interface.pop_ups import (
@@ -63,10 +62,11 @@ class IterationTable(QWidget):
               scans have been updated.
             - fill_values: Fill values_list depending on the visualized tags.
             - filter_values: Select the tag values used for the iteration.
-            - format_filter_value: Convert a value into a JSON-formatted
-              string.
+            - partition_scans: Partition scans by the value of a tag.
             - refresh_layout: Update the layout of the widget.
             - remove_tag: Remove a tag to visualize in the iteration table.
+            - scan_documents: Return the documents of the scans, read in one
+              query.
             - select_iteration_tag: Open a pop-up to let the user select on
               which tag to iterate.
             - select_visualized_tag: Open a pop-up to let the user select
@@ -82,7 +82,7 @@ class IterationTable(QWidget):
           been updated or if the iteration is toggled off.
     """
 
-    iteration_table_updated = pyqtSignal(list, list)
+    iteration_table_updated = pyqtSignal(object, object)
 
     def __init__(self, project, scan_list=None, main_window=None):
         """
@@ -311,29 +311,29 @@ class IterationTable(QWidget):
             self.combo_box.addItems(tag_values_list)
             self.update_table()
 
-    def format_filter_value(self, value):
+    @staticmethod
+    def partition_scans(documents, tag):
         """
-        Convert a value into a JSON-formatted string.
+        Partition scans by the value of a tag.
 
-        If ``value`` is a string, this method first attempts to interpret it as
-        a Python literal (for example a list, dict, number, or boolean) using
-        ``ast.literal_eval()``. If parsing fails, the original string is
-        preserved.
+        The scans are grouped by the string form of their value, as shown
+        in the tag values of the iteration (see update_selected_tag).
 
-        :param value: (Any) The value to serialize.
+        :param documents: (list[dict]) The documents of the scans, with the
+         tag (see scan_documents).
+        :param tag: (str) The tag name.
 
-        :Returns: (str) The JSON representation of the resulting value.
+        :Returns: (dict[str, list[str]]) The scans, in the order of the
+         documents, for each tag value.
         """
+        partition = {}
 
-        if isinstance(value, str):
-
-            try:
-                value = ast.literal_eval(value)
-
-            except (ValueError, SyntaxError):
-                pass
+        for document in documents:
+            partition.setdefault(str(document.get(tag)), []).append(
+                document[TAG_FILENAME]
+            )
 
-        return json.dumps(value)
+        return partition
 
     def refresh_layout(self):
         """Update the layout of the widget.
@@ -375,6 +375,29 @@ class IterationTable(QWidget):
             self.refresh_layout()
             self.update_table()
 
+    def scan_documents(self, database_data, tags):
+        """
+        Return the documents of the scans of scan_list, read in one query.
+
+        :param database_data: The data interface of the project database.
+        :param tags: (list[str]) The tags to read.
+
+        :Returns: (list[dict]) The documents of the scans existing in the
+         database, in the order of scan_list, with the filename and the
+         tags.
+        """
+        documents = {
+            document[TAG_FILENAME]: document
+            for document in database_data.get_document(
+                COLLECTION_CURRENT, fields=[TAG_FILENAME, *tags]
+            )
+        }
+        return [
+            documents[scan]
+            for scan in ScanSet.of(self.scan_list)
+            if scan in documents
+        ]
+
     def select_iteration_tag(self):
         """Open a dialog to let the user select which tag to iterate over."""
 
@@ -494,73 +517,52 @@ class IterationTable(QWidget):
 
             self.iteration_table.setColumnCount(len(self.push_buttons))
 
+            field_names = set(
+                database_data.get_field_names(COLLECTION_CURRENT)
+            )
+            # FIXME should not use GUI text values !!
+            tag_names = [
+                button.text().replace("&", "") for button in self.push_buttons
+            ]
+
             # Set up table headers
-            for idx, button in enumerate(self.push_buttons):
-                # FIXME should not use GUI text values !!
-                header_name = button.text().replace("&", "")
+            for idx, header_name in enumerate(tag_names):
 
                 # Skip if tag doesn't exist in project
-                if header_name not in database_data.get_field_names(
-                    COLLECTION_CURRENT
-                ):
+                if header_name not in field_names:
                     print(f"{header_name} not in the project's tags")
                     return
 
                 item = QTableWidgetItem(header_name)
                 self.iteration_table.setHorizontalHeaderItem(idx, item)
 
-            # Get current filter value
-            current_filter = self.combo_box.currentText().replace("&", "")
-            # Create filter query
-            filter_query = (
-                f"{{{iterated_tag}}} == "
-                f"{self.format_filter_value(current_filter)}"
-            )
-            # Get filtered scans
-            filtered_scans = database_data.filter_documents(
-                COLLECTION_CURRENT, filter_query
+            # Partition the selected scans by iterated tag value
+            documents = self.scan_documents(
+                database_data, [iterated_tag, *tag_names]
             )
-            filtered_filenames = [
-                document[TAG_FILENAME] for document in filtered_scans
-            ]
-            # Get intersection with selected scans
-            self.iteration_scans = list(
-                set(filtered_filenames).intersection(self.scan_list)
-            )
-            self.iteration_table.setRowCount(len(self.iteration_scans))
-
-            # Fill table cells
-            for row, scan_name in enumerate(self.iteration_scans):
-
-                for col, button in enumerate(self.push_buttons):
-                    tag_name = button.text().replace("&", "")
-                    value = database_data.get_value(
-                        collection_name=COLLECTION_CURRENT,
-                        primary_key=scan_name,
-                        field=tag_name,
-                    )
-                    item = QTableWidgetItem(str(value))
-                    self.iteration_table.setItem(row, col, item)
-
-            # Get all iterations scans
-            all_iterations_scans = []
-
-            for tag_value in current_editor.tag_values_list:
-                filter_query = (
-                    f"{{{iterated_tag}}} == "
-                    f"{self.format_filter_value(tag_value)}"
-                )
-                filtered_scans = database_data.filter_documents(
-                    COLLECTION_CURRENT, filter_query
-                )
-                filtered_filenames = [
-                    document[TAG_FILENAME] for document in filtered_scans
-                ]
-                intersection = list(
-                    set(filtered_filenames).intersection(self.scan_list)
-                )
-                all_iterations_scans.append(intersection)
 
+        partition = self.partition_scans(documents, iterated_tag)
+        # Get current filter value
+        current_filter = self.combo_box.currentText().replace("&", "")
+        self.iteration_scans = ScanSet.of(partition.get(current_filter))
+        self.iteration_table.setRowCount(len(self.iteration_scans))
+        documents = {
+            document[TAG_FILENAME]: document for document in documents
+        }
+
+        # Fill table cells
+        for row, scan_name in enumerate(self.iteration_scans):
+            document = documents[scan_name]
+
+            for col, tag_name in enumerate(tag_names):
+                item = QTableWidgetItem(str(document.get(tag_name)))
+                self.iteration_table.setItem(row, col, item)
+
+        # Get all iterations scans
+        all_iterations_scans = [
+            ScanSet.of(partition.get(tag_value))
+            for tag_value in current_editor.tag_values_list
+        ]
         self.all_iterations_scans = all_iterations_scans
         # Emit signal to update pipeline manager
         self.iteration_table_updated.emit(
@@ -580,32 +582,23 @@ class IterationTable(QWidget):
         """
 
         with self.project.database.data() as database_data:
-            # Get intersection of available scans and loaded scan list
-            available_scans = database_data.get_document_names(
-                COLLECTION_CURRENT
-            )
 
             if not self.scan_list:
-                self.scan_list = available_scans
-
-            scans_to_process = set(available_scans).intersection(
-                self.scan_list
-            )
-            # Collect unique tag values from the scans
-            tag_values = set()
-
-            for scan_name in scans_to_process:
-                tag_value = database_data.get_value(
-                    collection_name=COLLECTION_CURRENT,
-                    primary_key=scan_name,
-                    field=selected_tag,
+                self.scan_list = database_data.get_document_names(
+                    COLLECTION_CURRENT
                 )
 
-                # Skip None values
-                if tag_value is not None:
-                    tag_values.add(str(tag_value))
+            # Documents of the loaded scans available in the database
+            documents = self.scan_documents(database_data, [selected_tag])
 
-        tag_values_list = sorted(list(tag_values))
+        # Collect unique tag values from the scans, skipping None values
+        tag_values_list = sorted(
+            {
+                str(tag_value)
+                for document in documents
+                if (tag_value := document.get(selected_tag)) is not None
+            }
+        )
         # Get current editor and update its tag value lists
         current_editor = self.current_editor
         current_editor.tag_values_list = tag_values_list
@@ -164,15 +164,13 @@ class AttributesFilter(PlugFilter):
                 # Collect scan names from the current filter
                 scan_names = self.table_data.get_current_filter()
 
-            for scan_name in scan_names:
+            # Read the values of all the scans at once
+            values = database_data.get_values(
+                COLLECTION_CURRENT, list(scan_names), field_names
+            )
 
-                for field in field_names:
-                    value = database_data.get_value(
-                        collection_name=COLLECTION_CURRENT,
-                        primary_key=scan_name,
-                        field=field,
-                    )
-                    attributes.setdefault(field, []).append(value)
+        for field, field_values in zip(field_names, zip(*values)):
+            attributes[field] = list(field_values)
 
         self.attributes_selected.emit(attributes)
 
@@ -647,6 +645,7 @@ class FilterWidget(QWidget):
           project-relative path.
         - ok_clicked: Applies the configured filter to the process and closes
           the widget.
+        - project_root: Returns the resolved project root.
         - reset_search_bar: Resets the search interface to its default state,
           clearing all filters.
         - search_str: Filters and updates the displayed scans based on the
@@ -685,8 +684,9 @@ class FilterWidget(QWidget):
             self.scan_list = []
 
         else:
+            project_root = self.project_root()
             self.scan_list = [
-                self.normalize_scan_path(scan) for scan in inputs
+                self.normalize_scan_path(scan, project_root) for scan in inputs
             ]
 
         # Initialize table data browser with filtered scans
@@ -773,7 +773,7 @@ class FilterWidget(QWidget):
         self.setMinimumWidth(round(screen_resolution.width() * 0.6))
         self.setMinimumHeight(round(screen_resolution.height() * 0.8))
 
-    def normalize_scan_path(self, scan_path):
+    def normalize_scan_path(self, scan_path, project_root=None):
         """
         Normalize a scan path to a logical project-relative path.
 
@@ -787,6 +787,8 @@ class FilterWidget(QWidget):
             3. Absolute path string (last resort).
 
         :param scan_path: File path to normalize (absolute or relative).
+        :param project_root: The resolved project root (see project_root),
+         to normalize many paths without resolving it for each one.
 
         :Returns: Normalized path string, relative to project root when
          possible.
@@ -802,17 +804,9 @@ class FilterWidget(QWidget):
             robustly. Does not require paths to exist on disk.
         """
         PROJECT_DATA_DIRNAME = "data"  # project-level semantic root
-        # Normalize project root
-        project_root = Path(self.project.folder)
 
-        if not project_root.is_absolute():
-            project_root = Path.cwd() / project_root
-
-        try:
-            project_root = project_root.resolve(strict=False)
-
-        except Exception:
-            project_root = project_root.absolute()
+        if project_root is None:
+            project_root = self.project_root()
 
         # Normalize scan path
         scan = Path(scan_path)
@@ -876,6 +870,24 @@ class FilterWidget(QWidget):
         self.process.filter = filter_object
         self.close()
 
+    def project_root(self):
+        """
+        Return the resolved project root, for normalize_scan_path.
+
+        :Returns: (Path) The absolute project folder, with symlinks resolved
+         when possible.
+        """
+        project_root = Path(self.project.folder)
+
+        if not project_root.is_absolute():
+            project_root = Path.cwd() / project_root
+
+        try:
+            return project_root.resolve(strict=False)
+
+        except Exception:
+            return project_root.absolute()
+
     def reset_search_bar(self):
         """
         Reset search interface to default state.
@@ -104,6 +104,7 @@ from populse_mia.data_manager import (
     TYPE_TXT,
     TYPE_UNKNOWN,
 )
+from populse_mia.data_manager.scan_set import ScanSet
 from populse_mia.software_properties import Config
 from populse_mia.user_interface.pipeline_manager.iteration_table import (
     IterationTable,
@@ -1704,7 +1705,7 @@ class PipelineManagerTab(QWidget):
                each brick.
             2. Cleans up orphaned non-existing files from the project.
             3. Clears the brick and node lists.
-            4. Updates the data browser table display.
+            4. Applies the database changes to the data browser table.
 
         Note:
             The table update is performed asynchronously using QtThreadCall
@@ -1723,7 +1724,7 @@ class PipelineManagerTab(QWidget):
         self.node_list.clear()
         # Update UI asynchronously
         QtThreadCall().push(
-            self.main_window.data_browser.table_data.update_table
+            self.main_window.data_browser.table_data.apply_database_changes
         )
 
     def complete_pipeline_parameters(self, pipeline=None):
@@ -2984,7 +2985,7 @@ class PipelineManagerTab(QWidget):
         self.project.cleanup_orphan_nonexisting_files(failed)
         self.project.cleanup_orphan_history()
         QtThreadCall().push(
-            self.main_window.data_browser.table_data.update_table
+            self.main_window.data_browser.table_data.apply_database_changes
         )
         self.project.saveModifications()
 
@@ -3930,11 +3931,9 @@ class PipelineManagerTab(QWidget):
 
             # Update scan lists for iteration mode
             self.iteration_table_scans_list = all_iterations_list
-            self.pipelineEditorTabs.scan_list = [
-                scan
-                for iteration_list in all_iterations_list
-                for scan in iteration_list
-            ]
+            self.pipelineEditorTabs.scan_list = list(
+                ScanSet().union(*all_iterations_list)
+            )
 
         else:
 
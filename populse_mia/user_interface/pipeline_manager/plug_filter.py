@@ -57,6 +57,7 @@ from populse_mia.data_manager import (
     NOT_DEFINED_VALUE,
     TAG_FILENAME,
 )
+from populse_mia.data_manager.scan_set import ScanSet
 from populse_mia.software_properties import Config
 from populse_mia.user_interface.data_browser.advanced_search import (
     AdvancedSearch,
@@ -173,18 +174,19 @@ class PlugFilter(QWidget):
                     )
                     brick_outputs.update(outputs)
 
-            # Filter scans or use all current collection documents
+            # Filter scans or use all current collection documents, shared
+            # with the table and the advanced search
             if scans_list:
-                self.scans_list = [
+                self.scans_list = ScanSet(
                     scan.replace(self.project.folder, "").lstrip("\\/")
                     for scan in scans_list
                     if scan.replace(self.project.folder, "").lstrip("\\/")
                     not in brick_outputs
-                ]
+                )
 
             else:
-                self.scans_list = database_data.get_document_names(
-                    COLLECTION_CURRENT
+                self.scans_list = ScanSet(
+                    database_data.get_document_names(COLLECTION_CURRENT)
                 )
 
         # Configure window
@@ -315,16 +317,16 @@ class PlugFilter(QWidget):
                     self.prepare_not_defined_filter(shown_tags)
                     if str_search == NOT_DEFINED_VALUE
                     else self.rapid_search.prepare_filter(
-                        str_search, shown_tags, self.table_data.scans_to_search
+                        str_search, shown_tags
                     )
                 )
-                scans = database_data.filter_documents(
-                    COLLECTION_CURRENT, filter_func
+                # Cached for the revision of the database
+                filtered_scans = database_data.filter_document_names(
+                    COLLECTION_CURRENT,
+                    filter_func,
+                    self.table_data.scans_to_search,
                 )
 
-            # Extract filenames from filtered scans
-            filtered_scans = [scan[TAG_FILENAME] for scan in scans]
-
         # Update state with filtered results
         self.table_data.scans_to_visualize = filtered_scans
         self.advanced_search.scans_list = filtered_scans
@@ -340,57 +342,33 @@ class PlugFilter(QWidget):
         are converted to absolute paths within the project folder.
 
         :Emits plug_value_changed: Signal with list of extracted values.
-
-        Contains:
-
-            Inner functions:
-
-                - _get_scan_value: Retrieve and process a single scan value
-                  from the database.
         """
-
-        def _get_scan_value(database_data, scan_name, tag_name):
-            """
-            Retrieve and process a single scan value from the database.
-
-            :param database_data: Database connection object.
-            :param scan_name: Primary key identifying the scan.
-            :param tag_name: Field name to retrieve.
-
-            :Returns: The field value, with absolute path conversion for
-             filename tags.
-            """
-            value = database_data.get_value(
-                collection_name=COLLECTION_CURRENT,
-                primary_key=scan_name,
-                field=tag_name,
-            )
-
-            if tag_name == TAG_FILENAME:
-                value = os.path.abspath(
-                    os.path.join(self.project.folder, value)
-                )
-
-            return value
-
         tag_name = self.push_button_tag_filter.text().lstrip("&")
 
-        with self.project.database.data() as database_data:
+        # Determine which scans to process
+        if selected_points := self.table_data.selectedIndexes():
+            scan_names = [
+                self.table_data.item(point.row(), 0).text()
+                for point in selected_points
+            ]
 
-            # Determine which scans to process
-            if selected_points := self.table_data.selectedIndexes():
-                scan_names = [
-                    self.table_data.item(point.row(), 0).text()
-                    for point in selected_points
-                ]
+        else:
+            scan_names = self.table_data.get_current_filter()
 
-            else:
-                scan_names = self.table_data.get_current_filter()
+        # Extract the values of all the scans at once
+        with self.project.database.data() as database_data:
+            result_names = [
+                value
+                for (value,) in database_data.get_values(
+                    COLLECTION_CURRENT, scan_names, [tag_name]
+                )
+            ]
 
-            # Extract values for each scan
+        if tag_name == TAG_FILENAME:
+            project_folder = os.path.abspath(self.project.folder)
             result_names = [
-                _get_scan_value(database_data, scan_name, tag_name)
-                for scan_name in scan_names
+                os.path.normpath(os.path.join(project_folder, value))
+                for value in result_names
             ]
 
         self.plug_value_changed.emit(result_names)
@@ -15,7 +15,6 @@ Module that defines all the pop-ups used across the Mia software.
 import argon2
 import ast
 import glob
-import hashlib
 import logging
 import os
 import platform
@@ -118,7 +117,9 @@ from populse_mia.data_manager.project import Project
 from populse_mia.software_properties import Config
 from populse_mia.utils import (
     check_value_type,
+    copy_files,
     message_already_exists,
+    remove_files,
     set_projects_directory_as_default,
     verCmp,
 )
@@ -574,6 +575,8 @@ class PopUpAddPath(QDialog):
             }
 
         self.project.unsavedModifications = True
+        # Documents to add, as (source path, relative path, type)
+        to_add = []
 
         for path, path_type in zip(path_list, path_type_list):
             filename = os.path.basename(path)
@@ -605,55 +608,93 @@ class PopUpAddPath(QDialog):
                 self.msg.show()
                 continue
 
-            # Prepare history tracking
-            history_maker = ["add_scans"]
-            values_added = []
-            # Copy file to project directory
-            rel_path = os.path.join("data", "downloaded_data", filename)
-            copy_path = os.path.join(self.project.folder, rel_path)
-            shutil.copy(path, copy_path)
+            # Two documents with the same name in one batch would be
+            # copied to the same place
+            doc_in_db.add(filename)
+            to_add.append(
+                (
+                    path,
+                    os.path.join("data", "downloaded_data", filename),
+                    path_type,
+                )
+            )
 
-            # Compute file checksum
-            with open(path, "rb") as scan_file:
-                checksum = hashlib.md5(scan_file.read()).hexdigest()
+        if to_add:
+            # Copy the files into the project directory, computing their
+            # checksum in the same pass, several files at a time
+            copies = [
+                (path, os.path.join(self.project.folder, rel_path))
+                for path, rel_path, _ in to_add
+            ]
 
-            # Add document to database
-            with self.project.database.data(write=True) as database_data:
+            try:
+                checksums = copy_files(copies, checksum=True)
+
+            except OSError as error:
+                logger.warning("Failed to copy the added paths: %s", error)
 
-                for collection in (COLLECTION_INITIAL, COLLECTION_CURRENT):
-                    database_data.add_document(collection, rel_path)
-                    database_data.set_value(
-                        collection_name=collection,
-                        primary_key=rel_path,
-                        values_dict={TAG_TYPE: path_type},
+                # Nothing is registered, don't leave the copies behind
+                try:
+                    remove_files([dst for _, dst in copies])
+
+                except OSError as remove_error:
+                    logger.warning(
+                        "Failed to remove the copied paths: %s", remove_error
                     )
-                    database_data.set_value(
-                        collection_name=collection,
-                        primary_key=rel_path,
-                        values_dict={TAG_CHECKSUM: checksum},
+
+                self.msg = QMessageBox()
+                self.msg.setIcon(QMessageBox.Warning)
+                self.msg.setText("- Copy failed! -")
+                self.msg.setInformativeText(
+                    f"The document(s) could not be copied into the "
+                    f"project:\n{error}\nNo document was added."
+                )
+                self.msg.setWindowTitle("Warning: copy failed!")
+                self.msg.setStandardButtons(QMessageBox.Ok)
+                self.msg.buttonClicked.connect(self.msg.close)
+                self.msg.show()
+                return
+
+            # Add all the documents to the database in one transaction
+            values_added = []
+
+            with self.project.database.data(write=True) as database_data:
+
+                for (_, rel_path, path_type), checksum in zip(
+                    to_add, checksums
+                ):
+
+                    for collection in (COLLECTION_INITIAL, COLLECTION_CURRENT):
+                        database_data.add_document(collection, rel_path)
+                        database_data.set_value(
+                            collection_name=collection,
+                            primary_key=rel_path,
+                            values_dict={
+                                TAG_TYPE: path_type,
+                                TAG_CHECKSUM: checksum,
+                            },
+                        )
+
+                    values_added.extend(
+                        [
+                            [rel_path, TAG_TYPE, path_type, path_type],
+                            [rel_path, TAG_CHECKSUM, checksum, checksum],
+                        ]
                     )
 
-            values_added.extend(
-                [
-                    [rel_path, TAG_TYPE, path_type, path_type],
-                    [rel_path, TAG_CHECKSUM, checksum, checksum],
-                ]
-            )
+                scans = database_data.get_document_names(COLLECTION_CURRENT)
+
             # Update history
-            history_maker.extend([[rel_path], values_added])
-            self.project.undos.append(history_maker)
+            rel_paths = [rel_path for _, rel_path, _ in to_add]
+            self.project.undos.append(["add_scans", rel_paths, values_added])
             self.project.redos.clear()
-
             # Update data browser
-            with self.project.database.data() as database_data:
-                scans = database_data.get_document_names(COLLECTION_CURRENT)
-
             table_data = self.databrowser.table_data
             table_data.scans_to_visualize = scans
             table_data.scans_to_search = scans
             table_data.add_columns()
             table_data.fill_headers()
-            table_data.add_rows([rel_path])
+            table_data.add_rows(rel_paths)
 
         self.databrowser.reset_search_bar()
         self.databrowser.frame_advanced_search.setHidden(True)
@@ -3520,6 +3561,13 @@ class PopUpPreferences(QDialog):
         :rtype: bool
         """
         config.setAutoSave(self.save_checkbox.isChecked())
+
+        # The data browser caches the auto-save setting
+        if hasattr(self.main_window, "data_browser"):
+            self.main_window.data_browser.table_data.auto_save = (
+                self.save_checkbox.isChecked()
+            )
+
         config.set_radioView(self.radioView_checkbox.isChecked())
         config.setControlV1(self.control_checkbox.isChecked())
         config.set_max_thumbnails(
@@ -5255,6 +5303,15 @@ class PopUpSaveProjectAs(QDialog):
         self.h_box_text = QHBoxLayout()
         self.h_box_text.addWidget(self.new_project_label)
         self.h_box_text.addWidget(self.new_project)
+        # Opt-in hard links for raw data, which are never modified
+        self.hardlink_raw_data = QCheckBox(
+            "Share raw data with the original project (hard links)"
+        )
+        self.hardlink_raw_data.setToolTip(
+            "Raw data files are linked instead of copied, which is "
+            "instantaneous and saves disk space.\nRaw data must then never "
+            "be modified in place, in either project."
+        )
         self.h_box_bottom = QHBoxLayout()
         self.h_box_bottom.addStretch(1)
         # Save button
@@ -5272,6 +5329,7 @@ class PopUpSaveProjectAs(QDialog):
         self.final_layout.addWidget(QLabel("Projects list:"))
         self.final_layout.addLayout(self.final)
         self.final_layout.addLayout(self.h_box_text)
+        self.final_layout.addWidget(self.hardlink_raw_data)
         self.final_layout.addLayout(self.h_box_bottom)
         self.setLayout(self.final_layout)
 
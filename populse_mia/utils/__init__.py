@@ -9,6 +9,13 @@ Utilities and tools used across Mia
 # http://www.cecill.info/licences/Licence_CeCILL_V2.1-en.html
 # for details.
 ###############################################################################
+from .file_copy import (  # noqa: F401
+    copy_file,
+    copy_files,
+    copy_tree,
+    reflink,
+    remove_files,
+)
 from .utils import (  # noqa: F401
     PackagesInstall,
     check_python_version,
@@ -0,0 +1,599 @@
+"""
+Module providing fast file copy helpers used when documents are brought
+into a Mia project or when a whole project is duplicated.
+
+The helpers try the cheapest strategy available on the platform:
+
+- A hard link, only when explicitly requested for data that are never
+  modified afterwards (raw data).
+- A reflink (copy-on-write clone, ``FICLONE``) on filesystems that support
+  it (Btrfs, XFS, APFS-like setups exposed through Linux, ...).
+- ``os.copy_file_range`` when no checksum is requested, so that the data
+  never travels through user space. Large files are split into ranges
+  copied concurrently.
+- A chunked read/write loop that feeds the MD5 digest with the very bytes
+  being copied, so that copying and hashing cost a single read of the
+  source.
+
+The files of the documents removed from a project are deleted concurrently
+with :func:`remove_files`.
+"""
+
+##########################################################################
+# Populse_mia - Copyright (C) IRMaGe/CEA, 2018
+# Distributed under the terms of the CeCILL license, as published by
+# the CEA-CNRS-INRIA. Refer to the LICENSE file or to
+# http://www.cecill.info/licences/Licence_CeCILL_V2.1-en.html
+# for details.
+##########################################################################
+
+import hashlib
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import fcntl
+
+except ImportError:  # Windows
+    fcntl = None
+
+__all__ = [
+    "copy_file",
+    "copy_files",
+    "copy_tree",
+    "reflink",
+    "remove_files",
+]
+
+logger = logging.getLogger(__name__)
+
+#: ioctl request number used to clone a file on Linux (``FICLONE``).
+FICLONE = 0x40049409
+
+#: Size of the chunks read from the source file when copying and hashing.
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+#: Default number of files copied concurrently.
+DEFAULT_COPY_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+
+#: Files at least this large are split into ranges copied concurrently by
+#: :func:`copy_tree`.
+PARALLEL_CHUNK_THRESHOLD = 256 * 1024 * 1024
+
+#: Size of the ranges of a large file copied concurrently by
+#: :func:`copy_tree`.
+PARALLEL_CHUNK_SIZE = 64 * 1024 * 1024
+
+
+def _copy_range(src, dst, offset, length, chunk_size):
+    """
+    Copy a byte range of a file into the same range of another file.
+
+    The destination file must already exist (and is usually preallocated to
+    the size of the source), so that several ranges of the same file can be
+    copied concurrently.
+
+    :param src: Path of the source file.
+    :type src: str
+    :param dst: Path of the destination file.
+    :type dst: str
+    :param offset: Offset of the first byte of the range.
+    :type offset: int
+    :param length: Length of the range, in bytes.
+    :type length: int
+    :param chunk_size: Size of the chunks copied at once.
+    :type chunk_size: int
+
+    :returns: None (no file completed) and the number of bytes copied, as
+     :func:`_link_or_copy` does.
+    :rtype: tuple[None, int]
+    """
+    end = offset + length
+
+    with open(src, "rb") as src_file, open(dst, "r+b") as dst_file:
+        src_fd, dst_fd = src_file.fileno(), dst_file.fileno()
+        pos = offset
+
+        if hasattr(os, "copy_file_range"):
+
+            try:
+
+                while pos < end:
+                    copied = os.copy_file_range(
+                        src_fd, dst_fd, min(chunk_size, end - pos), pos, pos
+                    )
+
+                    if copied == 0:
+                        break
+
+                    pos += copied
+
+            except OSError:
+                # Unsupported on this filesystem pair: pread/pwrite below
+                pass
+
+        while pos < end:
+            chunk = os.pread(src_fd, min(chunk_size, end - pos), pos)
+
+            if not chunk:
+                break
+
+            os.pwrite(dst_fd, chunk, pos)
+            pos += len(chunk)
+
+    return None, length
+
+
+def _link_or_copy(src, dst, hardlink, chunk_size):
+    """
+    Duplicate a file with the cheapest strategy allowed.
+
+    :param src: Path of the source file.
+    :type src: str
+    :param dst: Path of the destination file (must not exist).
+    :type dst: str
+    :param hardlink: If True, try a hard link first.
+    :type hardlink: bool
+    :param chunk_size: Size of the chunks read from the source file.
+    :type chunk_size: int
+
+    :returns: The strategy used ("hardlinked", "reflinked" or "copied") and
+     the size of the file.
+    :rtype: tuple[str, int]
+    """
+    size = os.path.getsize(src)
+
+    if hardlink:
+
+        try:
+            os.link(src, dst)
+
+        except OSError:
+            # Cross-device link or unsupported filesystem
+            pass
+
+        else:
+            return "hardlinked", size
+
+    if reflink(src, dst):
+        shutil.copymode(src, dst)
+        return "reflinked", size
+
+    _plain_copy(src, dst, False, chunk_size)
+    return "copied", size
+
+
+def _md5_of_file(path, chunk_size=COPY_CHUNK_SIZE):
+    """
+    Compute the MD5 digest of a file by reading it in chunks.
+
+    :param path: Path of the file to hash.
+    :type path: str
+    :param chunk_size: Size of the chunks read from the file.
+    :type chunk_size: int
+
+    :returns: The hexadecimal MD5 digest of the file.
+    :rtype: str
+    """
+    md5 = hashlib.md5()
+
+    with open(path, "rb") as src_file:
+
+        while chunk := src_file.read(chunk_size):
+            md5.update(chunk)
+
+    return md5.hexdigest()
+
+
+def _plain_copy(src, dst, checksum, chunk_size):
+    """
+    Copy a file without trying a reflink (see :func:`copy_file`).
+
+    :param src: Path of the source file.
+    :type src: str
+    :param dst: Path of the destination file.
+    :type dst: str
+    :param checksum: If True, also compute the MD5 checksum of the file.
+    :type checksum: bool
+    :param chunk_size: Size of the chunks read from the source file.
+    :type chunk_size: int
+
+    :returns: The hexadecimal MD5 digest of the file if `checksum` is True,
+     otherwise None.
+    :rtype: str | None
+    """
+    md5 = hashlib.md5() if checksum else None
+
+    with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+
+        if md5 is None and hasattr(os, "copy_file_range"):
+
+            try:
+                size = os.fstat(src_file.fileno()).st_size
+                offset = 0
+
+                while offset < size:
+                    copied = os.copy_file_range(
+                        src_file.fileno(),
+                        dst_file.fileno(),
+                        min(chunk_size, size - offset),
+                        offset,
+                        offset,
+                    )
+
+                    if copied == 0:
+                        break
+
+                    offset += copied
+
+            except OSError:
+                # Unsupported on this filesystem pair: plain copy below
+                dst_file.seek(0)
+                dst_file.truncate()
+
+            else:
+                shutil.copymode(src, dst)
+                return None
+
+        while chunk := src_file.read(chunk_size):
+            dst_file.write(chunk)
+
+            if md5 is not None:
+                md5.update(chunk)
+
+    shutil.copymode(src, dst)
+    return md5.hexdigest() if md5 is not None else None
+
+
+def reflink(src, dst):
+    """
+    Try to clone ``src`` into ``dst`` using a copy-on-write reflink.
+
+    On success, ``dst`` shares its data blocks with ``src`` and the copy is
+    nearly instantaneous whatever the file size. On failure (unsupported
+    platform or filesystem, cross-device copy, ...), ``dst`` is left
+    untouched.
+
+    :param src: Path of the source file.
+    :type src: str
+    :param dst: Path of the destination file (must not exist).
+    :type dst: str
+
+    :returns: True if the reflink was created, False otherwise.
+    :rtype: bool
+    """
+
+    if fcntl is None or not hasattr(fcntl, "ioctl"):
+        return False
+
+    try:
+
+        with open(src, "rb") as src_file:
+
+            with open(dst, "xb") as dst_file:
+
+                try:
+                    fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+
+                except OSError:
+                    cloned = False
+
+                else:
+                    cloned = True
+
+    except OSError:
+        return False
+
+    if not cloned:
+
+        try:
+            os.remove(dst)
+
+        except OSError:
+            pass
+
+    return cloned
+
+
+def copy_file(src, dst, checksum=False, chunk_size=COPY_CHUNK_SIZE):
+    """
+    Copy a file, optionally computing its MD5 checksum in the same pass.
+
+    Strategies are tried in this order:
+
+        - reflink (the checksum, if requested, then needs one read of the
+          source since no data were copied);
+        - ``os.copy_file_range`` if no checksum is requested;
+        - chunked read/write loop, hashing each chunk as it is written.
+
+    The file permission bits are copied as ``shutil.copy`` does.
+
+    :param src: Path of the source file.
+    :type src: str
+    :param dst: Path of the destination file, or of an existing directory in
+     which the file is copied under its own name.
+    :type dst: str
+    :param checksum: If True, also compute the MD5 checksum of the file.
+    :type checksum: bool
+    :param chunk_size: Size of the chunks read from the source file.
+    :type chunk_size: int
+
+    :returns: The hexadecimal MD5 digest of the file if `checksum` is True,
+     otherwise None.
+    :rtype: str | None
+    """
+
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+
+    if os.path.exists(dst):
+        os.remove(dst)
+
+    if reflink(src, dst):
+        shutil.copymode(src, dst)
+        return _md5_of_file(src, chunk_size) if checksum else None
+
+    return _plain_copy(src, dst, checksum, chunk_size)
+
+
+def copy_files(
+    pairs, checksum=False, max_workers=None, chunk_size=COPY_CHUNK_SIZE
+):
+    """
+    Copy several files concurrently with :func:`copy_file`.
+
+    File copies are mostly I/O bound (and ``hashlib`` releases the GIL on
+    large buffers), so a thread pool keeps several disk requests in flight.
+
+    :param pairs: Sequence of (source, destination) paths.
+    :type pairs: list[tuple[str, str]]
+    :param checksum: If True, compute the MD5 checksum of each file.
+    :type checksum: bool
+    :param max_workers: Number of files copied concurrently (defaults to
+     DEFAULT_COPY_WORKERS).
+    :type max_workers: int | None
+    :param chunk_size: Size of the chunks read from the source files.
+    :type chunk_size: int
+
+    :returns: The results of :func:`copy_file`, in the order of `pairs`.
+    :rtype: list[str | None]
+
+    :raises OSError: If one of the copies fails (the remaining copies are
+     still completed).
+    """
+    pairs = list(pairs)
+
+    if not pairs:
+        return []
+
+    workers = min(max_workers or DEFAULT_COPY_WORKERS, len(pairs))
+
+    if workers == 1:
+        return [copy_file(s, d, checksum, chunk_size) for s, d in pairs]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(copy_file, src, dst, checksum, chunk_size)
+            for src, dst in pairs
+        ]
+
+    return [future.result() for future in futures]
+
+
+def copy_tree(
+    src,
+    dst,
+    hardlink_subdirs=(),
+    max_workers=None,
+    progress_callback=None,
+    chunk_size=COPY_CHUNK_SIZE,
+):
+    """
+    Recursively copy a directory tree, as fast as the filesystem allows.
+
+    Each file is hard-linked (only inside `hardlink_subdirs`), reflinked, or
+    copied. Files are copied concurrently and files larger than
+    PARALLEL_CHUNK_THRESHOLD are split into ranges copied concurrently.
+    Symbolic links are recreated as symbolic links.
+
+    Hard links share the data between the two trees: they must only be
+    requested for data that are never modified in place (e.g. raw data).
+
+    :param src: Path of the directory to copy.
+    :type src: str
+    :param dst: Path of the destination directory (created if needed).
+    :type dst: str
+    :param hardlink_subdirs: Paths, relative to `src`, of the directories
+     whose files can be hard-linked instead of copied.
+    :type hardlink_subdirs: list[str] | tuple[str]
+    :param max_workers: Number of concurrent copies (defaults to
+     DEFAULT_COPY_WORKERS).
+    :type max_workers: int | None
+    :param progress_callback: Called in the calling thread each time a file
+     or a range of a file is done, with the number of bytes done, the total
+     number of bytes and the elapsed time in seconds.
+    :type progress_callback: Callable[[int, int, float], Any] | None
+    :param chunk_size: Size of the chunks read from the source files.
+    :type chunk_size: int
+
+    :returns: Statistics of the copy, with the keys "files", "bytes",
+     "hardlinked", "reflinked", "copied" and "seconds".
+    :rtype: dict
+    """
+    start = time.monotonic()
+    hardlink_roots = tuple(
+        os.path.join(os.path.abspath(os.path.join(src, subdir)), "")
+        for subdir in hardlink_subdirs
+    )
+    # Files to copy, as (source, destination, size, hard link allowed)
+    files = []
+
+    for root, dirs, filenames in os.walk(src):
+        dst_root = os.path.normpath(
+            os.path.join(dst, os.path.relpath(root, src))
+        )
+        os.makedirs(dst_root, exist_ok=True)
+
+        for name in list(dirs) + filenames:
+            src_path = os.path.join(root, name)
+            dst_path = os.path.join(dst_root, name)
+
+            if os.path.islink(src_path):
+                os.symlink(os.readlink(src_path), dst_path)
+
+                if name in dirs:
+                    dirs.remove(name)
+
+            elif name in filenames:
+                files.append(
+                    (
+                        src_path,
+                        dst_path,
+                        os.path.getsize(src_path),
+                        (
+                            os.path.abspath(src_path).startswith(
+                                hardlink_roots
+                            )
+                            if hardlink_roots
+                            else False
+                        ),
+                    )
+                )
+
+    stats = {
+        "files": len(files),
+        "bytes": sum(size for _, _, size, _ in files),
+        "hardlinked": 0,
+        "reflinked": 0,
+        "copied": 0,
+        "seconds": 0.0,
+    }
+    done = 0
+    workers = max_workers or DEFAULT_COPY_WORKERS
+    can_split = hasattr(os, "pread") and hasattr(os, "pwrite")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+
+        for src_path, dst_path, size, hardlink in files:
+
+            if hardlink or not can_split or size < PARALLEL_CHUNK_THRESHOLD:
+                futures.append(
+                    executor.submit(
+                        _link_or_copy, src_path, dst_path, hardlink, chunk_size
+                    )
+                )
+                continue
+
+            # Large file: reflink it, or preallocate the destination and
+            # copy its ranges concurrently
+            if reflink(src_path, dst_path):
+                shutil.copymode(src_path, dst_path)
+                stats["reflinked"] += 1
+                done += size
+                continue
+
+            with open(dst_path, "wb") as dst_file:
+                dst_file.truncate(size)
+
+            shutil.copymode(src_path, dst_path)
+            stats["copied"] += 1
+
+            for offset in range(0, size, PARALLEL_CHUNK_SIZE):
+                futures.append(
+                    executor.submit(
+                        _copy_range,
+                        src_path,
+                        dst_path,
+                        offset,
+                        min(PARALLEL_CHUNK_SIZE, size - offset),
+                        chunk_size,
+                    )
+                )
+
+        for future in as_completed(futures):
+            mode, size = future.result()
+
+            if mode is not None:
+                stats[mode] += 1
+
+            done += size
+
+            if progress_callback is not None:
+                progress_callback(
+                    done, stats["bytes"], time.monotonic() - start
+                )
+
+    stats["seconds"] = time.monotonic() - start
+    logger.info(
+        "Copied %d files (%.1f MB) from %s to %s in %.2f s "
+        "(%d hard-linked, %d reflinked, %d copied)",
+        stats["files"],
+        stats["bytes"] / 1e6,
+        src,
+        dst,
+        stats["seconds"],
+        stats["hardlinked"],
+        stats["reflinked"],
+        stats["copied"],
+    )
+    return stats
+
+
+def remove_files(paths, max_workers=None):
+    """
+    Remove several files concurrently.
+
+    Unlinking is I/O bound (and may be slow on network filesystems), so a
+    thread pool keeps several requests in flight. The missing files are
+    ignored.
+
+    :param paths: Paths of the files to remove.
+    :type paths: list[str]
+    :param max_workers: Number of files removed concurrently (defaults to
+     DEFAULT_COPY_WORKERS).
+    :type max_workers: int | None
+
+    :returns: The number of files removed.
+    :rtype: int
+
+    :raises OSError: If one of the removals fails (the remaining removals
+     are still completed).
+    """
+
+    def remove(path):
+        """
+        Remove a file, if it exists.
+
+        :param path: Path of the file to remove.
+        :type path: str
+
+        :returns: True if the file was removed, False if it was missing.
+        :rtype: bool
+        """
+
+        try:
+            os.remove(path)
+
+        except FileNotFoundError:
+            return False
+
+        return True
+
+    paths = list(paths)
+
+    if not paths:
+        return 0
+
+    workers = min(max_workers or DEFAULT_COPY_WORKERS, len(paths))
+
+    if workers == 1:
+        return sum(remove(path) for path in paths)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(remove, path) for path in paths]
+
+    return sum(future.result() for future in futures)